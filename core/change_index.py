@@ -0,0 +1,59 @@
+import json
+import os
+
+CHANGE_INDEX_VERSION = 3
+
+
+class ChangeIndex:
+    """Indice persistente delle directory visitate dalle esportazioni delle modifiche.
+
+    Per ogni radice conserva l'istante della visita, da cui parte
+    l'esportazione successiva, e per ogni directory visitata (percorso relativo
+    con '/') la data di modifica in nanosecondi, i nomi delle sottodirectory,
+    i nomi dei file e i file di ignore presenti. Finché la data di modifica non
+    cambia la directory non ha guadagnato né perso elementi: non viene
+    elencata e i suoi file vengono letti direttamente con stat. Una directory
+    assente dall'indice è nuova e viene riportata con tutto il contenuto.
+    """
+
+    def __init__(self):
+        self._roots = {}
+        self.modified = False
+
+    @staticmethod
+    def _root_key(root_path):
+        return os.path.normcase(os.path.abspath(root_path))
+
+    def get(self, root_path):
+        """Restituisce la coppia (istante della visita, directory) registrata per la radice, o None"""
+        record = self._roots.get(self._root_key(root_path))
+        if record is None:
+            return None
+        return record['recorded_at'], record['directories']
+
+    def update(self, root_path, recorded_at, directories):
+        """Sostituisce i dati registrati per la radice con quelli di una nuova visita"""
+        self._roots[self._root_key(root_path)] = {'recorded_at': recorded_at, 'directories': directories}
+        self.modified = True
+
+    def load(self, file_path):
+        """Carica l'indice da un file; un file assente o non valido viene ignorato"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('version') != CHANGE_INDEX_VERSION:
+            return False
+
+        self._roots = data.get('roots', {})
+        self.modified = False
+        return True
+
+    def save(self, file_path):
+        """Salva l'indice su file, scrivendo prima un file temporaneo per non corromperlo"""
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CHANGE_INDEX_VERSION, 'roots': self._roots}, f)
+        os.replace(temp_path, file_path)
+        self.modified = False
@@ -0,0 +1,98 @@
+import csv
+
+from core.compression import open_text_output
+from core.scanner import directory_size, file_extension
+
+# pyarrow è opzionale: senza, l'esportazione a colonne ripiega su CSV
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+COLUMNAR_COLUMNS = ('parent', 'name', 'ext', 'type', 'size', 'mtime', 'depth')
+
+# Righe di ogni blocco (record batch in Parquet)
+_BATCH_SIZE = 65536
+
+
+def pyarrow_available():
+    """Indica se è disponibile pyarrow per la scrittura in formato Parquet"""
+    return pa is not None
+
+
+# Estensione dell'esportazione a colonne: Parquet con pyarrow, altrimenti CSV
+COLUMNAR_SUFFIX = '.parquet' if pyarrow_available() else '.csv'
+
+
+def _iter_batches(root, children=None):
+    """Restituisce le righe dell'albero (radice esclusa) a blocchi di _BATCH_SIZE.
+
+    parent è il percorso della directory contenitore relativo alla radice,
+    con '/' come separatore ('' per gli elementi della radice); depth vale 1
+    per gli elementi della radice. children è come in write_columnar.
+    """
+    batch = []
+    stack = [(root, '', 1)]
+    while stack:
+        node, parent, depth = stack.pop()
+        for child in (node.children if children is None else children(node, depth - 1)):
+            if child.is_dir:
+                batch.append((parent, child.name, None, 'directory', directory_size(child), child.mtime, depth))
+                stack.append((child, f"{parent}/{child.name}" if parent else child.name, depth + 1))
+            else:
+                batch.append((parent, child.name, file_extension(child.name), 'file',
+                              child.size, child.mtime, depth))
+            if len(batch) >= _BATCH_SIZE:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def write_columnar(root, output_file_path, root_path=None, compression=None, children=None):
+    """Scrive gli elementi dell'albero per colonne e restituisce il numero di righe.
+
+    Con pyarrow il file è Parquet, scritto un record batch alla volta, con il
+    percorso della radice nei metadati dello schema; altrimenti è un CSV con
+    le stesse colonne, eventualmente compresso in streaming (compression o
+    suffisso del file, come per le esportazioni testuali). size di una
+    directory è la dimensione totale del contenuto se l'albero ha i totali;
+    children(nodo, profondità) restituisce i figli da scrivere (tutti se None),
+    con profondità 0 per la radice come in write_database.
+    """
+    root_path = root_path if root_path is not None else getattr(root, 'path', root.name)
+    if pa is not None:
+        return _write_parquet(root, output_file_path, str(root_path), children)
+    return _write_csv(root, output_file_path, compression, children)
+
+
+def _write_parquet(root, output_file_path, root_path, children):
+    schema = pa.schema([
+        ('parent', pa.string()),
+        ('name', pa.string()),
+        ('ext', pa.string()),
+        ('type', pa.string()),
+        ('size', pa.int64()),
+        ('mtime', pa.float64()),
+        ('depth', pa.int32()),
+    ], metadata={'root_path': root_path})
+    count = 0
+    with pq.ParquetWriter(output_file_path, schema) as writer:
+        for batch in _iter_batches(root, children):
+            columns = [pa.array(values, type=field.type) for values, field in zip(zip(*batch), schema)]
+            writer.write_table(pa.Table.from_batches([pa.RecordBatch.from_arrays(columns, schema=schema)]))
+            count += len(batch)
+    return count
+
+
+def _write_csv(root, output_file_path, compression, children):
+    count = 0
+    with open_text_output(output_file_path, compression, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNAR_COLUMNS)
+        for batch in _iter_batches(root, children):
+            writer.writerows(batch)
+            count += len(batch)
+    return count
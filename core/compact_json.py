@@ -0,0 +1,71 @@
+"""Formato JSON compatto delle esportazioni.
+
+Il documento è scritto senza spazi né indentazione:
+
+    {"format": "dse-compact", "version": 1, "root": <voce>,
+     "strings": [...], "top": {...}, "stats": {...}}
+
+"strings", "top" e "stats" compaiono solo se usati; "top" e "stats" hanno
+la stessa forma dell'esportazione JSON normale.
+
+Ogni voce è un array posizionale il cui primo elemento indica il tipo:
+
+    [0, nome]                          file
+    [0, nome, attributi]               file con attributi
+    [1, nome, [voci]]                  directory con le voci figlie
+    [1, nome, [voci], attributi]       directory con attributi
+    [2, numero, byte]                  elementi omessi dal limite per directory
+
+Il nome è una stringa oppure, con la tabella delle stringhe, l'indice
+intero in "strings" di un nome che compare più volte nell'albero.
+L'estensione dei file non è riportata: si ricava dal nome.
+
+Attributi (chiavi brevi, presenti solo se impostati):
+
+    "c": modifica rispetto al confronto ("added", "removed", "modified")
+    "o": 1 se l'elenco della directory è scaduto (timed_out)
+    "u": 1 se la directory è stata troncata dal tempo massimo (truncated)
+    "k": 1 se la directory è riassunta nei totali (collapsed)
+    "t": totali della directory [size, allocated, files, dirs], con un
+         quinto elemento 1 se parziali per la durata massima (truncated)
+"""
+from collections import Counter
+
+COMPACT_FORMAT = 'dse-compact'
+COMPACT_VERSION = 1
+
+# Tipo di voce (primo elemento dell'array)
+ENTRY_FILE = 0
+ENTRY_DIRECTORY = 1
+ENTRY_OMITTED = 2
+
+
+class StringTable:
+    """Tabella dei nomi ripetuti: ogni nome presente più di una volta è sostituito dal suo indice"""
+
+    def __init__(self, names):
+        counts = Counter(names)
+        self.strings = [name for name, count in counts.items() if count > 1]
+        self._indexes = {name: index for index, name in enumerate(self.strings)}
+
+    def ref(self, name):
+        """Restituisce l'indice del nome nella tabella, o il nome stesso se non ripetuto"""
+        return self._indexes.get(name, name)
+
+
+def compact_attributes(change=None, timed_out=False, truncated=False, collapsed=False, totals=None):
+    """Restituisce il dizionario degli attributi di una voce con chiavi brevi (vuoto se nessuno)"""
+    attributes = {}
+    if change:
+        attributes["c"] = change
+    if timed_out:
+        attributes["o"] = 1
+    if truncated:
+        attributes["u"] = 1
+    if collapsed:
+        attributes["k"] = 1
+    if totals:
+        attributes["t"] = [totals["size"], totals["allocated"], totals["files"], totals["dirs"]]
+        if totals.get("truncated"):
+            attributes["t"].append(1)
+    return attributes
@@ -0,0 +1,72 @@
+import bz2
+import gzip
+import lzma
+
+# zstd: modulo della libreria standard (Python 3.14+) o pacchetto zstandard, se installato
+try:
+    from compression import zstd as _zstd
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
+
+# Formati di compressione delle esportazioni testuali
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_XZ = 'xz'
+COMPRESSION_BZ2 = 'bz2'
+COMPRESSION_ZSTD = 'zstd'
+
+COMPRESSION_SUFFIXES = {
+    COMPRESSION_GZIP: '.gz',
+    COMPRESSION_XZ: '.xz',
+    COMPRESSION_BZ2: '.bz2',
+    COMPRESSION_ZSTD: '.zst',
+}
+
+_OPENERS = {
+    COMPRESSION_GZIP: gzip.open,
+    COMPRESSION_XZ: lzma.open,
+    COMPRESSION_BZ2: bz2.open,
+}
+
+
+def zstd_available():
+    """Indica se è disponibile un modulo zstd"""
+    return _zstd is not None
+
+
+def detect_compression(file_path):
+    """Restituisce il formato di compressione indicato dal suffisso del file, o None"""
+    lowered = str(file_path).lower()
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if lowered.endswith(suffix):
+            return compression
+    return None
+
+
+def compressed_path(file_path, compression):
+    """Aggiunge al percorso il suffisso del formato di compressione, se manca"""
+    if compression is None or detect_compression(file_path) == compression:
+        return file_path
+    return f"{file_path}{COMPRESSION_SUFFIXES[compression]}"
+
+
+def open_text_output(file_path, compression=None, newline=None):
+    """Apre un file di testo UTF-8 in scrittura, comprimendolo in streaming.
+
+    Il formato è quello indicato oppure, se None, quello del suffisso del file
+    (.gz, .xz, .bz2, .zst); senza compressione il file viene aperto normalmente.
+    newline ha lo stesso significato che in open() (ad es. '' per il modulo csv).
+    """
+    compression = compression or detect_compression(file_path)
+    if compression is None:
+        return open(file_path, 'w', encoding='utf-8', newline=newline)
+    if compression == COMPRESSION_ZSTD:
+        if _zstd is None:
+            raise ValueError("Compressione zstd non disponibile: installare il pacchetto zstandard")
+        return _zstd.open(file_path, 'wt', encoding='utf-8', newline=newline)
+    opener = _OPENERS.get(compression)
+    if opener is None:
+        raise ValueError(f"Formato di compressione non supportato: {compression}")
+    return opener(file_path, 'wt', encoding='utf-8', newline=newline)
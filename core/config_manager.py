@@ -13,6 +13,7 @@ class ConfigManager:
             # Filtri directory
             'excluded_dirs': set(self.filter_manager.excluded_dirs),
             'excluded_dirs_regex': set(self.filter_manager.excluded_dirs_regex),
+            'excluded_paths': set(self.filter_manager.excluded_paths),
             
             # Filtri file - NUOVO
             'excluded_files': set(self.filter_manager.excluded_files),
@@ -28,7 +29,10 @@ class ConfigManager:
             'min_creation_date': self.filter_manager.min_creation_date,
             'max_creation_date': self.filter_manager.max_creation_date,
             'min_modification_date': self.filter_manager.min_modification_date,
-            'max_modification_date': self.filter_manager.max_modification_date
+            'max_modification_date': self.filter_manager.max_modification_date,
+            
+            # File di ignore
+            'use_gitignore': self.filter_manager.use_gitignore
         }
         return True, f"Preset '{preset_name}' salvato con successo."
     
@@ -42,6 +46,7 @@ class ConfigManager:
         # Carica tutti i filtri dal preset
         self.filter_manager.excluded_dirs = set(preset['excluded_dirs'])
         self.filter_manager.excluded_dirs_regex = set(preset['excluded_dirs_regex'])
+        self.filter_manager.excluded_paths = set(preset.get('excluded_paths', set()))
         
         # File esclusi - NUOVO
         self.filter_manager.excluded_files = set(preset.get('excluded_files', set()))
@@ -55,6 +60,7 @@ class ConfigManager:
         self.filter_manager.max_creation_date = preset['max_creation_date']
         self.filter_manager.min_modification_date = preset['min_modification_date']
         self.filter_manager.max_modification_date = preset['max_modification_date']
+        self.filter_manager.use_gitignore = preset.get('use_gitignore', False)
         
         return True, f"Preset '{preset_name}' caricato con successo."
     
@@ -79,6 +85,7 @@ class ConfigManager:
             # Directory
             "excluded_dirs": list(self.filter_manager.excluded_dirs),
             "excluded_dirs_regex": list(self.filter_manager.excluded_dirs_regex),
+            "excluded_paths": list(self.filter_manager.excluded_paths),
             
             # File - NUOVO
             "excluded_files": list(self.filter_manager.excluded_files),
@@ -96,12 +103,16 @@ class ConfigManager:
             "min_modification_date": self.filter_manager.min_modification_date,
             "max_modification_date": self.filter_manager.max_modification_date,
             
+            # File di ignore
+            "use_gitignore": self.filter_manager.use_gitignore,
+            
             # Presets
             "filter_presets": {
                 name: {
                     # Directory
                     "excluded_dirs": list(preset["excluded_dirs"]),
                     "excluded_dirs_regex": list(preset["excluded_dirs_regex"]),
+                    "excluded_paths": list(preset.get("excluded_paths", set())),
                     
                     # File - NUOVO
                     "excluded_files": list(preset.get("excluded_files", set())),
@@ -117,7 +128,10 @@ class ConfigManager:
                     "min_creation_date": preset["min_creation_date"],
                     "max_creation_date": preset["max_creation_date"],
                     "min_modification_date": preset["min_modification_date"],
-                    "max_modification_date": preset["max_modification_date"]
+                    "max_modification_date": preset["max_modification_date"],
+                    
+                    # File di ignore
+                    "use_gitignore": preset.get("use_gitignore", False)
                 } for name, preset in self.filter_presets.items()
             }
         }
@@ -138,6 +152,7 @@ class ConfigManager:
             # Directory
             self.filter_manager.excluded_dirs = set(config.get("excluded_dirs", []))
             self.filter_manager.excluded_dirs_regex = set(config.get("excluded_dirs_regex", []))
+            self.filter_manager.excluded_paths = set(config.get("excluded_paths", []))
             
             # File - NUOVO
             self.filter_manager.excluded_files = set(config.get("excluded_files", []))
@@ -158,6 +173,9 @@ class ConfigManager:
             self.filter_manager.min_modification_date = config.get("min_modification_date")
             self.filter_manager.max_modification_date = config.get("max_modification_date")
             
+            # File di ignore
+            self.filter_manager.use_gitignore = config.get("use_gitignore", False)
+            
             # Carica i preset
             presets = config.get("filter_presets", {})
             self.filter_presets = {}
@@ -168,6 +186,7 @@ class ConfigManager:
                     # Directory
                     "excluded_dirs": set(preset_data.get("excluded_dirs", [])),
                     "excluded_dirs_regex": set(preset_data.get("excluded_dirs_regex", [])),
+                    "excluded_paths": set(preset_data.get("excluded_paths", [])),
                     
                     # File - NUOVO (con retrocompatibilità)
                     "excluded_files": set(preset_data.get("excluded_files", [])),
@@ -183,7 +202,10 @@ class ConfigManager:
                     "min_creation_date": preset_data.get("min_creation_date"),
                     "max_creation_date": preset_data.get("max_creation_date"),
                     "min_modification_date": preset_data.get("min_modification_date"),
-                    "max_modification_date": preset_data.get("max_modification_date")
+                    "max_modification_date": preset_data.get("max_modification_date"),
+                    
+                    # File di ignore
+                    "use_gitignore": preset_data.get("use_gitignore", False)
                 }
                 self.filter_presets[name] = preset
             
@@ -204,6 +226,7 @@ class ConfigManager:
                 # Directory
                 "excluded_dirs": list(preset["excluded_dirs"]),
                 "excluded_dirs_regex": list(preset["excluded_dirs_regex"]),
+                "excluded_paths": list(preset.get("excluded_paths", set())),
                 
                 # File - NUOVO
                 "excluded_files": list(preset.get("excluded_files", set())),
@@ -219,7 +242,10 @@ class ConfigManager:
                 "min_creation_date": preset["min_creation_date"],
                 "max_creation_date": preset["max_creation_date"],
                 "min_modification_date": preset["min_modification_date"],
-                "max_modification_date": preset["max_modification_date"]
+                "max_modification_date": preset["max_modification_date"],
+                
+                # File di ignore
+                "use_gitignore": preset.get("use_gitignore", False)
             }
         
         try:
@@ -246,6 +272,7 @@ class ConfigManager:
                     # Directory
                     "excluded_dirs": set(preset_data.get("excluded_dirs", [])),
                     "excluded_dirs_regex": set(preset_data.get("excluded_dirs_regex", [])),
+                    "excluded_paths": set(preset_data.get("excluded_paths", [])),
                     
                     # File - NUOVO (con retrocompatibilità)
                     "excluded_files": set(preset_data.get("excluded_files", [])),
@@ -261,7 +288,10 @@ class ConfigManager:
                     "min_creation_date": preset_data.get("min_creation_date"),
                     "max_creation_date": preset_data.get("max_creation_date"),
                     "min_modification_date": preset_data.get("min_modification_date"),
-                    "max_modification_date": preset_data.get("max_modification_date")
+                    "max_modification_date": preset_data.get("max_modification_date"),
+                    
+                    # File di ignore
+                    "use_gitignore": preset_data.get("use_gitignore", False)
                 }
                 self.filter_presets[name] = preset
             
@@ -0,0 +1,87 @@
+import os
+import sqlite3
+from collections import deque
+
+from core.scanner import directory_size, file_extension
+
+DATABASE_SUFFIX = '.sqlite'
+
+# Righe inserite per ogni chiamata a executemany
+_BATCH_SIZE = 10000
+
+_SCHEMA = (
+    """CREATE TABLE entries (
+        id INTEGER PRIMARY KEY,
+        parent_id INTEGER REFERENCES entries(id),
+        name TEXT NOT NULL,
+        ext TEXT,
+        type TEXT NOT NULL,
+        size INTEGER,
+        mtime REAL,
+        depth INTEGER NOT NULL
+    )""",
+    "CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT)",
+)
+
+_INDEXES = (
+    "CREATE INDEX entries_parent_id ON entries(parent_id)",
+    "CREATE INDEX entries_ext ON entries(ext)",
+    "CREATE INDEX entries_size ON entries(size)",
+)
+
+_INSERT = "INSERT INTO entries (id, parent_id, name, ext, type, size, mtime, depth) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def write_database(root, output_file_path, root_path=None, children=None):
+    """Scrive l'albero con radice root in un database SQLite e restituisce il numero di elementi.
+
+    Gli elementi finiscono nella tabella entries in ordine per livelli (la
+    radice ha id 1, parent_id NULL e depth 0); type è 'directory' o 'file',
+    ext è None per le directory e size di una directory è la dimensione
+    totale del contenuto se l'albero ha i totali. children(nodo, depth)
+    restituisce i figli da scrivere (tutti se None), così che filtri sui
+    file e profondità massima valgano anche per gli alberi degli snapshot.
+    Le righe sono inserite a blocchi in
+    un'unica transazione e gli indici vengono creati alla fine, così la
+    scrittura non li aggiorna riga per riga. La tabella info contiene il
+    percorso della radice (chiave 'root_path').
+    """
+    root_path = root_path if root_path is not None else getattr(root, 'path', root.name)
+    # Un database esistente verrebbe esteso: l'esportazione lo sostituisce
+    if os.path.exists(output_file_path):
+        os.remove(output_file_path)
+
+    connection = sqlite3.connect(output_file_path)
+    try:
+        # File appena creato: se l'esportazione fallisce viene comunque rigenerato
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        with connection:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            connection.execute("INSERT INTO info (key, value) VALUES (?, ?)", ('root_path', str(root_path)))
+
+            batch = []
+            queue = deque([(root, None, 0)])
+            count = 0
+            while queue:
+                node, parent_id, depth = queue.popleft()
+                count += 1
+                if node.is_dir:
+                    batch.append((count, parent_id, node.name, None, 'directory', directory_size(node),
+                                  node.mtime, depth))
+                    for child in (node.children if children is None else children(node, depth)):
+                        queue.append((child, count, depth + 1))
+                else:
+                    batch.append((count, parent_id, node.name, file_extension(node.name), 'file',
+                                  node.size, node.mtime, depth))
+                if len(batch) >= _BATCH_SIZE:
+                    connection.executemany(_INSERT, batch)
+                    batch.clear()
+            connection.executemany(_INSERT, batch)
+
+            for statement in _INDEXES:
+                connection.execute(statement)
+    finally:
+        connection.close()
+    return count
@@ -0,0 +1,113 @@
+import hashlib
+import os
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from core.hash_cache import HASH_SHA256, HashCache
+
+# Gruppo di file con contenuto identico
+DuplicateGroup = namedtuple('DuplicateGroup', ['size', 'digest', 'paths'])
+
+# Byte letti all'inizio e alla fine del file per il digest parziale
+PARTIAL_BLOCK_SIZE = 64 * 1024
+
+HASH_PARTIAL = 'partial'
+
+
+class DuplicateFinder:
+    """Individua i file duplicati restringendo progressivamente i candidati.
+
+    I file vengono raggruppati prima per dimensione, poi per un digest parziale
+    (primo e ultimo blocco) e solo i candidati rimasti vengono letti per intero.
+    Le letture avvengono in un pool di thread e i digest sono memorizzati in una
+    HashCache, quindi i file non modificati non vengono riletti.
+    """
+
+    def __init__(self, cache=None, max_workers=None):
+        self.cache = cache if cache is not None else HashCache()
+        self.max_workers = max_workers
+
+    def find(self, files):
+        """Restituisce i gruppi di duplicati tra i file indicati.
+
+        files è un iterabile di coppie (percorso, dimensione). I file vuoti e i
+        file illeggibili vengono ignorati; gli hardlink dello stesso inode contano
+        come un unico file, dato che non occupano spazio aggiuntivo. I gruppi sono
+        ordinati per spazio recuperabile decrescente.
+        """
+        by_size = defaultdict(list)
+        for path, size in files:
+            if size:
+                by_size[size].append(path)
+        # Ordinati così che, tra più hardlink, venga mantenuto sempre lo stesso percorso
+        candidates = sorted(path for paths in by_size.values() if len(paths) > 1 for path in paths)
+        if not candidates:
+            return []
+
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            # Primo passaggio: metadati e digest parziale (completo per i file piccoli)
+            by_partial = defaultdict(list)
+            seen_inodes = set()
+            for path, stat_result, digest, complete in pool.map(self._partial_digest, candidates):
+                if digest is None:
+                    continue
+                if stat_result.st_ino:
+                    inode = (stat_result.st_dev, stat_result.st_ino)
+                    if inode in seen_inodes:
+                        continue
+                    seen_inodes.add(inode)
+                by_partial[(stat_result.st_size, digest, complete)].append((path, stat_result))
+
+            # Secondo passaggio: digest completo solo dove il parziale non basta
+            groups = []
+            to_hash = []
+            for (size, digest, complete), entries in by_partial.items():
+                if len(entries) < 2:
+                    continue
+                if complete:
+                    groups.append(DuplicateGroup(size, digest, sorted(path for path, _ in entries)))
+                else:
+                    to_hash.extend(entries)
+
+            by_digest = defaultdict(list)
+            for path, stat_result, digest in pool.map(self._full_digest, to_hash):
+                if digest is not None:
+                    by_digest[(stat_result.st_size, digest)].append(path)
+
+        groups.extend(DuplicateGroup(size, digest, sorted(paths))
+                      for (size, digest), paths in by_digest.items() if len(paths) > 1)
+        groups.sort(key=lambda group: (-group.size * (len(group.paths) - 1), group.paths[0]))
+        return groups
+
+    def _partial_digest(self, path):
+        """Calcola il digest del primo e dell'ultimo blocco del file.
+
+        Se il file è abbastanza piccolo da essere letto per intero il digest è lo
+        SHA-256 completo, segnalato dal quarto elemento della tupla restituita.
+        """
+        try:
+            stat_result = os.stat(path)
+            complete = stat_result.st_size <= 2 * PARTIAL_BLOCK_SIZE
+            kind = HASH_SHA256 if complete else HASH_PARTIAL
+            digest = self.cache.get(kind, path, stat_result)
+            if digest is None:
+                with open(path, 'rb') as f:
+                    if complete:
+                        data = f.read()
+                    else:
+                        data = f.read(PARTIAL_BLOCK_SIZE)
+                        f.seek(-PARTIAL_BLOCK_SIZE, os.SEEK_END)
+                        data += f.read(PARTIAL_BLOCK_SIZE)
+                digest = hashlib.sha256(data).hexdigest()
+                self.cache.put(kind, path, stat_result, digest)
+            return path, stat_result, digest, complete
+        except OSError:
+            return path, None, None, False
+
+    def _full_digest(self, entry):
+        """Calcola (o recupera dalla cache) lo SHA-256 completo del file"""
+        path, stat_result = entry
+        try:
+            return path, stat_result, self.cache.sha256(path, stat_result)
+        except OSError:
+            return path, stat_result, None
@@ -1,11 +1,96 @@
+from contextlib import contextmanager
+import time
 from pathlib import Path
+import html
 import json
+import os
 import xml.dom.minidom as minidom
 import xml.etree.ElementTree as ET
 
+from core.change_index import ChangeIndex
+from core.columnar import pyarrow_available, write_columnar
+from core.compact_json import (COMPACT_FORMAT, COMPACT_VERSION, ENTRY_DIRECTORY, ENTRY_FILE, ENTRY_OMITTED,
+                               StringTable, compact_attributes)
+from core.compression import compressed_path, detect_compression, open_text_output
+from core.database import write_database
+from core.duplicates import DuplicateFinder
+from core.hash_cache import HashCache
+from core.manifest import read_manifest, verify_manifest, write_manifest
+from core.merkle import compute_merkle
+from core.scanner import SORT_NAME, CollapseRules, OmittedEntries, ScanNode, TreeScanner, mount_types
+from core.snapshot import SNAPSHOT_SORTED_BY_NAME, Snapshot, is_snapshot_file, write_snapshot
+from core.stats import TreeStats
+from core.top_n import TopReport
+from core.tree_diff import CHANGE_ADDED, CHANGE_MODIFIED, CHANGE_REMOVED, build_diff_tree
+from utils.file_utils import format_file_size, format_timestamp
+
+# Indicatori delle differenze nelle esportazioni di confronto
+CHANGE_MARKERS = {CHANGE_ADDED: '+', CHANGE_REMOVED: '-', CHANGE_MODIFIED: '~'}
+
+# Riga delle anteprime per livelli al posto dei figli non aggiunti a budget esaurito
+PREVIEW_CUT_MARKER = "… (anteprima troncata)"
+
+# Durata oltre la quale l'elenco di una directory compare nel riepilogo della scansione
+SLOW_LISTING_SECONDS = 0.5
+
 class DirectoryExporter:
     def __init__(self, filter_manager):
         self.filter_manager = filter_manager
+        self.scanner = TreeScanner(filter_manager)
+        
+        # Annota le directory con i totali in stile du (dimensione, file, sottodirectory)
+        self.show_totals = False
+        
+        # Digest dei file già calcolati, condivisi tra le esportazioni (e salvati su file se indicato)
+        self.hash_cache = HashCache()
+        self.hash_cache_path = None
+        
+        # Modalità degli hash di Merkle salvati negli snapshot (None per non calcolarli)
+        self.merkle_mode = None
+        
+        # Struttura (directory o snapshot) con cui confrontare le esportazioni (None per nessun confronto)
+        self.compare_base = None
+        
+        # Esportazione dei soli elementi modificati: disattivata, dall'ultima esportazione o da un istante
+        self.changes_only = False
+        self.changes_since = None
+        self.change_index = ChangeIndex()
+        self.change_index_path = None
+        # Errori di salvataggio di cache e indice, riportati nel riepilogo successivo
+        self._save_errors = []
+        
+        # Anteprime costruite per livelli (prima i livelli superiori) invece che in profondità
+        self.preview_breadth_first = False
+        
+        # Elementi riportati al massimo per ogni directory (None senza limite); i restanti sono riassunti
+        self.max_entries_per_dir = None
+        
+        # Directory riassunte in un unico nodo con i totali (CollapseRules, None se disattivato)
+        self.collapse_rules = None
+        
+        # Report dei file più grandi e più recenti e delle directory più grandi (0 per non generarlo),
+        # in testa all'esportazione o in un file separato
+        self.top_n = 0
+        self.top_report_file = False
+        # Report compilato durante l'ultima scansione, con i file omessi e riassunti (None: dall'albero)
+        self._scan_top = None
+        
+        # Statistiche per estensione, livello e directory di primo livello in coda all'esportazione
+        self.show_stats = False
+        # Statistiche raccolte durante l'ultima scansione, come _scan_top
+        self._scan_stats = None
+        
+        # Report dei file duplicati scritto accanto a ogni esportazione, dalla stessa scansione
+        self.duplicates_report = False
+        # Messaggi dei report scritti insieme all'esportazione, riportati nel riepilogo
+        self._side_reports = []
+        
+        # Compressione in streaming delle esportazioni testuali (None: dedotta dal suffisso del file)
+        self.compression = None
+        
+        # JSON compatto (array posizionali, senza spazi) con tabella opzionale dei nomi ripetuti
+        self.json_compact = False
+        self.json_string_table = False
         
         # Stili di indentazione disponibili
         self.indent_styles = {
@@ -51,137 +136,526 @@ class DirectoryExporter:
         """Restituisce la lista degli stili di indentazione disponibili"""
         return {key: style['name'] for key, style in self.indent_styles.items()}
     
+    def set_source_mode(self, source_mode, include_untracked=False):
+        """Imposta la sorgente degli elementi: filesystem oppure indice git"""
+        self.scanner.set_source_mode(source_mode, include_untracked)
+    
+    def set_symlink_policy(self, policy):
+        """Imposta il trattamento dei link simbolici: seguiti, solo elencati o ignorati"""
+        self.scanner.set_symlink_policy(policy)
+    
+    def set_sort_order(self, sort_order):
+        """Imposta l'ordine degli elementi di ogni directory (SORT_* di core.scanner)"""
+        self.scanner.set_sort_order(sort_order)
+    
+    def set_one_filesystem(self, enabled):
+        """Imposta se limitare la scansione al filesystem della directory radice"""
+        self.scanner.set_one_filesystem(enabled)
+    
+    def get_scan_report(self):
+        """Restituisce le righe di riepilogo dell'ultima scansione (vuoto se non c'è nulla da segnalare)"""
+        report = self.scanner.report
+        lines = []
+        if report.skipped_mounts:
+            types = mount_types()
+            lines.append(f"Filesystem non attraversati: {len(report.skipped_mounts)}")
+            for path in report.skipped_mounts[:20]:
+                fs_type = types.get(os.path.realpath(path))
+                lines.append(f"    {path} ({fs_type})" if fs_type else f"    {path}")
+            if len(report.skipped_mounts) > 20:
+                lines.append(f"    ... (altri {len(report.skipped_mounts) - 20})")
+        if report.timed_out:
+            lines.append(f"Directory non elencate entro il tempo massimo: {len(report.timed_out)}")
+            lines.extend(f"    {path}" for path in report.timed_out[:20])
+            if len(report.timed_out) > 20:
+                lines.append(f"    ... (altri {len(report.timed_out) - 20})")
+        if report.unlisted:
+            lines.append(f"Directory non elencate perché troppi elenchi precedenti sono ancora bloccati: "
+                         f"{len(report.unlisted)} (contrassegnate come troncate)")
+            lines.extend(f"    {path}" for path in report.unlisted[:20])
+            if len(report.unlisted) > 20:
+                lines.append(f"    ... (altri {len(report.unlisted) - 20})")
+        if report.truncated:
+            lines.append(f"Durata massima raggiunta: {report.truncated} directory non elencate "
+                         f"(contrassegnate come troncate)")
+        slowest = [(seconds, path) for seconds, path in report.slowest_listings() if seconds >= SLOW_LISTING_SECONDS]
+        if slowest:
+            lines.append("Directory più lente da elencare:")
+            lines.extend(f"    {seconds:.2f} s  {path}" for seconds, path in slowest)
+        # I messaggi dei report e gli errori di salvataggio vengono riportati una sola volta
+        lines.extend(self._side_reports)
+        self._side_reports = []
+        lines.extend(self._save_errors)
+        self._save_errors = []
+        return lines
+    
+    def set_listing_timeout(self, timeout, retry=False):
+        """Imposta il tempo massimo (in secondi, None senza limite) per elencare ogni directory"""
+        self.scanner.set_listing_timeout(timeout, retry)
+    
+    def set_max_duration(self, seconds):
+        """Imposta la durata massima (in secondi, None senza limite) della scansione di ogni esportazione"""
+        self.scanner.set_max_duration(seconds)
+    
+    def set_preview_order(self, breadth_first):
+        """Imposta se le anteprime devono elencare prima i livelli superiori (le esportazioni non cambiano)"""
+        self.preview_breadth_first = breadth_first
+    
+    def set_max_entries_per_dir(self, max_entries):
+        """Imposta il numero massimo di elementi esportati per directory (None o 0 senza limite)"""
+        self.max_entries_per_dir = max_entries or None
+    
+    def set_collapse_rules(self, names=(), max_entries=None, max_bytes=None):
+        """Imposta le directory da riassumere: per nome o oltre un numero di elementi o di byte"""
+        if names or max_entries or max_bytes:
+            self.collapse_rules = CollapseRules(names, max_entries, max_bytes)
+        else:
+            self.collapse_rules = None
+    
+    def set_top_report(self, n, separate_file=False):
+        """Imposta il numero di elementi del report dei più grandi/recenti e dove scriverlo"""
+        self.top_n = n or 0
+        self.top_report_file = separate_file
+    
+    def set_stats_mode(self, enabled):
+        """Attiva o disattiva le statistiche per estensione, livello e directory di primo livello"""
+        self.show_stats = enabled
+    
+    def set_duplicates_report(self, enabled):
+        """Attiva o disattiva il report dei file duplicati accanto alle esportazioni (file .duplicates.txt)"""
+        self.duplicates_report = enabled
+    
+    def set_compression(self, compression):
+        """Imposta la compressione delle esportazioni testuali (gzip, xz, bz2, zstd o None)"""
+        self.compression = compression or None
+    
+    def set_json_compact(self, enabled, string_table=False):
+        """Attiva o disattiva il JSON compatto e la sua tabella dei nomi ripetuti"""
+        self.json_compact = enabled
+        self.json_string_table = string_table
+    
+    def set_totals_mode(self, enabled):
+        """Attiva o disattiva l'annotazione delle directory con i totali aggregati"""
+        self.show_totals = enabled
+    
+    def set_hash_cache_path(self, file_path):
+        """Imposta il file in cui conservare i digest tra un'esecuzione e l'altra e lo carica"""
+        self.hash_cache_path = file_path or None
+        if self.hash_cache_path:
+            self.hash_cache.load(self.hash_cache_path)
+    
+    def set_merkle_mode(self, merkle_mode):
+        """Imposta il calcolo degli hash di Merkle delle directory negli snapshot (None lo disattiva)"""
+        self.merkle_mode = merkle_mode or None
+    
+    def set_compare_base(self, path):
+        """Imposta la struttura precedente con cui confrontare le esportazioni (None lo disattiva)"""
+        self.compare_base = path or None
+    
+    def set_changes_mode(self, enabled, since=None):
+        """Limita le esportazioni agli elementi creati o modificati dopo since.
+
+        Con since None si usa l'istante dell'ultima esportazione registrata
+        nell'indice per la stessa directory (tutto, se non ce n'è una).
+        """
+        self.changes_only = enabled
+        self.changes_since = since
+    
+    def set_change_index_path(self, file_path):
+        """Imposta il file dell'indice delle directory usato dalle esportazioni delle modifiche e lo carica"""
+        self.change_index_path = file_path or None
+        if self.change_index_path:
+            self.change_index.load(self.change_index_path)
+    
+    def _save_change_index(self):
+        """Salva l'indice delle directory se è stato modificato (gli errori finiscono nel riepilogo senza interrompere l'esportazione)"""
+        if self.change_index_path and self.change_index.modified:
+            try:
+                self.change_index.save(self.change_index_path)
+            except OSError as e:
+                self._save_errors.append(f"Impossibile salvare l'indice delle modifiche: {e}")
+    
+    def _save_hash_cache(self):
+        """Salva la cache dei digest se è stata modificata (gli errori finiscono nel riepilogo senza interrompere l'esportazione)"""
+        if self.hash_cache_path and self.hash_cache.modified:
+            try:
+                self.hash_cache.save(self.hash_cache_path)
+            except OSError as e:
+                self._save_errors.append(f"Impossibile salvare la cache dei digest: {e}")
+    
+    @contextmanager
+    def _open_tree(self, root_dir, include_files=True, max_depth=None, max_items=None, collect_stat=False,
+                   compare=False, changes=True, output_file_path=None, collect_totals=False):
+        """Fornisce il nodo radice come _scan_tree, scrivendo al termine gli eventuali report accanto all'esportazione.
+
+        Con output_file_path e il report dei duplicati attivo, il report viene
+        compilato dai file dello stesso albero, senza una seconda scansione.
+        """
+        duplicates = output_file_path is not None and self.duplicates_report and max_items is None
+        with self._scan_tree(root_dir, include_files, max_depth, max_items, collect_stat or duplicates,
+                             compare, changes, collect_totals) as root_node:
+            yield root_node
+            if duplicates and root_node is not None:
+                self._duplicates_report(root_node, output_file_path, max_depth)
+    
+    @contextmanager
+    def _scan_tree(self, root_dir, include_files=True, max_depth=None, max_items=None, collect_stat=False,
+                   compare=False, changes=True, collect_totals=False):
+        """Fornisce il nodo radice dalla scansione del filesystem o da uno snapshot salvato.
+
+        Con compare, se è impostata una struttura di confronto, fornisce invece
+        l'albero delle differenze tra quella struttura e root_dir; altrimenti la
+        scansione applica il limite di elementi per directory e le regole di
+        compressione, pensati per le esportazioni della struttura e non per
+        snapshot, manifest e duplicati. Con changes e la modalità delle
+        modifiche attiva la scansione riporta solo gli elementi modificati; al
+        termine di un'esportazione (non di un'anteprima) l'indice delle
+        directory viene aggiornato. Snapshot, manifest, duplicati, database
+        SQLite ed esportazioni a colonne passano changes=False perché
+        richiedono l'albero completo. collect_totals
+        richiede i totali delle directory anche se non sono mostrati.
+        """
+        self._scan_top = None
+        self._scan_stats = None
+        if compare and self.compare_base:
+            with self._open_diff_tree(self.compare_base, root_dir, include_files, max_depth) as diff_root:
+                yield diff_root
+        elif is_snapshot_file(root_dir):
+            with Snapshot(root_dir) as snapshot:
+                yield snapshot.root
+        elif changes and self.changes_only:
+            started = time.time()
+            recorded = self.change_index.get(root_dir)
+            since = self.changes_since
+            if since is None:
+                since = recorded[0] if recorded is not None else 0.0
+            root, directories = self.scanner.scan_changes(root_dir, since, recorded[1] if recorded else None,
+                                                          include_files, max_depth)
+            yield root
+            if max_items is None and root is not None:
+                self.change_index.update(root_dir, started, directories)
+                self._save_change_index()
+        else:
+            collapse = self.collapse_rules if compare else None
+            # Il report dei più grandi/recenti richiede dimensioni, date e totali delle directory
+            top_report = compare and self.top_n > 0 and max_items is None
+            # Le statistiche richiedono le dimensioni dei file
+            stats = compare and self.show_stats and max_items is None
+            collect_stat = collect_stat or top_report or stats
+            # I totali non hanno senso su un'anteprima troncata
+            collect_totals = ((collect_totals or self.show_totals or top_report
+                               or (collapse is not None and collapse.uses_totals)) and max_items is None)
+            breadth_first = self.preview_breadth_first and max_items is not None
+            max_entries = self.max_entries_per_dir if compare else None
+            # I file riassunti non sono nell'albero: report e statistiche li ricevono dallo scanner
+            if top_report:
+                self._scan_top = TopReport(self.top_n)
+            if stats:
+                self._scan_stats = TreeStats()
+            observer = self._file_observer(root_dir) if top_report or stats else None
+            yield self.scanner.scan(root_dir, include_files, max_depth, max_items, collect_stat, collect_totals,
+                                    breadth_first, max_entries, collapse, observer)
+    
+    def _file_observer(self, root_dir):
+        """Restituisce la funzione con cui lo scanner passa i file ai report compilati durante la scansione"""
+        prefix_length = len(os.path.join(str(Path(root_dir)), ''))
+        top = self._scan_top
+        stats = self._scan_stats
+        
+        def observe(path, stat_result):
+            relative_path = path[prefix_length:].replace(os.sep, '/')
+            if top is not None:
+                top.add_file(relative_path, stat_result.st_size, stat_result.st_mtime)
+            if stats is not None:
+                stats.add_file(relative_path, stat_result.st_size)
+        return observe
+    
+    @contextmanager
+    def _open_diff_tree(self, old_dir, new_dir, include_files=True, max_depth=None):
+        """Fornisce l'albero delle differenze tra due strutture (directory o snapshot).
+
+        Gli hash di Merkle vengono usati per saltare i sottoalberi invariati solo
+        se sono confrontabili. Le directory ricevono gli hash nella modalità dello
+        snapshot confrontato, se ne contiene, altrimenti in quella impostata con
+        set_merkle_mode (in modalità contenuto i file vengono confrontati per SHA-256).
+        """
+        with self._open_tree(old_dir, include_files, max_depth, collect_stat=True, changes=False) as old_root, \
+                self._open_tree(new_dir, include_files, max_depth, collect_stat=True, changes=False) as new_root:
+            if old_root is None or new_root is None:
+                yield None
+                return
+            
+            modes = [root.snapshot.merkle_mode if is_snapshot_file(path) else None
+                     for path, root in ((old_dir, old_root), (new_dir, new_root))]
+            target_mode = modes[0] or modes[1] or self.merkle_mode
+            if target_mode:
+                for index, root in enumerate((old_root, new_root)):
+                    if modes[index] is None and isinstance(root, ScanNode):
+                        compute_merkle(root, target_mode, self.hash_cache)
+                        modes[index] = target_mode
+                self._save_hash_cache()
+            
+            use_digests = modes[0] is not None and modes[0] == modes[1]
+            yield build_diff_tree(old_root, new_root, use_digests, include_files, max_depth)
+    
+    def _change_label(self, node):
+        """Restituisce l'indicatore testuale della differenza di un elemento (vuoto se assente)"""
+        change = getattr(node, 'change', None)
+        return f" [{CHANGE_MARKERS[change]}]" if change else ''
+    
+    def _html_change(self, node):
+        """Restituisce lo span HTML con l'indicatore della differenza di un elemento"""
+        change = getattr(node, 'change', None)
+        return f'<span class="change-{change}">{self._change_label(node)}</span>' if change else ''
+    
+    def _timeout_label(self, node):
+        """Restituisce l'annotazione delle directory non elencate entro il tempo massimo o la durata massima"""
+        if getattr(node, 'timed_out', False):
+            return " [timeout]"
+        return " [troncata]" if getattr(node, 'truncated', False) else ''
+    
+    def _dir_label(self, node):
+        """Restituisce tutte le annotazioni testuali di una directory (differenza, timeout, totali)"""
+        return (f"{self._change_label(node)}{self._timeout_label(node)}"
+                f"{self._collapsed_label(node) or self._totals_label(node)}")
+    
+    def _collapsed_label(self, node):
+        """Restituisce il riepilogo di una directory compressa (vuoto se la directory è espansa)"""
+        if not getattr(node, 'collapsed', False):
+            return ''
+        totals = node.totals
+        if totals is None:
+            return " (contenuto non espanso)"
+        partial = ", parziali" if totals.truncated else ''
+        return f" ({totals.files} file, {totals.dirs} dir, {format_file_size(totals.size)}{partial})"
+    
+    def _html_dir_label(self, node):
+        """Restituisce tutte le annotazioni HTML di una directory"""
+        timeout = self._timeout_label(node)
+        timeout = f'<span class="timeout">{timeout}</span>' if timeout else ''
+        return f"{self._html_change(node)}{timeout}{self._html_totals(node)}"
+    
+    def _totals_label(self, node):
+        """Restituisce l'annotazione testuale dei totali di una directory (vuota se non disponibili)"""
+        totals = getattr(node, 'totals', None)
+        if totals is None or not self.show_totals:
+            return ''
+        partial = ", parziali" if totals.truncated else ''
+        return (f" [{format_file_size(totals.size)}, {format_file_size(totals.allocated)} su disco, "
+                f"{totals.files} file, {totals.dirs} dir{partial}]")
+    
+    def _totals_attributes(self, node):
+        """Restituisce i totali di una directory come dizionario (vuoto se non disponibili)"""
+        totals = getattr(node, 'totals', None)
+        if totals is None or not (self.show_totals or getattr(node, 'collapsed', False)):
+            return {}
+        attributes = {"size": totals.size, "allocated": totals.allocated,
+                      "files": totals.files, "dirs": totals.dirs}
+        if totals.truncated:
+            attributes["truncated"] = True
+        return attributes
+    
+    def _visible_children(self, node, depth, max_depth=None, include_files=True):
+        """Restituisce i figli da rappresentare (directory prima, poi file, poi l'eventuale riepilogo degli omessi)"""
+        show_dirs = max_depth is None or depth + 1 <= max_depth
+        children = [entry for entry in node.children
+                    if (show_dirs if entry.is_dir else include_files)]
+        omitted = getattr(node, 'omitted', None)
+        if omitted is not None:
+            children.append(omitted)
+        return children
+    
+    def _child_lister(self, max_depth=None, include_files=True):
+        """Restituisce la funzione (nodo, profondità) -> figli esportati, per le esportazioni scritte per righe"""
+        def children(node, depth):
+            return [entry for entry in self._visible_children(node, depth, max_depth, include_files)
+                    if not isinstance(entry, OmittedEntries)]
+        return children
+    
+    def _top_report(self, root_node, output_file_path):
+        """Compila il report dei più grandi/recenti; in modalità file separato lo scrive e restituisce None"""
+        if self.top_n <= 0 or root_node is None:
+            return None
+        if self._scan_top is not None:
+            report = self._scan_top
+            report.add_directories(root_node)
+        else:
+            report = TopReport.from_tree(root_node, self.top_n)
+        if not self.top_report_file:
+            return report
+        with open(self._side_file(output_file_path, ".top.txt"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(self._top_report_lines(report)) + "\n")
+        return None
+    
+    @staticmethod
+    def _side_file(output_file_path, suffix):
+        """Percorso di un report accanto all'esportazione (x.json.gz -> x<suffix>)"""
+        report_path = Path(output_file_path)
+        if detect_compression(report_path) is not None:
+            report_path = report_path.with_suffix('')
+        return str(report_path.with_name(report_path.stem + suffix))
+    
+    def _top_report_lines(self, report):
+        """Restituisce le righe di testo del report dei più grandi/recenti"""
+        lines = ["File più grandi:"]
+        lines.extend(f"    {format_file_size(size)}  {path}" for size, path in report.largest_files.items())
+        lines.append("File modificati più di recente:")
+        lines.extend(f"    {format_timestamp(mtime)}  {path}" for mtime, path in report.newest_files.items())
+        lines.append("Directory più grandi:")
+        lines.extend(f"    {format_file_size(size)}  {path}/" for size, path in report.largest_dirs.items())
+        return lines
+    
+    def _top_report_dict(self, report):
+        """Restituisce il report dei più grandi/recenti come dizionario (JSON)"""
+        return {
+            "largest_files": [{"path": path, "size": size} for size, path in report.largest_files.items()],
+            "newest_files": [{"path": path, "mtime": mtime} for mtime, path in report.newest_files.items()],
+            "largest_dirs": [{"path": path, "size": size} for size, path in report.largest_dirs.items()]
+        }
+    
+    def _tree_stats(self, root_node):
+        """Calcola le statistiche dell'albero esportato (None se disattivate)"""
+        if not self.show_stats or root_node is None:
+            return None
+        if self._scan_stats is not None:
+            return self._scan_stats
+        return TreeStats.from_tree(root_node)
+    
+    def _stats_lines(self, stats):
+        """Restituisce le righe di testo delle statistiche"""
+        lines = ["Statistiche per estensione:"]
+        lines.extend(f"    {extension or '(senza estensione)'}  {files} file, {format_file_size(size)}"
+                     for extension, files, size in stats.extensions.items(by_size=True))
+        lines.append("Statistiche per livello:")
+        lines.extend(f"    {depth}  {files} file, {format_file_size(size)}"
+                     for depth, files, size in stats.depths.items())
+        lines.append("Statistiche per directory di primo livello:")
+        lines.extend(f"    {name + '/' if name else '(radice)'}  {files} file, {format_file_size(size)}"
+                     for name, files, size in stats.top_level.items(by_size=True))
+        return lines
+    
+    def _stats_dict(self, stats):
+        """Restituisce le statistiche come dizionario (JSON)"""
+        return {
+            "extensions": [{"extension": extension, "files": files, "size": size}
+                           for extension, files, size in stats.extensions.items(by_size=True)],
+            "depths": [{"depth": depth, "files": files, "size": size}
+                       for depth, files, size in stats.depths.items()],
+            "top_level": [{"name": name, "files": files, "size": size}
+                          for name, files, size in stats.top_level.items(by_size=True)]
+        }
+    
     def export_structure(self, root_dir, output_file_path, include_files=True, max_depth=None, indent_style='spaces'):
         """Esporta la struttura di directory nel file specificato in formato testo"""
+        output_file_path = compressed_path(output_file_path, self.compression)
         try:
-            with open(output_file_path, 'w', encoding='utf-8') as output_file:
-                if indent_style == 'tree':
-                    self._print_structure_tree(root_dir, output_file, depth=0, 
-                                             max_depth=max_depth, include_files=include_files, is_last=True)
-                else:
-                    self._print_structure_styled(root_dir, output_file, prefix='', depth=0, 
-                                               max_depth=max_depth, include_files=include_files, indent_style=indent_style)
+            with self._open_tree(root_dir, include_files, max_depth, compare=True,
+                                 output_file_path=output_file_path) as root_node, \
+                    open_text_output(output_file_path, self.compression) as output_file:
+                top_report = self._top_report(root_node, output_file_path)
+                if top_report is not None:
+                    output_file.write("\n".join(self._top_report_lines(top_report)) + "\n\n")
+                if root_node is not None:
+                    if indent_style == 'tree':
+                        self._print_structure_tree(root_node, output_file, depth=0, 
+                                                 max_depth=max_depth, include_files=include_files, is_last=True)
+                    else:
+                        self._print_structure_styled(root_node, output_file, prefix='', depth=0, 
+                                                   max_depth=max_depth, include_files=include_files, indent_style=indent_style)
+                stats = self._tree_stats(root_node)
+                if stats is not None:
+                    output_file.write("\n" + "\n".join(self._stats_lines(stats)) + "\n")
             return True, f"La struttura è stata esportata in '{output_file_path}'."
         except Exception as e:
             return False, f"Errore durante l'esportazione: {e}"
     
-    def _print_structure_styled(self, root_dir, file_handle, prefix='', depth=0, max_depth=None, include_files=True, indent_style='spaces'):
+    def _print_structure_styled(self, node, file_handle, prefix='', depth=0, max_depth=None, include_files=True, indent_style='spaces'):
         """Stampa la struttura con stile personalizzato"""
-        root_path = Path(root_dir)
-        if self.filter_manager.is_excluded_dir(root_path.name):
-            return
-        
-        if max_depth is not None and depth > max_depth:
-            return
-        
         style = self.indent_styles.get(indent_style, self.indent_styles['spaces'])
         
         # Stampa la directory corrente
-        dir_line = f"{prefix}{style['dir_prefix']}{root_path.name}/\n"
-        file_handle.write(dir_line)
+        file_handle.write(f"{prefix}{style['dir_prefix']}{node.name}/{self._dir_label(node)}\n")
         
-        # Calcola il nuovo prefisso
-        if indent_style == 'spaces':
-            new_prefix = prefix + style['indent_char']
-        else:
-            new_prefix = prefix + style['indent_char']
+        new_prefix = prefix + style['indent_char']
         
-        try:
-            entries = sorted(root_path.iterdir(), key=lambda e: (not e.is_dir(), e.name))
-            
-            for entry in entries:
-                if entry.is_dir():
-                    self._print_structure_styled(entry, file_handle, new_prefix, 
-                                               depth + 1, max_depth, include_files, indent_style)
-                elif include_files and self.filter_manager.is_included_file(entry):
-                    file_line = f"{new_prefix}{style['file_prefix']}{entry.name}\n"
-                    file_handle.write(file_line)
-        except PermissionError:
-            pass
-    
-    def _print_structure_tree(self, root_dir, file_handle, depth=0, max_depth=None, include_files=True, is_last=True, prefix=''):
+        for entry in self._visible_children(node, depth, max_depth, include_files):
+            if entry.is_dir:
+                self._print_structure_styled(entry, file_handle, new_prefix, 
+                                           depth + 1, max_depth, include_files, indent_style)
+            else:
+                file_handle.write(f"{new_prefix}{style['file_prefix']}{entry.name}{self._change_label(entry)}\n")
+    
+    def _print_structure_tree(self, node, file_handle, depth=0, max_depth=None, include_files=True, is_last=True, prefix=''):
         """Stampa la struttura in stile albero con caratteri ASCII"""
-        root_path = Path(root_dir)
-        if self.filter_manager.is_excluded_dir(root_path.name):
-            return
-        
-        if max_depth is not None and depth > max_depth:
-            return
-        
         # Caratteri per l'albero
         if depth == 0:
-            current_prefix = ''
-            dir_line = f"{root_path.name}/\n"
+            dir_line = f"{node.name}/{self._dir_label(node)}\n"
         else:
             tree_char = '└── ' if is_last else '├── '
-            current_prefix = prefix + tree_char
-            dir_line = f"{current_prefix}{root_path.name}/\n"
+            dir_line = f"{prefix}{tree_char}{node.name}/{self._dir_label(node)}\n"
         
         file_handle.write(dir_line)
         
-        try:
-            entries = sorted(root_path.iterdir(), key=lambda e: (not e.is_dir(), e.name))
-            
-            # Separa directory e file
-            dirs = [e for e in entries if e.is_dir() and not self.filter_manager.is_excluded_dir(e.name)]
-            files = [e for e in entries if e.is_file() and include_files and self.filter_manager.is_included_file(e)]
-            
-            all_items = dirs + files
+        new_prefix = '' if depth == 0 else prefix + ('    ' if is_last else '│   ')
+        all_items = self._visible_children(node, depth, max_depth, include_files)
+        
+        for i, entry in enumerate(all_items):
+            is_last_item = (i == len(all_items) - 1)
             
-            for i, entry in enumerate(all_items):
-                is_last_item = (i == len(all_items) - 1)
-                
-                if depth == 0:
-                    new_prefix = ''
-                else:
-                    new_prefix = prefix + ('    ' if is_last else '│   ')
-                
-                if entry.is_dir():
-                    self._print_structure_tree(entry, file_handle, depth + 1, max_depth, 
-                                             include_files, is_last_item, new_prefix)
-                else:
-                    tree_char = '└── ' if is_last_item else '├── '
-                    if depth == 0:
-                        file_line = f"{tree_char}{entry.name}\n"
-                    else:
-                        file_line = f"{new_prefix}{tree_char}{entry.name}\n"
-                    file_handle.write(file_line)
-        except PermissionError:
-            pass
+            if entry.is_dir:
+                self._print_structure_tree(entry, file_handle, depth + 1, max_depth, 
+                                         include_files, is_last_item, new_prefix)
+            else:
+                tree_char = '└── ' if is_last_item else '├── '
+                file_handle.write(f"{new_prefix}{tree_char}{entry.name}{self._change_label(entry)}\n")
     
     def export_structure_html(self, root_dir, output_file_path, include_files=True, max_depth=None, indent_style='spaces'):
         """Esporta la struttura di directory in formato HTML"""
-        root_path = Path(root_dir)
-        
-        # CSS aggiornato per supportare i diversi stili
-        css_styles = self._get_html_css_for_style(indent_style)
-        
-        html = f"""<!DOCTYPE html>
+        output_file_path = compressed_path(output_file_path, self.compression)
+        try:
+            with self._open_tree(root_dir, include_files, max_depth, compare=True,
+                                 output_file_path=output_file_path) as root_node:
+                root_name = root_node.name if root_node is not None else Path(root_dir).name
+                
+                # CSS aggiornato per supportare i diversi stili
+                css_styles = self._get_html_css_for_style(indent_style)
+                
+                parts = [f"""<!DOCTYPE html>
         <html>
         <head>
             <meta charset="UTF-8">
-            <title>Struttura Directory: {root_path.name}</title>
+            <title>Struttura Directory: {root_name}</title>
             <style>
                 {css_styles}
             </style>
         </head>
         <body>
-            <h1>Struttura Directory: {root_path.name}</h1>
-            <div class="tree-container">
-        """
-        
-        if indent_style == 'tree':
-            html += self._build_structure_html_tree(root_path, depth=0, max_depth=max_depth, include_files=include_files)
-        else:
-            html += self._build_structure_html_styled(root_path, depth=0, max_depth=max_depth, include_files=include_files, indent_style=indent_style)
-        
-        html += """    </div>
-        </body>
-        </html>"""
-        
-        try:
-            with open(output_file_path, 'w', encoding='utf-8') as f:
-                f.write(html)
+            <h1>Struttura Directory: {root_name}</h1>
+"""]
+                top_report = self._top_report(root_node, output_file_path)
+                if top_report is not None:
+                    top_lines = "\n".join(html.escape(line) for line in self._top_report_lines(top_report))
+                    parts.append(f'            <pre class="top-report">{top_lines}</pre>\n')
+                parts.append("""            <div class="tree-container">
+        """)
+                
+                if root_node is not None:
+                    if indent_style == 'tree':
+                        self._build_structure_html_tree(root_node, parts, depth=0, max_depth=max_depth, include_files=include_files)
+                    else:
+                        self._build_structure_html_styled(root_node, parts, depth=0, max_depth=max_depth, include_files=include_files, indent_style=indent_style)
+                
+                parts.append("""    </div>
+""")
+                stats = self._tree_stats(root_node)
+                if stats is not None:
+                    stats_lines = "\n".join(html.escape(line) for line in self._stats_lines(stats))
+                    parts.append(f'            <pre class="stats">{stats_lines}</pre>\n')
+                parts.append("""        </body>
+        </html>""")
+            
+            with open_text_output(output_file_path, self.compression) as f:
+                f.writelines(parts)
             return True, f"La struttura è stata esportata in formato HTML in '{output_file_path}'."
         except Exception as e:
             return False, f"Errore durante l'esportazione HTML: {e}"
@@ -195,6 +669,23 @@ class DirectoryExporter:
                 .file { color: #333; }
                 .tree-line { margin: 2px 0; }
         """
+        if self.show_totals or self.collapse_rules:
+            base_css += """    .totals { color: #888; }
+        """
+        if self.top_n and not self.top_report_file:
+            base_css += """    .top-report { color: #555; }
+        """
+        if self.show_stats:
+            base_css += """    .stats { color: #555; }
+        """
+        if self.scanner.listing_timeout or self.scanner.max_duration:
+            base_css += """    .timeout { color: #cf222e; }
+        """
+        if self.compare_base:
+            base_css += """    .change-added { color: #1a7f37; }
+                .change-removed { color: #cf222e; }
+                .change-modified { color: #9a6700; }
+        """
         
         if indent_style == 'tree':
             return base_css + """
@@ -203,232 +694,479 @@ class DirectoryExporter:
         else:
             return base_css
     
-    def _build_structure_html_styled(self, path, depth=0, max_depth=None, include_files=True, indent_style='spaces'):
+    def _build_structure_html_styled(self, node, parts, depth=0, max_depth=None, include_files=True, indent_style='spaces'):
         """Costruisce il codice HTML per la struttura con stile personalizzato"""
-        if self.filter_manager.is_excluded_dir(path.name):
-            return ""
-        
-        if max_depth is not None and depth > max_depth:
-            return ""
-        
         style = self.indent_styles.get(indent_style, self.indent_styles['spaces'])
         indent = style['indent_char'] * depth
         
-        result = f'<div class="tree-line"><span class="directory">{indent}{style["dir_prefix"]}{path.name}/</span></div>\n'
+        parts.append(f'<div class="tree-line"><span class="directory">{indent}{style["dir_prefix"]}{node.name}/</span>'
+                     f'{self._html_dir_label(node)}</div>\n')
         
-        try:
-            entries = sorted(path.iterdir(), key=lambda e: (not e.is_dir(), e.name))
-            
-            for entry in entries:
-                if entry.is_dir():
-                    if not self.filter_manager.is_excluded_dir(entry.name):
-                        result += self._build_structure_html_styled(entry, depth + 1, max_depth, include_files, indent_style)
-                elif include_files and self.filter_manager.is_included_file(entry):
-                    file_indent = style['indent_char'] * (depth + 1)
-                    result += f'<div class="tree-line"><span class="file">{file_indent}{style["file_prefix"]}{entry.name}</span></div>\n'
-        except PermissionError:
-            pass
-            
-        return result
+        file_indent = style['indent_char'] * (depth + 1)
+        for entry in self._visible_children(node, depth, max_depth, include_files):
+            if entry.is_dir:
+                self._build_structure_html_styled(entry, parts, depth + 1, max_depth, include_files, indent_style)
+            else:
+                parts.append(f'<div class="tree-line"><span class="file">{file_indent}{style["file_prefix"]}{entry.name}</span>'
+                             f'{self._html_change(entry)}</div>\n')
+    
+    def _html_totals(self, node):
+        """Restituisce lo span HTML con i totali di una directory"""
+        label = self._collapsed_label(node) or self._totals_label(node)
+        return f'<span class="totals">{label}</span>' if label else ''
     
-    def _build_structure_html_tree(self, path, depth=0, max_depth=None, include_files=True, is_last=True, prefix=''):
+    def _build_structure_html_tree(self, node, parts, depth=0, max_depth=None, include_files=True, is_last=True, prefix=''):
         """Costruisce il codice HTML per la struttura in stile albero"""
-        if self.filter_manager.is_excluded_dir(path.name):
-            return ""
-        
-        if max_depth is not None and depth > max_depth:
-            return ""
-        
         if depth == 0:
-            result = f'<div class="tree-line"><span class="directory">{path.name}/</span></div>\n'
+            parts.append(f'<div class="tree-line"><span class="directory">{node.name}/</span>'
+                         f'{self._html_dir_label(node)}</div>\n')
             current_prefix = ''
         else:
             tree_char = '└── ' if is_last else '├── '
-            result = f'<div class="tree-line"><span class="directory">{prefix}{tree_char}{path.name}/</span></div>\n'
+            parts.append(f'<div class="tree-line"><span class="directory">{prefix}{tree_char}{node.name}/</span>'
+                         f'{self._html_dir_label(node)}</div>\n')
             current_prefix = prefix + ('    ' if is_last else '│   ')
         
-        try:
-            entries = sorted(path.iterdir(), key=lambda e: (not e.is_dir(), e.name))
-            dirs = [e for e in entries if e.is_dir() and not self.filter_manager.is_excluded_dir(e.name)]
-            files = [e for e in entries if e.is_file() and include_files and self.filter_manager.is_included_file(e)]
-            
-            all_items = dirs + files
-            
-            for i, entry in enumerate(all_items):
-                is_last_item = (i == len(all_items) - 1)
-                
-                if entry.is_dir():
-                    result += self._build_structure_html_tree(entry, depth + 1, max_depth, include_files, is_last_item, current_prefix)
-                else:
-                    tree_char = '└── ' if is_last_item else '├── '
-                    if depth == 0:
-                        result += f'<div class="tree-line"><span class="file">{tree_char}{entry.name}</span></div>\n'
-                    else:
-                        result += f'<div class="tree-line"><span class="file">{current_prefix}{tree_char}{entry.name}</span></div>\n'
-        except PermissionError:
-            pass
+        all_items = self._visible_children(node, depth, max_depth, include_files)
+        
+        for i, entry in enumerate(all_items):
+            is_last_item = (i == len(all_items) - 1)
             
-        return result
+            if entry.is_dir:
+                self._build_structure_html_tree(entry, parts, depth + 1, max_depth, include_files, is_last_item, current_prefix)
+            else:
+                tree_char = '└── ' if is_last_item else '├── '
+                parts.append(f'<div class="tree-line"><span class="file">{current_prefix}{tree_char}{entry.name}</span>'
+                             f'{self._html_change(entry)}</div>\n')
     
     # Metodi esistenti per JSON e XML rimangono invariati
     def export_structure_json(self, root_dir, output_file_path, include_files=True, max_depth=None):
         """Esporta la struttura di directory in formato JSON"""
-        root_path = Path(root_dir)
-        structure = self._build_structure_dict(root_path, depth=0, max_depth=max_depth, include_files=include_files)
-        
+        output_file_path = compressed_path(output_file_path, self.compression)
         try:
-            with open(output_file_path, 'w', encoding='utf-8') as f:
-                json.dump(structure, f, indent=4)
+            with self._open_tree(root_dir, include_files, max_depth, compare=True,
+                                 output_file_path=output_file_path) as root_node:
+                structure = None
+                if root_node is not None:
+                    if self.json_compact:
+                        structure = self._build_compact_document(root_node, max_depth, include_files)
+                    else:
+                        structure = self._build_structure_dict(root_node, depth=0, max_depth=max_depth, include_files=include_files)
+                    top_report = self._top_report(root_node, output_file_path)
+                    if top_report is not None:
+                        structure["top"] = self._top_report_dict(top_report)
+                    stats = self._tree_stats(root_node)
+                    if stats is not None:
+                        structure["stats"] = self._stats_dict(stats)
+            
+            with open_text_output(output_file_path, self.compression) as f:
+                if self.json_compact:
+                    json.dump(structure, f, separators=(',', ':'), ensure_ascii=False)
+                else:
+                    json.dump(structure, f, indent=4)
             return True, f"La struttura è stata esportata in formato JSON in '{output_file_path}'."
         except Exception as e:
             return False, f"Errore durante l'esportazione JSON: {e}"
     
     def export_structure_xml(self, root_dir, output_file_path, include_files=True, max_depth=None):
         """Esporta la struttura di directory in formato XML"""
-        root_path = Path(root_dir)
-        root_elem = ET.Element("directory", name=root_path.name)
-        
-        self._build_structure_xml(root_path, root_elem, depth=0, max_depth=max_depth, include_files=include_files)
-        
+        output_file_path = compressed_path(output_file_path, self.compression)
         try:
+            with self._open_tree(root_dir, include_files, max_depth, compare=True,
+                                 output_file_path=output_file_path) as root_node:
+                root_name = root_node.name if root_node is not None else Path(root_dir).name
+                root_elem = ET.Element("directory", name=root_name)
+                if root_node is not None:
+                    self._set_xml_dir_attributes(root_elem, root_node)
+                
+                if root_node is not None:
+                    top_report = self._top_report(root_node, output_file_path)
+                    if top_report is not None:
+                        self._build_top_report_xml(top_report, root_elem)
+                    self._build_structure_xml(root_node, root_elem, depth=0, max_depth=max_depth, include_files=include_files)
+                    stats = self._tree_stats(root_node)
+                    if stats is not None:
+                        self._build_stats_xml(stats, root_elem)
+            
             rough_string = ET.tostring(root_elem, 'utf-8')
             reparsed = minidom.parseString(rough_string)
             pretty_xml = reparsed.toprettyxml(indent="  ")
             
-            with open(output_file_path, 'w', encoding='utf-8') as f:
+            with open_text_output(output_file_path, self.compression) as f:
                 f.write(pretty_xml)
                 
             return True, f"La struttura è stata esportata in formato XML in '{output_file_path}'."
         except Exception as e:
             return False, f"Errore durante l'esportazione XML: {e}"
     
-    # ----- METODI DI SUPPORTO ESISTENTI -----
+    def export_structure_snapshot(self, root_dir, output_file_path, include_files=True, max_depth=None):
+        """Esporta la struttura in uno snapshot binario apribile istantaneamente tramite mmap"""
+        try:
+            with self._open_tree(root_dir, include_files, max_depth, collect_stat=True, changes=False,
+                                 output_file_path=output_file_path) as root_node:
+                if root_node is None:
+                    return False, "Errore durante l'esportazione snapshot: la directory radice è esclusa dai filtri."
+                merkle_mode = self.merkle_mode
+                sorted_by_name = self.scanner.sort_order == SORT_NAME
+                if is_snapshot_file(root_dir):
+                    # Gli hash e l'ordine di uno snapshot sorgente vengono copiati così come sono
+                    merkle_mode = root_node.snapshot.merkle_mode
+                    sorted_by_name = bool(root_node.snapshot.flags & SNAPSHOT_SORTED_BY_NAME)
+                elif merkle_mode:
+                    compute_merkle(root_node, merkle_mode, self.hash_cache)
+                    self._save_hash_cache()
+                count = write_snapshot(root_node, output_file_path, sorted_by_name=sorted_by_name,
+                                       merkle_mode=merkle_mode)
+            return True, f"Lo snapshot ({count} elementi) è stato esportato in '{output_file_path}'."
+        except Exception as e:
+            return False, f"Errore durante l'esportazione snapshot: {e}"
     
-    def _build_structure_dict(self, path, depth=0, max_depth=None, include_files=True):
-        """Costruisce un dizionario con la struttura della directory per l'esportazione JSON"""
-        if self.filter_manager.is_excluded_dir(path.name):
-            return None
+    def export_structure_database(self, root_dir, output_file_path, include_files=True, max_depth=None):
+        """Esporta la struttura in un database SQLite interrogabile con SQL (tabella entries)"""
+        try:
+            with self._open_tree(root_dir, include_files, max_depth, collect_stat=True, changes=False,
+                                 output_file_path=output_file_path, collect_totals=True) as root_node:
+                if root_node is None:
+                    return False, "Errore durante l'esportazione SQLite: la directory radice è esclusa dai filtri."
+                count = write_database(root_node, output_file_path,
+                                       children=self._child_lister(max_depth, include_files))
+            return True, f"Il database ({count} elementi) è stato esportato in '{output_file_path}'."
+        except Exception as e:
+            return False, f"Errore durante l'esportazione SQLite: {e}"
+    
+    def export_structure_columnar(self, root_dir, output_file_path, include_files=True, max_depth=None):
+        """Esporta gli elementi per colonne: Parquet se pyarrow è installato, altrimenti CSV"""
+        if not pyarrow_available():
+            output_file_path = compressed_path(output_file_path, self.compression)
+        try:
+            with self._open_tree(root_dir, include_files, max_depth, collect_stat=True, changes=False,
+                                 output_file_path=output_file_path, collect_totals=True) as root_node:
+                if root_node is None:
+                    return False, "Errore durante l'esportazione a colonne: la directory radice è esclusa dai filtri."
+                count = write_columnar(root_node, output_file_path, compression=self.compression,
+                                       children=self._child_lister(max_depth, include_files))
+            return True, f"Gli elementi ({count}) sono stati esportati per colonne in '{output_file_path}'."
+        except Exception as e:
+            return False, f"Errore durante l'esportazione a colonne: {e}"
+    
+    def export_duplicates_report(self, root_dir, output_file_path, max_depth=None):
+        """Esporta il report dei file duplicati tra i file inclusi nella struttura"""
+        try:
+            with self._open_tree(root_dir, True, max_depth, collect_stat=True, changes=False) as root_node:
+                if root_node is None:
+                    return False, "Errore durante il report dei duplicati: la directory radice è esclusa dai filtri."
+                groups = self._write_duplicates_report(root_node, output_file_path, max_depth)
+            return True, f"Il report dei duplicati ({groups} gruppi) è stato esportato in '{output_file_path}'."
+        except Exception as e:
+            return False, f"Errore durante il report dei duplicati: {e}"
+    
+    def _duplicates_report(self, root_node, output_file_path, max_depth=None):
+        """Scrive il report dei duplicati accanto all'esportazione, annotandone l'esito nel riepilogo"""
+        report_path = self._side_file(output_file_path, ".duplicates.txt")
+        try:
+            groups = self._write_duplicates_report(root_node, report_path, max_depth)
+            self._side_reports.append(
+                f"Il report dei duplicati ({groups} gruppi) è stato esportato in '{report_path}'.")
+        except Exception as e:
+            self._side_reports.append(f"Errore durante il report dei duplicati: {e}")
+    
+    def _write_duplicates_report(self, root_node, output_file_path, max_depth=None):
+        """Scrive il report dei duplicati tra i file dell'albero e restituisce il numero di gruppi"""
+        root_path = root_node.path
+        files = [(entry.path, entry.size) for entry in self._iter_files(root_node, max_depth)]
+        groups = DuplicateFinder(self.hash_cache).find(files)
+        self._save_hash_cache()
+        wasted = sum(group.size * (len(group.paths) - 1) for group in groups)
         
-        if max_depth is not None and depth > max_depth:
-            return None
+        with open(output_file_path, 'w', encoding='utf-8') as f:
+            f.write(f"Report file duplicati: {root_path}\n")
+            f.write(f"Gruppi: {len(groups)}, file ridondanti: {sum(len(g.paths) - 1 for g in groups)}, "
+                    f"spazio recuperabile: {format_file_size(wasted)}\n")
+            for number, group in enumerate(groups, 1):
+                f.write(f"\n[{number}] {len(group.paths)} file da {format_file_size(group.size)} "
+                        f"(sha256 {group.digest})\n")
+                for path in group.paths:
+                    f.write(f"    {os.path.relpath(path, root_path)}\n")
+        return len(groups)
+    
+    def export_structure_manifest(self, root_dir, output_file_path, max_depth=None):
+        """Esporta il manifest dei file inclusi con dimensione, data di modifica e SHA-256"""
+        try:
+            with self._open_tree(root_dir, True, max_depth, changes=False,
+                                 output_file_path=output_file_path) as root_node:
+                if root_node is None:
+                    return False, "Errore durante l'esportazione del manifest: la directory radice è esclusa dai filtri."
+                root_path = root_node.path
+                paths = [entry.path for entry in self._iter_files(root_node, max_depth)]
+            
+            written, unreadable = write_manifest(paths, root_path, output_file_path, self.hash_cache)
+            self._save_hash_cache()
+            
+            message = f"Il manifest ({written} file) è stato esportato in '{output_file_path}'."
+            if unreadable:
+                message += f" {unreadable} file non leggibili sono stati omessi."
+            return True, message
+        except Exception as e:
+            return False, f"Errore durante l'esportazione del manifest: {e}"
+    
+    def verify_manifest(self, root_dir, manifest_path, max_depth=None):
+        """Verifica una directory rispetto a un manifest.
+
+        Restituisce la coppia (esito, messaggio): l'esito è True solo se nessun file
+        risulta modificato, mancante, illeggibile o non elencato nel manifest.
+        """
+        try:
+            entries = read_manifest(manifest_path)
+            with self._open_tree(root_dir, True, max_depth, changes=False) as root_node:
+                current_paths = [] if root_node is None else [
+                    entry.path for entry in self._iter_files(root_node, max_depth)]
+            
+            result = verify_manifest(entries, root_dir, self.hash_cache, current_paths)
+            self._save_hash_cache()
+        except Exception as e:
+            return False, f"Errore durante la verifica del manifest: {e}"
         
-        result = {"name": path.name, "type": "directory", "children": []}
+        lines = [f"Invariati: {len(result.ok)}, modificati: {len(result.modified)}, "
+                 f"mancanti: {len(result.missing)}, illeggibili: {len(result.unreadable)}, "
+                 f"non elencati: {len(result.extra)}."]
+        for label, paths in (("Modificato", result.modified), ("Mancante", result.missing),
+                             ("Illeggibile", result.unreadable), ("Non elencato", result.extra)):
+            lines.extend(f"{label}: {path}" for path in paths[:20])
+            if len(paths) > 20:
+                lines.append(f"{label}: ... (altri {len(paths) - 20})")
         
-        try:
-            for entry in sorted(path.iterdir(), key=lambda e: (not e.is_dir(), e.name)):
-                if entry.is_dir():
-                    child = self._build_structure_dict(entry, depth + 1, max_depth, include_files)
-                    if child:
-                        result["children"].append(child)
-                elif include_files and self.filter_manager.is_included_file(entry):
-                    result["children"].append({
-                        "name": entry.name,
-                        "type": "file",
-                        "extension": entry.suffix
-                    })
-        except PermissionError:
-            pass
+        success = not (result.modified or result.missing or result.unreadable or result.extra)
+        return success, "\n".join(lines)
+    
+    def _iter_files(self, node, max_depth=None):
+        """Restituisce tutti i file visibili dell'albero, visitato in profondità"""
+        stack = [(node, 0)]
+        while stack:
+            current, depth = stack.pop()
+            for entry in self._visible_children(current, depth, max_depth):
+                if entry.is_dir:
+                    stack.append((entry, depth + 1))
+                elif not isinstance(entry, OmittedEntries):
+                    yield entry
+    
+    # ----- METODI DI SUPPORTO ESISTENTI -----
+    
+    def _build_structure_dict(self, node, depth=0, max_depth=None, include_files=True):
+        """Costruisce un dizionario con la struttura della directory per l'esportazione JSON"""
+        result = {"name": node.name, "type": "directory"}
+        change = getattr(node, 'change', None)
+        if change:
+            result["change"] = change
+        if getattr(node, 'timed_out', False):
+            result["timed_out"] = True
+        if getattr(node, 'truncated', False):
+            result["truncated"] = True
+        if getattr(node, 'collapsed', False):
+            result["collapsed"] = True
+        totals = self._totals_attributes(node)
+        if totals:
+            result["totals"] = totals
+        result["children"] = []
+        
+        for entry in self._visible_children(node, depth, max_depth, include_files):
+            if entry.is_dir:
+                result["children"].append(self._build_structure_dict(entry, depth + 1, max_depth, include_files))
+            elif isinstance(entry, OmittedEntries):
+                result["children"].append({"type": "omitted", "count": entry.count, "size": entry.size})
+            else:
+                file_dict = {
+                    "name": entry.name,
+                    "type": "file",
+                    "extension": entry.extension
+                }
+                change = getattr(entry, 'change', None)
+                if change:
+                    file_dict["change"] = change
+                result["children"].append(file_dict)
             
         return result
     
-    def _build_structure_xml(self, path, parent_elem, depth=0, max_depth=None, include_files=True):
+    def _build_compact_document(self, root_node, max_depth=None, include_files=True):
+        """Costruisce il documento JSON compatto (schema in core.compact_json)"""
+        document = {"format": COMPACT_FORMAT, "version": COMPACT_VERSION}
+        strings = None
+        if self.json_string_table:
+            strings = StringTable(self._compact_names(root_node, 0, max_depth, include_files))
+            if strings.strings:
+                document["strings"] = strings.strings
+        document["root"] = self._build_compact_entry(root_node, 0, max_depth, include_files, strings)
+        return document
+    
+    def _compact_names(self, node, depth, max_depth, include_files):
+        """Restituisce i nomi delle voci che compariranno nel JSON compatto"""
+        yield node.name
+        for entry in self._visible_children(node, depth, max_depth, include_files):
+            if entry.is_dir:
+                yield from self._compact_names(entry, depth + 1, max_depth, include_files)
+            elif not isinstance(entry, OmittedEntries):
+                yield entry.name
+    
+    def _build_compact_entry(self, node, depth, max_depth, include_files, strings):
+        """Costruisce la voce compatta di una directory con le voci figlie"""
+        name = strings.ref(node.name) if strings is not None else node.name
+        children = []
+        for entry in self._visible_children(node, depth, max_depth, include_files):
+            if entry.is_dir:
+                children.append(self._build_compact_entry(entry, depth + 1, max_depth, include_files, strings))
+            elif isinstance(entry, OmittedEntries):
+                children.append([ENTRY_OMITTED, entry.count, entry.size])
+            else:
+                file_entry = [ENTRY_FILE, strings.ref(entry.name) if strings is not None else entry.name]
+                attributes = compact_attributes(change=getattr(entry, 'change', None))
+                if attributes:
+                    file_entry.append(attributes)
+                children.append(file_entry)
+        result = [ENTRY_DIRECTORY, name, children]
+        attributes = compact_attributes(getattr(node, 'change', None),
+                                        getattr(node, 'timed_out', False),
+                                        getattr(node, 'truncated', False),
+                                        getattr(node, 'collapsed', False),
+                                        self._totals_attributes(node))
+        if attributes:
+            result.append(attributes)
+        return result
+    
+    def _build_structure_xml(self, node, parent_elem, depth=0, max_depth=None, include_files=True):
         """Costruisce un elemento XML con la struttura della directory"""
-        if self.filter_manager.is_excluded_dir(path.name):
-            return
-        
-        if max_depth is not None and depth > max_depth:
-            return
-        
-        try:
-            for entry in sorted(path.iterdir(), key=lambda e: (not e.is_dir(), e.name)):
-                if entry.is_dir():
-                    if not self.filter_manager.is_excluded_dir(entry.name):
-                        dir_elem = ET.SubElement(parent_elem, "directory", name=entry.name)
-                        self._build_structure_xml(entry, dir_elem, depth + 1, max_depth, include_files)
-                elif include_files and self.filter_manager.is_included_file(entry):
-                    ET.SubElement(parent_elem, "file", name=entry.name, extension=entry.suffix)
-        except PermissionError:
-            pass
+        for entry in self._visible_children(node, depth, max_depth, include_files):
+            if entry.is_dir:
+                dir_elem = ET.SubElement(parent_elem, "directory", name=entry.name)
+                self._set_xml_dir_attributes(dir_elem, entry)
+                self._build_structure_xml(entry, dir_elem, depth + 1, max_depth, include_files)
+            elif isinstance(entry, OmittedEntries):
+                ET.SubElement(parent_elem, "omitted", count=str(entry.count), size=str(entry.size))
+            else:
+                file_elem = ET.SubElement(parent_elem, "file", name=entry.name, extension=entry.extension)
+                self._set_xml_change(file_elem, entry)
+    
+    def _build_top_report_xml(self, report, parent_elem):
+        """Aggiunge il report dei più grandi/recenti come elemento XML"""
+        top_elem = ET.SubElement(parent_elem, "top")
+        for section, ranking, attribute in (("largest_files", report.largest_files, "size"),
+                                            ("newest_files", report.newest_files, "mtime"),
+                                            ("largest_dirs", report.largest_dirs, "size")):
+            section_elem = ET.SubElement(top_elem, section)
+            for key, path in ranking.items():
+                ET.SubElement(section_elem, "entry", {"path": path, attribute: str(key)})
+    
+    def _build_stats_xml(self, stats, parent_elem):
+        """Aggiunge le statistiche come elemento XML"""
+        stats_elem = ET.SubElement(parent_elem, "stats")
+        for extension, files, size in stats.extensions.items(by_size=True):
+            ET.SubElement(stats_elem, "extension", name=extension, files=str(files), size=str(size))
+        for depth, files, size in stats.depths.items():
+            ET.SubElement(stats_elem, "depth", level=str(depth), files=str(files), size=str(size))
+        for name, files, size in stats.top_level.items(by_size=True):
+            ET.SubElement(stats_elem, "top_level", name=name, files=str(files), size=str(size))
+    
+    def _set_xml_change(self, elem, node):
+        """Aggiunge il tipo di differenza di un elemento come attributo dell'elemento XML"""
+        change = getattr(node, 'change', None)
+        if change:
+            elem.set("change", change)
+    
+    def _set_xml_dir_attributes(self, elem, node):
+        """Aggiunge all'elemento XML di una directory differenza, timeout e totali"""
+        self._set_xml_change(elem, node)
+        if getattr(node, 'timed_out', False):
+            elem.set("timed_out", "true")
+        if getattr(node, 'truncated', False):
+            elem.set("truncated", "true")
+        if getattr(node, 'collapsed', False):
+            elem.set("collapsed", "true")
+        self._set_xml_totals(elem, node)
+    
+    def _set_xml_totals(self, elem, node):
+        """Aggiunge i totali di una directory come attributi dell'elemento XML"""
+        for key, value in self._totals_attributes(node).items():
+            if key == "truncated":
+                # Distinto dall'attributo truncated della directory stessa
+                elem.set("totals_truncated", "true")
+            else:
+                elem.set(key, str(value))
     
     def generate_preview(self, root_dir, max_items=100, include_files=True, max_depth=None, indent_style='spaces'):
         """Genera un'anteprima della struttura senza salvarla su file"""
         lines = []
-        if indent_style == 'tree':
-            self._generate_preview_tree(root_dir, lines, max_items, depth=0, max_depth=max_depth, include_files=include_files)
-        else:
-            self._generate_preview_styled(root_dir, lines, max_items, prefix='', depth=0, max_depth=max_depth, include_files=include_files, indent_style=indent_style)
+        with self._open_tree(root_dir, include_files, max_depth, max_items=max_items, compare=True) as root_node:
+            if root_node is None:
+                return lines
+            # Le righe delle directory incomplete (anteprima per livelli) non contano nel limite
+            max_items += self._count_partial(root_node)
+            if indent_style == 'tree':
+                self._generate_preview_tree(root_node, lines, max_items, depth=0, max_depth=max_depth, include_files=include_files)
+            else:
+                self._generate_preview_styled(root_node, lines, max_items, prefix='', depth=0, max_depth=max_depth, include_files=include_files, indent_style=indent_style)
         return lines[:max_items]
     
-    def _generate_preview_styled(self, root_dir, lines, max_items, prefix='', depth=0, max_depth=None, include_files=True, indent_style='spaces'):
+    @staticmethod
+    def _count_partial(root_node):
+        """Conta le directory dell'anteprima rimaste incomplete a budget esaurito"""
+        count = 0
+        stack = [root_node]
+        while stack:
+            node = stack.pop()
+            if getattr(node, 'partial', False):
+                count += 1
+            stack.extend(child for child in node.children if child.is_dir)
+        return count
+    
+    def _generate_preview_styled(self, node, lines, max_items, prefix='', depth=0, max_depth=None, include_files=True, indent_style='spaces'):
         """Funzione ricorsiva per generare l'anteprima con stile personalizzato"""
         if len(lines) >= max_items:
             return
-            
-        root_path = Path(root_dir)
-        if self.filter_manager.is_excluded_dir(root_path.name):
-            return
-
-        if max_depth is not None and depth > max_depth:
-            return
         
         style = self.indent_styles.get(indent_style, self.indent_styles['spaces'])
-        lines.append(f"{prefix}{style['dir_prefix']}{root_path.name}/")
+        lines.append(f"{prefix}{style['dir_prefix']}{node.name}/{self._dir_label(node)}")
         new_prefix = prefix + style['indent_char']
         
-        try:
-            for entry in sorted(root_path.iterdir(), key=lambda e: (not e.is_dir(), e.name)):
-                if len(lines) >= max_items:
-                    return
-                    
-                if entry.is_dir():
-                    self._generate_preview_styled(entry, lines, max_items, new_prefix, 
-                                                depth + 1, max_depth, include_files, indent_style)
-                elif include_files and self.filter_manager.is_included_file(entry):
-                    lines.append(f"{new_prefix}{style['file_prefix']}{entry.name}")
-        except PermissionError:
-            pass
-    
-    def _generate_preview_tree(self, root_dir, lines, max_items, depth=0, max_depth=None, include_files=True, is_last=True, prefix=''):
+        for entry in self._visible_children(node, depth, max_depth, include_files):
+            if len(lines) >= max_items:
+                return
+                
+            if entry.is_dir:
+                self._generate_preview_styled(entry, lines, max_items, new_prefix, 
+                                            depth + 1, max_depth, include_files, indent_style)
+            else:
+                lines.append(f"{new_prefix}{style['file_prefix']}{entry.name}{self._change_label(entry)}")
+        
+        if getattr(node, 'partial', False) and len(lines) < max_items:
+            lines.append(f"{new_prefix}{style['file_prefix']}{PREVIEW_CUT_MARKER}")
+    
+    def _generate_preview_tree(self, node, lines, max_items, depth=0, max_depth=None, include_files=True, is_last=True, prefix=''):
         """Funzione ricorsiva per generare l'anteprima in stile albero"""
         if len(lines) >= max_items:
             return
-            
-        root_path = Path(root_dir)
-        if self.filter_manager.is_excluded_dir(root_path.name):
-            return
-
-        if max_depth is not None and depth > max_depth:
-            return
         
         if depth == 0:
-            lines.append(f"{root_path.name}/")
+            lines.append(f"{node.name}/{self._dir_label(node)}")
             current_prefix = ''
         else:
             tree_char = '└── ' if is_last else '├── '
-            lines.append(f"{prefix}{tree_char}{root_path.name}/")
+            lines.append(f"{prefix}{tree_char}{node.name}/{self._dir_label(node)}")
             current_prefix = prefix + ('    ' if is_last else '│   ')
         
-        try:
-            entries = sorted(root_path.iterdir(), key=lambda e: (not e.is_dir(), e.name))
-            dirs = [e for e in entries if e.is_dir() and not self.filter_manager.is_excluded_dir(e.name)]
-            files = [e for e in entries if e.is_file() and include_files and self.filter_manager.is_included_file(e)]
-            
-            all_items = dirs + files
-            
-            for i, entry in enumerate(all_items):
-                if len(lines) >= max_items:
-                    return
-                    
-                is_last_item = (i == len(all_items) - 1)
+        all_items = self._visible_children(node, depth, max_depth, include_files)
+        # In una directory incompleta l'ultimo elemento è la riga dei figli non mostrati
+        partial = getattr(node, 'partial', False)
+        
+        for i, entry in enumerate(all_items):
+            if len(lines) >= max_items:
+                return
                 
-                if entry.is_dir():
-                    self._generate_preview_tree(entry, lines, max_items, depth + 1, max_depth, 
-                                              include_files, is_last_item, current_prefix)
-                else:
-                    tree_char = '└── ' if is_last_item else '├── '
-                    if depth == 0:
-                        lines.append(f"{tree_char}{entry.name}")
-                    else:
-                        lines.append(f"{current_prefix}{tree_char}{entry.name}")
-        except PermissionError:
-            pass
\ No newline at end of file
+            is_last_item = (i == len(all_items) - 1) and not partial
+            
+            if entry.is_dir:
+                self._generate_preview_tree(entry, lines, max_items, depth + 1, max_depth, 
+                                          include_files, is_last_item, current_prefix)
+            else:
+                tree_char = '└── ' if is_last_item else '├── '
+                lines.append(f"{current_prefix}{tree_char}{entry.name}{self._change_label(entry)}")
+        
+        if partial and len(lines) < max_items:
+            lines.append(f"{current_prefix}└── {PREVIEW_CUT_MARKER}")
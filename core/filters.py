@@ -1,12 +1,25 @@
 import re
 from pathlib import Path
 
+from core.name_matcher import NameMatcher
+from core.path_trie import PathTrie
+
 class FilterManager:
+    # Attributi che definiscono le regole sui nomi: modificarli invalida i matcher compilati
+    _RULE_ATTRIBUTES = frozenset({
+        'excluded_dirs', 'excluded_dirs_regex', 'excluded_files',
+        'excluded_files_regex', 'included_file_extensions', 'included_file_regex',
+        'excluded_paths'
+    })
+    
     def __init__(self):
         # Filtri per directory
         self.excluded_dirs = {'.git', '.vs', 'bin', 'obj', 'Debug', 'Release', 'packages'}
         self.excluded_dirs_regex = set()
         
+        # Percorsi esclusi (relativi alla radice della scansione o assoluti)
+        self.excluded_paths = set()
+        
         # Filtri per file - NUOVI
         self.excluded_files = {'.gitignore', 'thumbs.db', '.DS_Store', 'desktop.ini', 'package-lock.json'}
         self.excluded_files_regex = set()
@@ -24,42 +37,59 @@ class FilterManager:
         self.max_creation_date = None
         self.min_modification_date = None
         self.max_modification_date = None
+        
+        # Rispetta i file .gitignore/.ignore durante la scansione
+        self.use_gitignore = False
+    
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self._RULE_ATTRIBUTES:
+            self._invalidate_matchers()
+    
+    def _invalidate_matchers(self):
+        """Scarta i matcher compilati: verranno ricostruiti al prossimo utilizzo"""
+        super().__setattr__('_matchers', None)
+    
+    def _get_matchers(self):
+        """Compila (una sola volta per ogni insieme di regole) i matcher sui nomi"""
+        matchers = self._matchers
+        if matchers is None:
+            matchers = {
+                'excluded_dirs': NameMatcher(self.excluded_dirs, self.excluded_dirs_regex),
+                'excluded_files': NameMatcher(self.excluded_files, self.excluded_files_regex,
+                                              ignore_case_names=True),
+                'included_files': NameMatcher((), self.included_file_regex),
+                'excluded_paths': PathTrie(self.excluded_paths)
+            }
+            self._matchers = matchers
+        return matchers
     
     def is_excluded_dir(self, dir_name):
         """Verifica se la directory deve essere esclusa"""
-        if dir_name in self.excluded_dirs:
-            return True
-            
-        for pattern in self.excluded_dirs_regex:
-            try:
-                if re.search(pattern, dir_name):
-                    return True
-            except re.error:
-                continue
-                
-        return False
+        return self._get_matchers()['excluded_dirs'].matches(dir_name)
+    
+    def get_path_rules(self):
+        """Restituisce il trie dei percorsi esclusi, usato dalla scansione per potare i sottoalberi"""
+        return self._get_matchers()['excluded_paths']
+    
+    def is_excluded_path(self, path, root_path):
+        """Verifica se un elemento è escluso da una regola di percorso"""
+        rules = self.get_path_rules()
+        return bool(rules) and rules.is_excluded(path, root_path)
     
     def is_excluded_file(self, file_path):
         """Verifica se il file deve essere escluso"""
         file_path = Path(file_path) if isinstance(file_path, str) else file_path
-        file_name = file_path.name
         
-        # Controllo nomi esatti
-        if file_name.lower() in {f.lower() for f in self.excluded_files}:
-            return True
-            
-        # Controllo con regex
-        for pattern in self.excluded_files_regex:
-            try:
-                if re.search(pattern, file_name):
-                    return True
-            except re.error:
-                continue
-                
-        return False
-    
-    def is_included_file(self, file_path):
-        """Verifica se il file deve essere incluso in base a tutti i criteri"""
+        # Nomi esatti (senza distinzione maiuscole/minuscole) e regex
+        return self._get_matchers()['excluded_files'].matches(file_path.name)
+    
+    def is_included_file(self, file_path, stat_result=None):
+        """Verifica se il file deve essere incluso in base a tutti i criteri.
+
+        stat_result (opzionale) evita di rileggere i metadati già disponibili,
+        ad esempio quelli presi dall'indice git.
+        """
         file_path = Path(file_path) if isinstance(file_path, str) else file_path
         
         # PRIMA verifica se il file è esplicitamente escluso
@@ -67,52 +97,61 @@ class FilterManager:
             return False
         
         # Verifica estensione/regex per inclusione
-        extension_match = file_path.suffix in self.included_file_extensions
-        regex_match = any(re.search(pattern, file_path.name) for pattern in self.included_file_regex)
+        if self.included_file_extensions or self.included_file_regex:
+            if not (file_path.suffix in self.included_file_extensions or
+                    self._get_matchers()['included_files'].matches(file_path.name)):
+                return False
         
-        if not (extension_match or regex_match) and (self.included_file_extensions or self.included_file_regex):
-            return False
+        # I filtri su dimensione e date richiedono i metadati: una sola lettura, solo se attivi
+        if not self.has_stat_filters():
+            return True
+        
+        if stat_result is None:
+            try:
+                stat_result = file_path.stat()
+            except (OSError, PermissionError):
+                return True
         
         # Verifica dimensione file
-        try:
-            file_size = file_path.stat().st_size
-            if file_size < self.min_file_size or file_size > self.max_file_size:
-                return False
-        except (OSError, PermissionError):
-            pass
+        file_size = stat_result.st_size
+        if file_size < self.min_file_size or file_size > self.max_file_size:
+            return False
             
         # Verifica data di creazione
-        try:
-            creation_time = file_path.stat().st_ctime
-            if (self.min_creation_date and creation_time < self.min_creation_date) or \
-               (self.max_creation_date and creation_time > self.max_creation_date):
-                return False
-        except (OSError, PermissionError):
-            pass
+        creation_time = stat_result.st_ctime
+        if (self.min_creation_date and creation_time < self.min_creation_date) or \
+           (self.max_creation_date and creation_time > self.max_creation_date):
+            return False
         
         # Verifica data di modifica
-        try:
-            modification_time = file_path.stat().st_mtime
-            if (self.min_modification_date and modification_time < self.min_modification_date) or \
-               (self.max_modification_date and modification_time > self.max_modification_date):
-                return False
-        except (OSError, PermissionError):
-            pass
+        modification_time = stat_result.st_mtime
+        if (self.min_modification_date and modification_time < self.min_modification_date) or \
+           (self.max_modification_date and modification_time > self.max_modification_date):
+            return False
         
         return True
     
+    def has_stat_filters(self):
+        """Verifica se è attivo almeno un filtro che richiede dimensione o date dei file"""
+        return (self.min_file_size > 0 or self.max_file_size != float('inf') or
+                bool(self.min_creation_date or self.max_creation_date or
+                     self.min_modification_date or self.max_modification_date))
+    
     # Metodi esistenti per directory...
     def add_excluded_dir(self, dir_name):
         self.excluded_dirs.add(dir_name)
+        self._invalidate_matchers()
     
     def remove_excluded_dir(self, dir_name):
         if dir_name in self.excluded_dirs:
             self.excluded_dirs.remove(dir_name)
+            self._invalidate_matchers()
     
     def add_excluded_dir_regex(self, pattern):
         try:
             re.compile(pattern)
             self.excluded_dirs_regex.add(pattern)
+            self._invalidate_matchers()
             return True
         except re.error:
             return False
@@ -120,22 +159,42 @@ class FilterManager:
     def remove_excluded_dir_regex(self, pattern):
         if pattern in self.excluded_dirs_regex:
             self.excluded_dirs_regex.remove(pattern)
+            self._invalidate_matchers()
+    
+    # Metodi per percorsi esclusi
+    def add_excluded_path(self, path):
+        """Aggiunge un percorso (relativo alla radice o assoluto) da escludere"""
+        path = path.strip()
+        if not path:
+            return False
+        self.excluded_paths.add(path)
+        self._invalidate_matchers()
+        return True
+    
+    def remove_excluded_path(self, path):
+        """Rimuove un percorso dalla lista dei percorsi esclusi"""
+        if path in self.excluded_paths:
+            self.excluded_paths.remove(path)
+            self._invalidate_matchers()
     
     # NUOVI metodi per file esclusi
     def add_excluded_file(self, file_name):
         """Aggiunge un file alla lista dei file esclusi"""
         self.excluded_files.add(file_name)
+        self._invalidate_matchers()
     
     def remove_excluded_file(self, file_name):
         """Rimuove un file dalla lista dei file esclusi"""
         if file_name in self.excluded_files:
             self.excluded_files.remove(file_name)
+            self._invalidate_matchers()
     
     def add_excluded_file_regex(self, pattern):
         """Aggiunge un pattern regex alla lista dei file esclusi"""
         try:
             re.compile(pattern)
             self.excluded_files_regex.add(pattern)
+            self._invalidate_matchers()
             return True
         except re.error:
             return False
@@ -144,21 +203,25 @@ class FilterManager:
         """Rimuove un pattern regex dalla lista dei file esclusi"""
         if pattern in self.excluded_files_regex:
             self.excluded_files_regex.remove(pattern)
+            self._invalidate_matchers()
     
     # Metodi esistenti per estensioni incluse...
     def add_included_ext(self, extension):
         if not extension.startswith('.'):
             extension = f".{extension}"
         self.included_file_extensions.add(extension)
+        self._invalidate_matchers()
     
     def remove_included_ext(self, extension):
         if extension in self.included_file_extensions:
             self.included_file_extensions.remove(extension)
+            self._invalidate_matchers()
     
     def add_included_file_regex(self, pattern):
         try:
             re.compile(pattern)
             self.included_file_regex.add(pattern)
+            self._invalidate_matchers()
             return True
         except re.error:
             return False
@@ -166,6 +229,7 @@ class FilterManager:
     def remove_included_file_regex(self, pattern):
         if pattern in self.included_file_regex:
             self.included_file_regex.remove(pattern)
+            self._invalidate_matchers()
     
     def set_size_filters(self, min_size, max_size):
         self.min_file_size = min_size
@@ -179,10 +243,14 @@ class FilterManager:
         self.min_modification_date = min_date
         self.max_modification_date = max_date
     
+    def set_gitignore_mode(self, enabled):
+        self.use_gitignore = enabled
+    
     def reset_filters(self):
         """Reimposta tutti i filtri ai valori predefiniti"""
         self.excluded_dirs = {'.git', '.vs', 'bin', 'obj', 'Debug', 'Release', 'packages'}
         self.excluded_dirs_regex = set()
+        self.excluded_paths = set()
         self.excluded_files = {'.gitignore', 'thumbs.db', '.DS_Store', 'desktop.ini', 'package-lock.json'}
         self.excluded_files_regex = set()
         self.included_file_extensions = {'.sln', '.csproj', '.vbproj', '.cs', '.html', '.cshtml', '.css', '.js'}
@@ -192,4 +260,5 @@ class FilterManager:
         self.min_creation_date = None
         self.max_creation_date = None
         self.min_modification_date = None
-        self.max_modification_date = None
\ No newline at end of file
+        self.max_modification_date = None
+        self.use_gitignore = False
\ No newline at end of file
@@ -0,0 +1,155 @@
+import os
+import struct
+from collections import namedtuple
+
+# Voce dell'indice git; i campi st_* permettono di usarla al posto di os.stat_result nei filtri
+GitIndexEntry = namedtuple('GitIndexEntry', ['path', 'mode', 'st_size', 'st_mtime', 'st_ctime'])
+
+GIT_MODE_GITLINK = 0o160000     # Sottomodulo
+GIT_MODE_SPARSE_DIR = 0o040000  # Directory compressa di un indice sparse
+
+_HEADER = struct.Struct('>4sII')
+# ctime (s, ns), mtime (s, ns), dev, ino, mode, uid, gid, size
+_ENTRY_STAT = struct.Struct('>10I')
+_ENTRY_FIXED_SIZE = 62          # 40 byte di stat + 20 di SHA-1 + 2 di flag
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+# Intestazione delle estensioni: firma e dimensione dei dati
+_EXTENSION_HEADER = struct.Struct('>4sI')
+# Checksum finale dell'indice (SHA-1; 32 byte con SHA-256)
+_MIN_CHECKSUM_SIZE = 20
+
+
+def find_repository(path):
+    """Cerca il repository git che contiene path.
+
+    Restituisce la tupla (radice del working tree, directory .git) oppure None.
+    Supporta anche i file .git con riga "gitdir:" usati da worktree e sottomoduli.
+    """
+    current = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(current, '.git')
+        if os.path.isdir(dot_git):
+            return current, dot_git
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, 'r', encoding='utf-8') as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith('gitdir:'):
+                git_dir = line[len('gitdir:'):].strip()
+                return current, os.path.normpath(os.path.join(current, git_dir))
+            return None
+
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _read_varint(data, pos):
+    """Legge un intero a lunghezza variabile nella codifica "offset" di git"""
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7f
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+    return value, pos
+
+
+def read_git_index(git_dir):
+    """Legge il file index di git (versioni 2, 3 e 4) senza usare l'eseguibile git.
+
+    Restituisce la lista delle voci tracciate, ordinate per percorso, con i
+    percorsi relativi alla radice del repository separati da '/'.
+    """
+    index_path = os.path.join(git_dir, 'index')
+    with open(index_path, 'rb') as f:
+        data = f.read()
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Indice git non valido: '{index_path}'")
+
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b'DIRC' or version not in (2, 3, 4):
+        raise ValueError(f"Indice git non valido o versione non supportata: '{index_path}'")
+
+    entries = []
+    previous_path = b''
+    pos = _HEADER.size
+
+    for _ in range(count):
+        start = pos
+        (ctime_s, ctime_ns, mtime_s, mtime_ns, _dev, _ino,
+         mode, _uid, _gid, size) = _ENTRY_STAT.unpack_from(data, pos)
+        flags = int.from_bytes(data[pos + 60:pos + 62], 'big')
+        pos += _ENTRY_FIXED_SIZE
+        if version >= 3 and flags & _FLAG_EXTENDED:
+            pos += 2
+
+        if version == 4:
+            # Percorso compresso rispetto al precedente: byte da rimuovere + suffisso
+            strip, pos = _read_varint(data, pos)
+            end = data.index(b'\0', pos)
+            path = previous_path[:len(previous_path) - strip] + data[pos:end]
+            pos = end + 1
+        else:
+            end = data.index(b'\0', pos)
+            path = data[pos:end]
+            # Le voci sono allineate a 8 byte con 1-8 byte NUL di riempimento
+            pos = start + ((end - start) // 8 + 1) * 8
+        previous_path = path
+
+        # Le voci in conflitto compaiono una volta per stage: si tiene solo la prima
+        if flags & _FLAG_STAGE_MASK and entries and entries[-1].path == path:
+            continue
+
+        entries.append(GitIndexEntry(path, mode, size,
+                                     mtime_s + mtime_ns / 1e9, ctime_s + ctime_ns / 1e9))
+
+    # Estensioni (firma di 4 byte, dimensione a 32 bit, dati) fino al checksum finale;
+    # l'estensione 'link' dell'indice diviso può seguire altre estensioni (TREE, UNTR, ...)
+    end_of_extensions = len(data) - _MIN_CHECKSUM_SIZE
+    while pos + _EXTENSION_HEADER.size <= end_of_extensions:
+        extension, size = _EXTENSION_HEADER.unpack_from(data, pos)
+        if extension == b'link':
+            raise ValueError(f"Indice git diviso (split index) non supportato: '{index_path}'")
+        pos += _EXTENSION_HEADER.size + size
+
+    return [entry._replace(path=os.fsdecode(entry.path)) for entry in entries]
+
+
+def build_index_tree(entries, prefix=''):
+    """Converte le voci dell'indice in un albero di dizionari annidati.
+
+    Le directory sono dizionari nome -> figlio, i file sono GitIndexEntry.
+    Con prefix si considerano solo le voci sotto quella sottodirectory.
+    """
+    prefix = prefix.strip('/')
+    prefix = prefix + '/' if prefix else ''
+    tree = {}
+
+    for entry in entries:
+        path = entry.path
+        if prefix:
+            if not path.startswith(prefix):
+                continue
+            path = path[len(prefix):]
+        parts = path.rstrip('/').split('/')
+
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+
+        if entry.mode in (GIT_MODE_GITLINK, GIT_MODE_SPARSE_DIR):
+            node.setdefault(parts[-1], {})
+        else:
+            node[parts[-1]] = entry
+
+    return tree
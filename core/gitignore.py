@@ -0,0 +1,174 @@
+import os
+import re
+
+from core.git_index import find_repository
+
+# File di ignore letti in ogni directory, in ordine di priorità crescente
+IGNORE_FILE_NAMES = ('.gitignore', '.ignore')
+
+
+def _translate_segment(segment):
+    """Traduce un segmento di pattern gitignore (senza '/') in una regex"""
+    result = []
+    i, n = 0, len(segment)
+    while i < n:
+        c = segment[i]
+        i += 1
+        if c == '*':
+            result.append('[^/]*')
+        elif c == '?':
+            result.append('[^/]')
+        elif c == '\\' and i < n:
+            result.append(re.escape(segment[i]))
+            i += 1
+        elif c == '[':
+            end = i
+            if end < n and segment[end] in '!^':
+                end += 1
+            if end < n and segment[end] == ']':
+                end += 1
+            while end < n and segment[end] != ']':
+                end += 1
+            if end >= n:
+                result.append('\\[')
+            else:
+                content = segment[i:end].replace('\\', '\\\\')
+                if content[:1] in '!^':
+                    content = '^' + content[1:]
+                result.append(f'[{content}]')
+                i = end + 1
+        else:
+            result.append(re.escape(c))
+    return ''.join(result)
+
+
+def compile_pattern(line):
+    """Compila una riga di un file gitignore.
+
+    Restituisce la tupla (regex, negata, solo_directory, ancorata) oppure None
+    per righe vuote e commenti. I pattern non ancorati si confrontano con il solo
+    nome dell'elemento, quelli ancorati con il percorso relativo al file di ignore.
+    """
+    line = line.rstrip('\n').rstrip('\r')
+    if not line or line.startswith('#'):
+        return None
+
+    # Gli spazi finali sono ignorati, a meno che non siano preceduti da '\'
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped += ' '
+    line = stripped
+    if not line:
+        return None
+
+    negated = line.startswith('!')
+    if negated:
+        line = line[1:]
+    elif line.startswith('\\!') or line.startswith('\\#'):
+        line = line[1:]
+
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    anchored = '/' in line
+    segments = line.lstrip('/').split('/')
+    parts = []
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '**':
+            parts.append('.*' if last else '(?:.*/)?')
+        else:
+            parts.append(_translate_segment(segment) + ('' if last else '/'))
+
+    try:
+        regex = re.compile('^' + ''.join(parts) + '$', re.DOTALL)
+    except re.error:
+        return None
+    return regex, negated, dir_only, anchored
+
+
+def read_ignore_file(file_path):
+    """Legge e compila tutte le regole di un file di ignore"""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='surrogateescape') as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    return [rule for rule in map(compile_pattern, lines) if rule is not None]
+
+
+class IgnoreMatcher:
+    """Insieme gerarchico di regole gitignore ereditato durante la visita.
+
+    Ogni livello contiene le regole compilate una sola volta per la directory che
+    le definisce; i livelli più profondi hanno la precedenza, e all'interno di un
+    livello vale l'ultima regola che corrisponde (come in git).
+    """
+
+    __slots__ = ('levels',)
+
+    def __init__(self, levels=()):
+        # Ogni livello: (caratteri da rimuovere dal percorso relativo, prefisso da aggiungere, regole)
+        self.levels = tuple(levels)
+
+    @classmethod
+    def for_root(cls, root_path):
+        """Crea il matcher per la radice della scansione.
+
+        Se la radice è dentro un repository si caricano anche .git/info/exclude e
+        i file di ignore delle directory antenate fino alla radice del repository.
+        """
+        levels = []
+        root_path = os.path.abspath(root_path)
+        repository = find_repository(root_path)
+        if repository is not None:
+            work_tree, git_dir = repository
+            relative = os.path.relpath(root_path, work_tree).replace(os.sep, '/')
+            relative = '' if relative == '.' else relative
+
+            exclude_rules = read_ignore_file(os.path.join(git_dir, 'info', 'exclude'))
+            if exclude_rules:
+                levels.append((0, relative + '/' if relative else '', exclude_rules))
+
+            # Directory antenate (esclusa la radice, caricata con la prima visita)
+            ancestor = work_tree
+            parts = relative.split('/') if relative else []
+            for depth in range(len(parts)):
+                prefix = '/'.join(parts[depth:]) + '/'
+                rules = []
+                for name in IGNORE_FILE_NAMES:
+                    rules.extend(read_ignore_file(os.path.join(ancestor, name)))
+                if rules:
+                    levels.append((0, prefix, rules))
+                ancestor = os.path.join(ancestor, parts[depth])
+
+        return cls(levels)
+
+    def enter_directory(self, dir_path, relative_dir, names):
+        """Restituisce il matcher per i figli di una directory.
+
+        names è l'insieme dei nomi elencati nella directory: i file di ignore vengono
+        letti solo se presenti, quindi non servono chiamate di sistema aggiuntive.
+        """
+        rules = []
+        for name in IGNORE_FILE_NAMES:
+            if name in names:
+                rules.extend(read_ignore_file(os.path.join(dir_path, name)))
+        if not rules:
+            return self
+        strip = len(relative_dir) + 1 if relative_dir else 0
+        return IgnoreMatcher(self.levels + ((strip, '', rules),))
+
+    def is_ignored(self, relative_path, is_dir):
+        """Verifica se un elemento (percorso relativo alla radice, con '/') è ignorato"""
+        name = relative_path.rsplit('/', 1)[-1]
+        for strip, prefix, rules in reversed(self.levels):
+            path = prefix + relative_path[strip:]
+            for regex, negated, dir_only, anchored in reversed(rules):
+                if dir_only and not is_dir:
+                    continue
+                if regex.match(path if anchored else name):
+                    return not negated
+        return False
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import mmap
+import os
+import stat
+import threading
+
+# Dimensione dei blocchi letti per calcolare i digest
+HASH_BUFFER_SIZE = 1 << 20
+
+# Oltre questa dimensione il file viene mappato in memoria invece che letto a blocchi
+MMAP_THRESHOLD = 8 << 20
+
+HASH_CACHE_VERSION = 2
+
+# Tipo di digest dei contenuti completi
+HASH_SHA256 = 'sha256'
+
+
+def file_sha256(path):
+    """Calcola lo SHA-256 del contenuto di un file.
+
+    I file grandi vengono mappati in memoria e passati a hashlib in un'unica
+    chiamata, che rilascia il GIL: più thread possono calcolare digest in parallelo.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return hashlib.sha256(mapped).hexdigest()
+            except (ValueError, OSError):
+                f.seek(0)
+
+        digest = hashlib.sha256()
+        while True:
+            chunk = f.read(HASH_BUFFER_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashCache:
+    """Cache dei digest dei file, indicizzata per identità e versione del file.
+
+    La chiave è formata da (dispositivo, inode) più dimensione e data di modifica
+    in nanosecondi: un file modificato o sostituito produce una chiave diversa e
+    viene quindi riletto. Dove l'inode non è disponibile si usa il percorso.
+    Può essere usata da più thread contemporaneamente e salvata su file per
+    essere riutilizzata tra un'esecuzione e l'altra. Al salvataggio le voci non
+    usate nell'esecuzione corrente vengono verificate con stat (una sola volta
+    per esecuzione) e scartate se il file non esiste più o è cambiato; le voci
+    degli altri alberi ancora validi restano in cache.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        # Percorso assoluto dell'ultimo file visto per ogni chiave, per verificare le voci
+        self._paths = {}
+        # Chiavi confermate nell'esecuzione corrente (usate o verificate)
+        self._current = set()
+        self._lock = threading.Lock()
+        self.modified = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(path, stat_result):
+        """Restituisce la chiave di cache di un file a partire dai suoi metadati"""
+        if stat_result.st_ino:
+            identity = (stat_result.st_dev, stat_result.st_ino)
+        else:
+            identity = os.path.abspath(path)
+        return identity, stat_result.st_size, stat_result.st_mtime_ns
+
+    def get(self, kind, path, stat_result):
+        """Restituisce il digest di tipo kind memorizzato per il file, o None"""
+        file_key = self.key(path, stat_result)
+        with self._lock:
+            digest = self._entries.get((kind, file_key))
+            if digest is not None:
+                self._current.add(file_key)
+                self._paths[file_key] = os.path.abspath(path)
+            return digest
+
+    def put(self, kind, path, stat_result, digest):
+        """Memorizza il digest di tipo kind calcolato per il file"""
+        file_key = self.key(path, stat_result)
+        with self._lock:
+            self._entries[(kind, file_key)] = digest
+            self._current.add(file_key)
+            self._paths[file_key] = os.path.abspath(path)
+            self.modified = True
+
+    def sha256(self, path, stat_result):
+        """Restituisce lo SHA-256 del file, leggendolo solo se non è già in cache"""
+        digest = self.get(HASH_SHA256, path, stat_result)
+        if digest is None:
+            digest = file_sha256(path)
+            self.put(HASH_SHA256, path, stat_result, digest)
+        return digest
+
+    def load(self, file_path):
+        """Carica le voci salvate da un file; un file assente o non valido viene ignorato"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not isinstance(data, dict) or data.get('version') not in (1, HASH_CACHE_VERSION):
+            return False
+
+        with self._lock:
+            for kind, dev, ino, path, size, mtime_ns, digest in data.get('entries', []):
+                # Nella versione 1 le voci per inode non hanno percorso: non verificabili, saranno scartate
+                identity = (dev, ino) if dev is not None else path
+                file_key = (identity, size, mtime_ns)
+                self._entries[(kind, file_key)] = digest
+                if path is not None:
+                    self._paths.setdefault(file_key, path)
+        return True
+
+    def prune(self):
+        """Scarta le voci dei file eliminati o modificati, verificando ogni chiave una sola volta"""
+        with self._lock:
+            unverified = {file_key for _, file_key in self._entries} - self._current
+            stale = set()
+            for file_key in unverified:
+                path = self._paths.get(file_key)
+                if path is not None and self._matches(path, file_key):
+                    self._current.add(file_key)
+                else:
+                    stale.add(file_key)
+            if stale:
+                self._entries = {cache_key: digest for cache_key, digest in self._entries.items()
+                                 if cache_key[1] not in stale}
+                for file_key in stale:
+                    self._paths.pop(file_key, None)
+                self.modified = True
+            return len(stale)
+
+    @classmethod
+    def _matches(cls, path, file_key):
+        """Verifica che il file abbia ancora identità, dimensione e data della chiave"""
+        try:
+            stat_result = os.lstat(path)
+            if cls.key(path, stat_result) == file_key:
+                return True
+            return stat.S_ISLNK(stat_result.st_mode) and cls.key(path, os.stat(path)) == file_key
+        except OSError:
+            return False
+
+    def save(self, file_path):
+        """Salva le voci ancora valide, scrivendo prima un file temporaneo per non corromperlo"""
+        self.prune()
+        with self._lock:
+            entries = []
+            for (kind, file_key), digest in self._entries.items():
+                identity, size, mtime_ns = file_key
+                path = self._paths.get(file_key)
+                if isinstance(identity, tuple):
+                    entries.append([kind, identity[0], identity[1], path, size, mtime_ns, digest])
+                else:
+                    entries.append([kind, None, None, identity, size, mtime_ns, digest])
+            self.modified = False
+
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': HASH_CACHE_VERSION, 'entries': entries}, f)
+        os.replace(temp_path, file_path)
@@ -0,0 +1,97 @@
+import errno
+import os
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class ListingTimeout(OSError):
+    """L'elenco di una directory non si è concluso entro il tempo massimo"""
+
+    def __init__(self, path):
+        super().__init__(errno.ETIMEDOUT, "Tempo massimo superato durante l'elenco della directory", path)
+
+
+class ListingPoolExhausted(OSError):
+    """Tutti i thread di elenco sono bloccati: la directory non è stata elencata"""
+
+    def __init__(self, path):
+        super().__init__(errno.EAGAIN, "Troppi elenchi di directory bloccati, directory non elencata", path)
+
+
+class ListingPool:
+    """Elenca le directory in thread separati con un tempo massimo per ciascuna.
+
+    Un elenco bloccato (ad esempio su un filesystem di rete che non risponde)
+    non può essere interrotto: il thread resta in attesa e viene sostituito da
+    uno nuovo, così che la scansione possa proseguire; quando l'elenco si
+    conclude il thread torna disponibile. I thread sono daemon e non
+    impediscono la chiusura del programma.
+    """
+
+    # Limite ai thread bloccati contemporaneamente in un elenco scaduto
+    MAX_BLOCKED = 32
+
+    def __init__(self):
+        self._requests = queue.SimpleQueue()
+        self._threads = 0
+        # Future degli elenchi scaduti ancora in corso (un thread bloccato ciascuno)
+        self._blocked = set()
+        self._lock = threading.Lock()
+        self._start_worker()
+
+    def _start_worker(self):
+        threading.Thread(target=self._work, name='directory-listing', daemon=True).start()
+        self._threads += 1
+
+    def _work(self):
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            path, future = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                with os.scandir(path) as iterator:
+                    result = list(iterator)
+            except BaseException as e:
+                with self._lock:
+                    self._blocked.discard(future)
+                    future.set_exception(e)
+            else:
+                with self._lock:
+                    self._blocked.discard(future)
+                    future.set_result(result)
+
+    def list(self, path, timeout):
+        """Restituisce le voci della directory, o solleva ListingTimeout dopo timeout secondi.
+
+        Solleva ListingPoolExhausted, senza tentare l'elenco, se MAX_BLOCKED
+        thread sono ancora bloccati in elenchi scaduti.
+        """
+        with self._lock:
+            if len(self._blocked) >= self.MAX_BLOCKED:
+                raise ListingPoolExhausted(path)
+        future = Future()
+        self._requests.put((path, future))
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # Se l'elenco non era ancora iniziato non verrà eseguito
+            if future.cancel():
+                raise ListingTimeout(path) from None
+            with self._lock:
+                # Concluso proprio ora: il risultato è valido
+                if future.done():
+                    return future.result()
+                # Il thread è bloccato: un nuovo thread serve le richieste successive
+                self._blocked.add(future)
+            self._start_worker()
+            raise ListingTimeout(path) from None
+
+    def close(self):
+        """Termina i thread liberi; quelli bloccati terminano quando l'elenco si conclude"""
+        for _ in range(self._threads):
+            self._requests.put(None)
+        self._threads = 0
@@ -0,0 +1,125 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.file_utils import format_timestamp
+
+# Formato del manifest: righe di commento iniziali seguite da una riga per file
+#   sha256 <TAB> dimensione <TAB> data di modifica <TAB> percorso relativo
+# Nei percorsi '\', tabulazioni e a capo sono scritti come sequenze di escape.
+MANIFEST_SUFFIX = '.manifest'
+MANIFEST_HEADER = '# sha256\tsize\tmtime\tpath'
+
+ManifestEntry = namedtuple('ManifestEntry', ['path', 'size', 'mtime', 'sha256'])
+
+# Esito della verifica: percorsi relativi raggruppati per stato
+VerifyResult = namedtuple('VerifyResult', ['ok', 'modified', 'missing', 'unreadable', 'extra'])
+
+_ESCAPES = {'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'}
+_UNESCAPES = {'\\': '\\', 't': '\t', 'n': '\n', 'r': '\r'}
+
+
+def _escape_path(path):
+    return ''.join(_ESCAPES.get(char, char) for char in path)
+
+
+def _unescape_path(text):
+    result = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == '\\' and i + 1 < len(text):
+            result.append(_UNESCAPES.get(text[i + 1], text[i + 1]))
+            i += 2
+        else:
+            result.append(char)
+            i += 1
+    return ''.join(result)
+
+
+def _relative(path, root_path):
+    return os.path.relpath(path, root_path).replace(os.sep, '/')
+
+
+def _hash_file(cache, path):
+    """Restituisce (stat, sha256) di un file, o (None, None) se non è leggibile"""
+    try:
+        stat_result = os.stat(path)
+        return stat_result, cache.sha256(path, stat_result)
+    except OSError:
+        return None, None
+
+
+def write_manifest(paths, root_path, output_file_path, cache, max_workers=None):
+    """Calcola in parallelo lo SHA-256 dei file e scrive il manifest.
+
+    I digest presenti nella cache non vengono ricalcolati. Restituisce la coppia
+    (file scritti, file illeggibili).
+    """
+    paths = sorted(paths, key=lambda path: _relative(path, root_path))
+    written = 0
+    unreadable = 0
+
+    with ThreadPoolExecutor(max_workers) as pool, \
+            open(output_file_path, 'w', encoding='utf-8', errors='surrogateescape', newline='\n') as f:
+        f.write(f"# Manifest: {root_path}\n")
+        f.write(MANIFEST_HEADER + '\n')
+        for path, (stat_result, digest) in zip(paths, pool.map(lambda p: _hash_file(cache, p), paths)):
+            if digest is None:
+                unreadable += 1
+                continue
+            f.write(f"{digest}\t{stat_result.st_size}\t{format_timestamp(stat_result.st_mtime)}\t"
+                    f"{_escape_path(_relative(path, root_path))}\n")
+            written += 1
+    return written, unreadable
+
+
+def read_manifest(file_path):
+    """Legge le voci di un manifest"""
+    entries = []
+    with open(file_path, 'r', encoding='utf-8', errors='surrogateescape', newline='\n') as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            fields = line.split('\t')
+            if len(fields) != 4 or len(fields[0]) != 64:
+                raise ValueError(f"Riga {number} del manifest non valida: '{file_path}'")
+            digest, size, mtime, path = fields
+            entries.append(ManifestEntry(_unescape_path(path), int(size), mtime, digest))
+    return entries
+
+
+def verify_manifest(entries, root_path, cache, current_paths=None, max_workers=None):
+    """Confronta in parallelo i file sotto root_path con le voci del manifest.
+
+    Un file con dimensione diversa è modificato senza bisogno di leggerlo.
+    current_paths, se indicato, è l'elenco dei file presenti: quelli non
+    elencati nel manifest vengono riportati come aggiuntivi.
+    """
+    def check(entry):
+        path = os.path.join(root_path, *entry.path.split('/'))
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            return 'missing'
+        except OSError:
+            return 'unreadable'
+        if stat_result.st_size != entry.size:
+            return 'modified'
+        try:
+            digest = cache.sha256(path, stat_result)
+        except OSError:
+            return 'unreadable'
+        return 'ok' if digest == entry.sha256 else 'modified'
+
+    result = {'ok': [], 'modified': [], 'missing': [], 'unreadable': [], 'extra': []}
+    with ThreadPoolExecutor(max_workers) as pool:
+        for entry, status in zip(entries, pool.map(check, entries)):
+            result[status].append(entry.path)
+
+    if current_paths is not None:
+        listed = {entry.path for entry in entries}
+        result['extra'] = sorted(relative for relative in (_relative(path, root_path) for path in current_paths)
+                                 if relative not in listed)
+    return VerifyResult(**result)
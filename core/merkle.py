@@ -0,0 +1,78 @@
+import hashlib
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from core.hash_cache import HashCache
+
+# Modalità di calcolo degli hash dei file (foglie dell'albero di Merkle)
+MERKLE_METADATA = 'metadata'    # Dimensione e data di modifica
+MERKLE_CONTENT = 'content'      # SHA-256 del contenuto
+
+DIGEST_SIZE = 32
+
+_FILE_METADATA = struct.Struct('<Qd')
+_NAME_LENGTH = struct.Struct('<I')
+
+
+def child_sort_key(node):
+    """Ordine dei figli usato da scansione e snapshot: directory prima, poi per nome"""
+    return not node.is_dir, node.name
+
+
+def _metadata_digest(node):
+    return hashlib.sha256(b'f' + _FILE_METADATA.pack(node.size or 0, node.mtime or 0.0)).digest()
+
+
+def _directory_digest(children):
+    """Combina gli hash dei figli (con tipo e nome) nell'hash della directory"""
+    digest = hashlib.sha256(b'd')
+    for child in children:
+        name = child.name.encode('utf-8', 'surrogateescape')
+        digest.update(b'd' if child.is_dir else b'f')
+        digest.update(_NAME_LENGTH.pack(len(name)))
+        digest.update(name)
+        digest.update(child.digest)
+    return digest.digest()
+
+
+def compute_merkle(root, mode=MERKLE_METADATA, cache=None, max_workers=None):
+    """Assegna a ogni nodo dell'albero (attributo digest) il proprio hash di Merkle.
+
+    L'hash di un file dipende da dimensione e data di modifica oppure, in modalità
+    contenuto, dallo SHA-256 dei dati (calcolato in parallelo tramite la cache).
+    L'hash di una directory dipende da tipo, nome e hash di tutti i figli: due
+    sottoalberi con lo stesso hash sono uguali e un confronto può saltarli.
+    In modalità metadati l'albero deve essere stato scansionato con collect_stat.
+    """
+    # Visita in pre-ordine; percorsa al contrario dà i figli prima dei genitori
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        if node.is_dir:
+            stack.extend(node.children)
+
+    files = [node for node in order if not node.is_dir]
+    if mode == MERKLE_CONTENT:
+        cache = cache if cache is not None else HashCache()
+
+        def content_digest(node):
+            try:
+                stat_result = os.stat(node.path)
+                return bytes.fromhex(cache.sha256(node.path, stat_result))
+            except OSError:
+                return _metadata_digest(node)
+
+        with ThreadPoolExecutor(max_workers) as pool:
+            for node, digest in zip(files, pool.map(content_digest, files)):
+                node.digest = digest
+    else:
+        for node in files:
+            node.digest = _metadata_digest(node)
+
+    for node in reversed(order):
+        if node.is_dir:
+            node.digest = _directory_digest(sorted(node.children, key=child_sort_key))
+    return root.digest
@@ -0,0 +1,167 @@
+import re
+
+# Caratteri con significato speciale nelle espressioni regolari
+_REGEX_META = set('.^$*+?{}[]\\|()')
+
+# Oltre questa soglia la cache delle decisioni viene svuotata
+_CACHE_LIMIT = 1 << 16
+
+
+def _unescape_literal(text):
+    """Restituisce il testo letterale rappresentato da una regex, o None se non è un letterale"""
+    result = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c == '\\':
+            if i + 1 < len(text) and not text[i + 1].isalnum() and text[i + 1] != '_':
+                result.append(text[i + 1])
+                i += 2
+                continue
+            return None
+        if c in _REGEX_META:
+            return None
+        result.append(c)
+        i += 1
+    return ''.join(result)
+
+
+def _ends_with_anchor(pattern):
+    """Verifica se la regex termina con un '$' non preceduto da escape"""
+    if not pattern.endswith('$'):
+        return False
+    backslashes = len(pattern) - 1 - len(pattern[:-1].rstrip('\\'))
+    return backslashes % 2 == 0
+
+
+def _trie_regex(literals):
+    """Costruisce una regex a trie che riconosce uno qualsiasi dei letterali.
+
+    Le alternative condividono i prefissi comuni, quindi il motore regex non
+    deve provare ogni letterale separatamente.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = None
+
+    def build(node):
+        optional = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1:
+            body = branches[0]
+            if optional:
+                body = f'(?:{body})?' if len(body) > 1 else body + '?'
+            return body
+        return f"(?:{'|'.join(branches)}){'?' if optional else ''}"
+
+    return build(trie)
+
+
+class NameMatcher:
+    """Verifica se un nome corrisponde a una lista di nomi esatti e di regex.
+
+    Le regole vengono compilate una volta in strutture il cui costo non cresce con
+    il numero di regole: insiemi per i nomi esatti, tabelle di prefissi e suffissi
+    per le regex ancorate, un'unica regex a trie per i letterali e un'unica
+    alternativa raggruppata per le regex generiche. Le decisioni vengono memorizzate
+    per nome, dato che gli stessi nomi ricorrono in molte directory.
+    """
+
+    def __init__(self, names=(), patterns=(), ignore_case_names=False):
+        self.ignore_case_names = ignore_case_names
+        self._names = {name.lower() for name in names} if ignore_case_names else set(names)
+        self._exact = set()
+        self._prefixes = set()
+        self._suffixes = set()
+        substrings = []
+        generic = []
+
+        for pattern in patterns:
+            start = pattern.startswith('^')
+            end = _ends_with_anchor(pattern)
+            body = pattern[1 if start else 0:len(pattern) - 1 if end else len(pattern)]
+            literal = _unescape_literal(body)
+
+            if not literal:
+                generic.append(pattern)
+            elif start and end:
+                self._exact.add(literal)
+            elif start:
+                self._prefixes.add(literal)
+            elif end:
+                self._suffixes.add(literal)
+            else:
+                substrings.append(literal)
+
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._prefixes})
+        self._suffix_lengths = sorted({len(suffix) for suffix in self._suffixes})
+        self._substring_regex = re.compile(_trie_regex(substrings)) if substrings else None
+        self._regexes = self._compile_generic(generic)
+        self._cache = {}
+
+    @staticmethod
+    def _compile_generic(patterns):
+        """Raggruppa le regex generiche in un'unica alternativa.
+
+        Le regex che non possono essere combinate (riferimenti a gruppi, flag
+        globali) o che non sono valide restano separate o vengono ignorate.
+        """
+        combinable = []
+        separate = []
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error:
+                continue
+            if re.search(r'\\\d|\(\?P=|\(\?[aiLmsux]+\)', pattern):
+                separate.append(re.compile(pattern))
+            else:
+                combinable.append(pattern)
+
+        compiled = []
+        if combinable:
+            try:
+                compiled.append(re.compile('|'.join(f'(?:{pattern})' for pattern in combinable)))
+            except re.error:
+                compiled.extend(re.compile(pattern) for pattern in combinable)
+        return compiled + separate
+
+    def __bool__(self):
+        return bool(self._names or self._exact or self._prefixes or self._suffixes or
+                    self._substring_regex or self._regexes)
+
+    def matches(self, name):
+        """Verifica se il nome corrisponde ad almeno una regola"""
+        result = self._cache.get(name)
+        if result is None:
+            result = self._match(name)
+            if len(self._cache) >= _CACHE_LIMIT:
+                self._cache.clear()
+            self._cache[name] = result
+        return result
+
+    def _match(self, name):
+        if (name.lower() if self.ignore_case_names else name) in self._names:
+            return True
+        # Come in re.search, '$' corrisponde anche prima di un '\n' finale
+        anchored = name[:-1] if name.endswith('\n') else name
+        if name in self._exact or anchored in self._exact:
+            return True
+        for length in self._prefix_lengths:
+            if length > len(name):
+                break
+            if name[:length] in self._prefixes:
+                return True
+        for length in self._suffix_lengths:
+            if length > len(name):
+                break
+            if name[-length:] in self._suffixes or anchored[-length:] in self._suffixes:
+                return True
+        if self._substring_regex is not None and self._substring_regex.search(name):
+            return True
+        return any(regex.search(name) for regex in self._regexes)
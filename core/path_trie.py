@@ -0,0 +1,110 @@
+import os
+
+# Componente jolly: corrisponde a un qualsiasi nome a quel livello
+WILDCARD = '*'
+
+# Chiave che marca la fine di una regola nel nodo del trie
+_END = None
+
+
+def split_path_rule(rule):
+    """Scompone una regola di percorso nei suoi componenti.
+
+    Restituisce la tupla (assoluta, componenti). Sono accettati sia '/' sia '\\'
+    come separatori; i componenti vuoti e '.' vengono ignorati.
+    """
+    rule = rule.strip()
+    absolute = os.path.isabs(rule) or rule.startswith(('/', '\\'))
+    if absolute:
+        rule = os.path.abspath(rule)
+        drive, rule = os.path.splitdrive(rule)
+        parts = [drive] if drive else []
+    else:
+        parts = []
+    parts.extend(part for part in rule.replace('\\', '/').split('/') if part and part != '.')
+    return absolute, [os.path.normcase(part) for part in parts]
+
+
+class PathTrie:
+    """Trie di regole di esclusione per percorso (relative alla radice o assolute).
+
+    Durante la visita ogni directory conserva un cursore, cioè i nodi del trie
+    raggiunti dal suo percorso: per ogni figlio basta una ricerca nel dizionario
+    per sapere se va escluso, e i sottoalberi senza regole non costano nulla.
+    """
+
+    def __init__(self, rules=()):
+        self._relative = {}
+        self._absolute = {}
+        for rule in rules:
+            absolute, parts = split_path_rule(rule)
+            if not parts:
+                continue
+            node = self._absolute if absolute else self._relative
+            for part in parts:
+                node = node.setdefault(part, {})
+            node[_END] = True
+
+    def __bool__(self):
+        return bool(self._relative or self._absolute)
+
+    def root_cursor(self, root_path):
+        """Restituisce il cursore per la radice della scansione.
+
+        Le regole assolute vengono percorse fino alla radice; se una di esse
+        coincide con la radice o con una sua antenata, il cursore è None.
+        """
+        cursor = (self._relative,) if self._relative else ()
+        if self._absolute:
+            _, parts = split_path_rule(os.path.abspath(root_path))
+            nodes = (self._absolute,)
+            for part in parts:
+                nodes = self._step(nodes, part)
+                if any(_END in node for node in nodes):
+                    return None
+                if not nodes:
+                    break
+            cursor += nodes
+        return cursor
+
+    def descend(self, cursor, name):
+        """Avanza il cursore di un livello.
+
+        Restituisce la tupla (escluso, cursore del figlio); un cursore vuoto
+        indica che sotto quel percorso non ci sono più regole da verificare.
+        """
+        if not cursor:
+            return False, cursor
+        nodes = self._step(cursor, os.path.normcase(name))
+        for node in nodes:
+            if _END in node:
+                return True, ()
+        return False, nodes
+
+    @staticmethod
+    def _step(nodes, name):
+        result = []
+        for node in nodes:
+            child = node.get(name)
+            if child is not None:
+                result.append(child)
+            child = node.get(WILDCARD)
+            if child is not None:
+                result.append(child)
+        return tuple(result)
+
+    def is_excluded(self, path, root_path):
+        """Verifica se un percorso sotto root_path è escluso (senza cursore)"""
+        cursor = self.root_cursor(root_path)
+        if cursor is None:
+            return True
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(root_path))
+        if relative == '.' or relative.startswith('..'):
+            return False
+        for name in relative.replace('\\', '/').split('/'):
+            excluded, cursor = self.descend(cursor, name)
+            if excluded:
+                return True
+            if not cursor:
+                return False
+        return False
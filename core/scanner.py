@@ -0,0 +1,1165 @@
+import heapq
+import math
+import os
+import re
+import stat
+import time
+from collections import deque
+from pathlib import Path
+
+from core.git_index import build_index_tree, find_repository, read_git_index
+from core.gitignore import IGNORE_FILE_NAMES, IgnoreMatcher
+from core.listing import ListingPool, ListingPoolExhausted, ListingTimeout
+from core.name_matcher import NameMatcher
+from utils.file_utils import format_file_size
+
+# Modalità di enumerazione degli elementi
+SOURCE_FILESYSTEM = 'filesystem'
+SOURCE_GIT_INDEX = 'git'
+
+# Politiche per i link simbolici
+SYMLINKS_FOLLOW = 'follow'  # Segue i link alle directory (ogni directory una sola volta)
+SYMLINKS_LIST = 'list'      # Elenca i link senza seguirli
+SYMLINKS_SKIP = 'skip'      # Ignora i link
+
+# Ordinamenti degli elementi di ogni directory (le directory precedono i file, salvo nell'ordine del filesystem)
+SORT_FILESYSTEM = 'filesystem'  # Ordine restituito dal filesystem, senza ordinamento
+SORT_NAME = 'name'              # Per nome, distinguendo maiuscole e minuscole
+SORT_NAME_NOCASE = 'nocase'     # Per nome, senza distinguere maiuscole e minuscole
+SORT_NATURAL = 'natural'        # Per nome, confrontando i numeri per valore (file2 prima di file10)
+SORT_EXTENSION = 'extension'    # Per estensione, poi per nome
+SORT_SIZE = 'size'              # Dal file più grande
+SORT_MTIME = 'mtime'            # Dall'elemento modificato più di recente
+
+# Numero di directory più lente conservate nel riepilogo della scansione
+SLOWEST_LISTINGS = 10
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def file_extension(name):
+    """Restituisce l'estensione di un nome file con la stessa semantica di Path.suffix"""
+    index = name.rfind('.')
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ''
+
+
+def directory_size(node):
+    """Dimensione di un nodo directory: il totale del contenuto se calcolato, altrimenti quella del nodo"""
+    totals = getattr(node, 'totals', None)
+    return totals.size if totals is not None else node.size
+
+
+def allocated_size(stat_result):
+    """Spazio effettivamente occupato su disco (blocchi allocati) secondo stat"""
+    blocks = getattr(stat_result, 'st_blocks', None)
+    return stat_result.st_size if blocks is None else blocks * 512
+
+
+def natural_key(name):
+    """Chiave di ordinamento naturale: i gruppi di cifre si confrontano per valore"""
+    # Le parti alternano testo e cifre, quindi gli elementi confrontati hanno sempre lo stesso tipo
+    return tuple(int(part) if i % 2 else part.casefold() for i, part in enumerate(_DIGITS.split(name)))
+
+
+def make_sort_key(sort_order, describe, stat_of):
+    """Costruisce la chiave di ordinamento degli elementi di una directory.
+
+    describe restituisce (is_dir, nome) di un elemento e stat_of i suoi
+    metadati (o None), letti solo per gli ordinamenti per dimensione e data:
+    per le voci di os.scandir sono quelli già memorizzati dalla voce, se la
+    scansione li ha letti. Il nome chiude sempre la chiave, che risulta quindi
+    univoca. Restituisce None per l'ordine del filesystem.
+    """
+    if sort_order == SORT_FILESYSTEM:
+        return None
+
+    if sort_order == SORT_NAME_NOCASE:
+        def key(item):
+            is_dir, name = describe(item)
+            return not is_dir, name.casefold(), name
+    elif sort_order == SORT_NATURAL:
+        def key(item):
+            is_dir, name = describe(item)
+            return not is_dir, natural_key(name), name
+    elif sort_order == SORT_EXTENSION:
+        def key(item):
+            is_dir, name = describe(item)
+            return not is_dir, '' if is_dir else file_extension(name).lower(), name
+    elif sort_order == SORT_SIZE:
+        def key(item):
+            is_dir, name = describe(item)
+            if is_dir:
+                return False, 0, name
+            stat_result = stat_of(item)
+            return True, -stat_result.st_size if stat_result is not None else 0, name
+    elif sort_order == SORT_MTIME:
+        def key(item):
+            is_dir, name = describe(item)
+            stat_result = stat_of(item)
+            return not is_dir, -stat_result.st_mtime if stat_result is not None else 0.0, name
+    else:
+        def key(item):
+            is_dir, name = describe(item)
+            return not is_dir, name
+    return key
+
+
+class DirectoryTotals:
+    """Totali di una directory in stile du: dimensione apparente, spazio allocato,
+    numero di file e di sottodirectory contenuti (a qualsiasi profondità).
+    truncated indica totali parziali perché la durata massima è scaduta durante il conteggio."""
+
+    __slots__ = ('size', 'allocated', 'files', 'dirs', 'truncated')
+
+    def __init__(self, stat_result=None):
+        # La directory conta con la propria voce, come in du
+        self.size = stat_result.st_size if stat_result is not None else 0
+        self.allocated = allocated_size(stat_result) if stat_result is not None else 0
+        self.files = 0
+        self.dirs = 0
+        self.truncated = False
+
+    def add_file(self, stat_result):
+        self.size += stat_result.st_size
+        self.allocated += allocated_size(stat_result)
+        self.files += 1
+
+    def add_directory(self, totals):
+        self.size += totals.size
+        self.allocated += totals.allocated
+        self.files += totals.files
+        self.dirs += totals.dirs + 1
+        self.truncated = self.truncated or totals.truncated
+
+
+class OmittedEntries:
+    """Riepilogo degli elementi di una directory esclusi dal limite di elementi per directory.
+
+    Compare come ultimo figlio nelle esportazioni: size somma le dimensioni dei
+    file omessi e, se sono stati calcolati i totali, delle directory omesse.
+    """
+
+    __slots__ = ('count', 'size')
+
+    is_dir = False
+    extension = ''
+
+    def __init__(self):
+        self.count = 0
+        self.size = 0
+
+    def add(self, size):
+        self.count += 1
+        self.size += size
+
+    @property
+    def name(self):
+        label = "un altro elemento" if self.count == 1 else f"altri {self.count} elementi"
+        return f"... {label} ({format_file_size(self.size)})"
+
+
+class CollapseRules:
+    """Criteri per riassumere una directory in un unico nodo senza espanderne il contenuto.
+
+    Le directory con uno dei nomi indicati (ad esempio node_modules) non
+    vengono espanse e i loro totali si ottengono con una visita di solo
+    conteggio. Le soglie sugli elementi (file e directory) e sui byte del
+    sottoalbero si applicano ai totali raccolti dalla scansione.
+    """
+
+    def __init__(self, names=(), max_entries=None, max_bytes=None):
+        self._names = NameMatcher(names)
+        self.max_entries = max_entries or None
+        self.max_bytes = max_bytes or None
+
+    @property
+    def uses_totals(self):
+        """Indica se le regole richiedono i totali di ogni directory"""
+        return self.max_entries is not None or self.max_bytes is not None
+
+    def matches(self, name):
+        return self._names.matches(name)
+
+    def exceeds(self, totals):
+        return ((self.max_entries is not None and totals.files + totals.dirs > self.max_entries) or
+                (self.max_bytes is not None and totals.size > self.max_bytes))
+
+
+def mount_types():
+    """Restituisce i tipi di filesystem per punto di montaggio (vuoto se non disponibili)"""
+    types = {}
+    try:
+        with open('/proc/self/mounts', 'r', encoding='utf-8', errors='surrogateescape') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 3:
+                    # Spazi e caratteri speciali sono scritti in ottale (es. \040)
+                    mount_point = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[1])
+                    types[mount_point] = fields[2]
+    except OSError:
+        pass
+    return types
+
+
+class ScanReport:
+    """Informazioni raccolte durante una scansione oltre all'albero"""
+
+    def __init__(self):
+        # Percorsi delle directory non attraversate perché su un altro filesystem
+        self.skipped_mounts = []
+        # Percorsi delle directory il cui elenco ha superato il tempo massimo
+        self.timed_out = []
+        # Directory non elencate perché la durata massima della scansione è stata raggiunta
+        self.truncated = 0
+        # Percorsi delle directory non elencate perché tutti i thread di elenco erano bloccati
+        self.unlisted = []
+        # Heap (durata, percorso) degli elenchi più lenti
+        self._slowest = []
+
+    def record_listing(self, path, seconds):
+        """Registra la durata dell'elenco di una directory, conservando solo le più lente"""
+        if len(self._slowest) < SLOWEST_LISTINGS:
+            heapq.heappush(self._slowest, (seconds, path))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, path))
+
+    def slowest_listings(self):
+        """Restituisce le coppie (durata in secondi, percorso) degli elenchi più lenti, in ordine decrescente"""
+        return sorted(self._slowest, reverse=True)
+
+
+class _RecordedEntry:
+    """Voce di una directory ricostruita dall'indice delle modifiche senza elencarla.
+
+    Offre la parte dell'interfaccia di os.DirEntry usata dalla scansione; i
+    metadati vengono letti con lstat alla prima richiesta.
+    """
+
+    __slots__ = ('name', 'path', '_is_dir', '_lstat')
+
+    def __init__(self, dir_path, name, is_dir):
+        self.name = name
+        self.path = os.path.join(dir_path, name)
+        self._is_dir = is_dir
+        self._lstat = None
+
+    def is_dir(self, follow_symlinks=True):
+        return self._is_dir
+
+    def is_symlink(self):
+        try:
+            return stat.S_ISLNK(self.stat(follow_symlinks=False).st_mode)
+        except OSError:
+            return False
+
+    def stat(self, follow_symlinks=True):
+        if self._lstat is None:
+            self._lstat = os.lstat(self.path)
+        if follow_symlinks and stat.S_ISLNK(self._lstat.st_mode):
+            return os.stat(self.path)
+        return self._lstat
+
+
+class ScanNode:
+    """Elemento (file o directory) dell'albero prodotto dalla scansione"""
+
+    __slots__ = ('name', 'path', 'is_dir', 'size', 'mtime', 'children', 'totals', 'digest', 'timed_out',
+                 'truncated', 'omitted', 'collapsed', 'partial')
+
+    def __init__(self, name, path, is_dir, size=0, mtime=0.0):
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime = mtime
+        self.children = [] if is_dir else None
+        self.totals = None
+        self.digest = None
+        # La directory non è stata elencata entro il tempo massimo (figli incompleti)
+        self.timed_out = False
+        # La directory non è stata elencata perché la scansione ha esaurito la sua durata massima
+        self.truncated = False
+        # Elementi oltre il limite di elementi per directory (OmittedEntries, None se nessuno)
+        self.omitted = None
+        # Directory riassunta in un unico nodo (figli non riportati, totals se disponibili)
+        self.collapsed = False
+        # Anteprima per livelli: il budget si è esaurito prima di aggiungere tutti i figli
+        self.partial = False
+
+    @property
+    def extension(self):
+        return '' if self.is_dir else file_extension(self.name)
+
+
+class TreeScanner:
+    """Scansiona una directory applicando i filtri e costruisce l'albero in memoria"""
+
+    def __init__(self, filter_manager):
+        self.filter_manager = filter_manager
+        
+        # Sorgente degli elementi: filesystem oppure indice git (solo file tracciati)
+        self.source_mode = SOURCE_FILESYSTEM
+        self.include_untracked = False
+        
+        # Trattamento dei link simbolici
+        self.symlink_policy = SYMLINKS_FOLLOW
+        
+        # Ordine degli elementi di ogni directory
+        self.sort_order = SORT_NAME
+        
+        # Con one_filesystem non si scende nelle directory di altri filesystem
+        self.one_filesystem = False
+        self.report = ScanReport()
+        self._root_dev = None
+        
+        # Tempo massimo in secondi per l'elenco di una directory (None senza limite)
+        self.listing_timeout = None
+        self.retry_timeouts = False
+        self._listing_pool = None
+        self._pending_retries = []
+        
+        # Durata massima in secondi di una scansione (None senza limite)
+        self.max_duration = None
+        self._deadline = None
+        
+        self._collect_stat = False
+        # Funzione chiamata con (percorso, stat) per ogni file esportabile, anche se omesso o riassunto
+        self._observer = None
+        self._seen_inodes = set()
+        self._visited_dirs = set()
+        self._budget = None
+        # Coda delle directory da visitare nella visita in ampiezza (None nella visita in profondità)
+        self._queue = None
+        self._max_entries = None
+        self._collapse = None
+        # Chiavi di ordinamento delle voci del filesystem e dell'indice git (None per l'ordine del filesystem)
+        self._entry_key = None
+        self._git_key = None
+        self._path_rules = None
+        # Stato della scansione delle modifiche (vedi scan_changes)
+        self._since_ns = None
+        self._previous_index = None
+        self._directory_index = None
+
+    def set_source_mode(self, source_mode, include_untracked=False):
+        """Imposta la sorgente della scansione e l'eventuale inclusione dei file non tracciati"""
+        self.source_mode = source_mode
+        self.include_untracked = include_untracked
+
+    def set_symlink_policy(self, policy):
+        """Imposta se i link simbolici vanno seguiti, solo elencati o ignorati"""
+        self.symlink_policy = policy
+
+    def set_sort_order(self, sort_order):
+        """Imposta l'ordine degli elementi di ogni directory (SORT_*)"""
+        self.sort_order = sort_order
+
+    def set_one_filesystem(self, enabled):
+        """Imposta se limitare la scansione al filesystem della radice"""
+        self.one_filesystem = enabled
+
+    def set_listing_timeout(self, timeout, retry=False):
+        """Imposta il tempo massimo per elencare una directory e se riprovare alla fine quelle scadute"""
+        self.listing_timeout = timeout or None
+        self.retry_timeouts = retry
+
+    def set_max_duration(self, seconds):
+        """Imposta la durata massima delle scansioni, oltre la quale le directory restanti non vengono elencate"""
+        self.max_duration = seconds or None
+
+    def scan(self, root_dir, include_files=True, max_depth=None, max_items=None, collect_stat=False,
+             collect_totals=False, breadth_first=False, max_entries=None, collapse=None, file_observer=None):
+        """Restituisce il nodo radice dell'albero, o None se la radice è esclusa.
+
+        max_items limita il numero di nodi creati in ordine di visita (anteprima);
+        collect_stat legge dimensione e data di modifica di ogni elemento;
+        collect_totals calcola nella stessa visita i totali di ogni directory
+        (attributo totals), contando anche il contenuto oltre max_depth e i file
+        non inclusi dai filtri sui file. Gli hardlink vengono contati una sola volta.
+        Ogni directory (dispositivo, inode) viene visitata una sola volta: un ciclo
+        di link simbolici o un sottoalbero montato due volte compare come foglia.
+        Con one_filesystem anche i punti di montaggio compaiono come foglie e
+        vengono elencati in report. Con listing_timeout le directory che non si
+        riescono a elencare in tempo restano vuote con timed_out impostato (e
+        con retry_timeouts vengono riprovate una volta al termine della visita).
+        Con max_duration, scaduto il tempo le directory non ancora elencate
+        restano vuote con truncated impostato: l'albero resta coerente e può
+        essere esportato per intero.
+        Con breadth_first le directory vengono elencate per livelli, così che
+        max_items venga speso prima sui livelli superiori; a budget esaurito non
+        si aggiungono altri nodi. L'ordine dei figli resta quello consueto. È
+        ignorato con collect_totals, che richiede di completare ogni sottoalbero
+        prima della directory che lo contiene.
+        max_entries limita gli elementi riportati per ogni directory: i primi
+        nell'ordine consueto vengono scelti con una selezione parziale (heap)
+        senza ordinare l'intero elenco, i restanti sono riassunti in omitted.
+        collapse (CollapseRules) riassume le directory indicate o troppo grandi
+        in nodi con collapsed impostato e senza figli.
+        file_observer, se indicato, viene chiamato con (percorso, stat) per ogni
+        file incluso entro max_depth, compresi quelli riassunti in omitted o
+        nelle directory compresse, che non compaiono nell'albero.
+        """
+        root_path = Path(root_dir)
+        if self.filter_manager.is_excluded_dir(root_path.name):
+            return None
+
+        root = ScanNode(root_path.name, str(root_path), True)
+        self._collect_stat = collect_stat
+        self._seen_inodes = set()
+        self._visited_dirs = set()
+        self._start_report()
+        self._budget = None if max_items is None else max_items - 1
+        self._max_entries = max_entries
+        self._collapse = collapse
+        self._observer = file_observer if include_files and max_items is None else None
+        try:
+            stat_result = root_path.stat()
+            self._first_visit(stat_result)
+            self._root_dev = stat_result.st_dev
+        except OSError:
+            stat_result = None
+        if collect_stat and stat_result is not None:
+            root.mtime = stat_result.st_mtime
+        if collect_totals:
+            root.totals = DirectoryTotals(stat_result)
+
+        # Cursore nel trie dei percorsi esclusi (vuoto se non ci sono regole)
+        self._path_rules = self.filter_manager.get_path_rules()
+        paths = self._path_rules.root_cursor(root_path) if self._path_rules else ()
+        if paths is None:
+            return None
+
+        tracked = self._load_git_tree(root_path) if self.source_mode == SOURCE_GIT_INDEX else None
+        # Come in git, i file non tracciati rispettano le regole di ignore anche se i .gitignore sono disattivati
+        if self.filter_manager.use_gitignore or (tracked is not None and self.include_untracked):
+            ignore = IgnoreMatcher.for_root(root_path)
+        else:
+            ignore = None
+        self._queue = deque() if breadth_first and not collect_totals else None
+        try:
+            if tracked is not None:
+                self._scan_git_dir(root, tracked, 0, max_depth, include_files, ignore, '', paths)
+            else:
+                self._scan_dir(root, 0, max_depth, include_files, ignore, '', paths)
+            while self._queue and not self._exhausted():
+                scan_method, node, args = self._queue.popleft()
+                scan_method(node, *args)
+            self._queue = None
+            if self._pending_retries:
+                self._retry_timed_out(root)
+        finally:
+            self._queue = None
+            self._close_listing()
+        return root
+
+    def scan_changes(self, root_dir, since, previous=None, include_files=True, max_depth=None):
+        """Restituisce l'albero dei soli elementi creati o modificati dopo since.
+
+        since è un timestamp; previous è l'indice delle directory di una visita
+        precedente (vedi ChangeIndex). Una directory la cui data di modifica
+        coincide con quella registrata non ha guadagnato né perso elementi e non
+        viene elencata: i suoi elementi sono quelli registrati. I file di ogni
+        directory vengono comunque letti con stat: un file conta come modificato
+        se la sua data di modifica o di cambio di stato è successiva a since,
+        quindi anche i file riscritti sul posto, che non cambiano la data della
+        directory, vengono rilevati. Le directory nuove rispetto all'indice
+        vengono riportate con tutto il contenuto. Restituisce la coppia (radice
+        o None se esclusa, nuovo indice delle directory); la sorgente è sempre
+        il filesystem.
+        """
+        root_path = Path(root_dir)
+        if self.filter_manager.is_excluded_dir(root_path.name):
+            return None, {}
+
+        self._path_rules = self.filter_manager.get_path_rules()
+        paths = self._path_rules.root_cursor(root_path) if self._path_rules else ()
+        if paths is None:
+            return None, {}
+
+        root = ScanNode(root_path.name, str(root_path), True)
+        directories = {}
+        self._start_report()
+        try:
+            stat_result = root_path.stat()
+        except OSError:
+            return root, directories
+        root.mtime = stat_result.st_mtime
+
+        self._visited_dirs = set()
+        self._first_visit(stat_result)
+        self._root_dev = stat_result.st_dev
+        self._since_ns = int(since * 1_000_000_000)
+        self._max_entries = None
+        self._observer = None
+        self._previous_index = previous
+        self._directory_index = directories
+        ignore = IgnoreMatcher.for_root(root_path) if self.filter_manager.use_gitignore else None
+        try:
+            self._scan_changed_dir(root, stat_result, 0, max_depth, include_files, ignore, '', paths, False)
+        finally:
+            self._close_listing()
+        return root, directories
+
+    def _scan_changed_dir(self, node, stat_result, depth, max_depth, include_files, ignore, relative_dir,
+                          paths, is_new):
+        """Popola un nodo directory con i soli figli modificati; restituisce True se ne ha.
+
+        is_new indica che la directory non esisteva alla visita precedente e va
+        quindi riportata per intero.
+        """
+        changed = is_new or max(stat_result.st_mtime_ns, stat_result.st_ctime_ns) >= self._since_ns
+        if self._previous_index is not None and relative_dir not in self._previous_index:
+            is_new = is_new or changed
+
+        recorded = self._previous_index.get(relative_dir) if self._previous_index else None
+        if self._out_of_time(node):
+            # L'indice conserva i dati della visita precedente
+            if recorded is not None:
+                self._directory_index[relative_dir] = recorded
+            return True
+        if recorded is not None and recorded[0] == stat_result.st_mtime_ns:
+            # Directory invariata: gli elementi sono quelli registrati
+            subdirs = [_RecordedEntry(node.path, name, True) for name in recorded[1]]
+            files = [_RecordedEntry(node.path, name, False) for name in recorded[2]]
+            ignore_files = recorded[3]
+            self._directory_index[relative_dir] = recorded
+        else:
+            try:
+                entries = self._list_dir(node.path)
+            except ListingTimeout:
+                # Riportata come incompleta; l'indice conserva i dati della visita precedente
+                node.timed_out = True
+                if recorded is not None:
+                    self._directory_index[relative_dir] = recorded
+                return True
+            except ListingPoolExhausted:
+                node.truncated = True
+                if recorded is not None:
+                    self._directory_index[relative_dir] = recorded
+                return True
+            except OSError:
+                return False
+            names = {entry.name for entry in entries}
+            subdirs = [entry for entry in entries if entry.is_dir()]
+            files = [entry for entry in entries if not entry.is_dir()]
+            ignore_files = [name for name in IGNORE_FILE_NAMES if name in names]
+            self._directory_index[relative_dir] = [stat_result.st_mtime_ns,
+                                                   [entry.name for entry in subdirs],
+                                                   [entry.name for entry in files],
+                                                   ignore_files]
+
+        if ignore is not None:
+            ignore = ignore.enter_directory(node.path, relative_dir, set(ignore_files))
+
+        for entry in self._ordered(subdirs, node, self._entry_key):
+            name = entry.name
+            pruned, _, child_paths = self._is_pruned(name, True, ignore, relative_dir, paths)
+            if pruned or self.filter_manager.is_excluded_dir(name):
+                continue
+            if max_depth is not None and depth + 1 > max_depth:
+                continue
+            path = entry.path
+            try:
+                is_link = entry.is_symlink()
+                if is_link and self.symlink_policy == SYMLINKS_SKIP:
+                    continue
+                child_stat = os.stat(path)
+            except OSError:
+                continue
+            child = ScanNode(name, path, True, 0, child_stat.st_mtime)
+            relative_path = f"{relative_dir}/{name}" if relative_dir else name
+            child_changed = False
+            if (not is_link or self.symlink_policy == SYMLINKS_FOLLOW) and self._may_enter(path, child_stat):
+                child_changed = self._scan_changed_dir(child, child_stat, depth + 1, max_depth, include_files,
+                                                       ignore, relative_path, child_paths, is_new)
+            if child_changed or max(child_stat.st_mtime_ns, child_stat.st_ctime_ns) >= self._since_ns:
+                node.children.append(child)
+
+        if include_files:
+            for entry in self._ordered(files, node, self._entry_key):
+                if self._skip_entry(entry):
+                    continue
+                pruned, _, _ = self._is_pruned(entry.name, False, ignore, relative_dir, paths)
+                if pruned:
+                    continue
+                file_stat = self._entry_stat(entry)
+                if file_stat is None:
+                    continue
+                if not is_new and max(file_stat.st_mtime_ns, file_stat.st_ctime_ns) < self._since_ns:
+                    continue
+                if self.filter_manager.is_included_file(Path(entry.path), stat_result=file_stat):
+                    node.children.append(ScanNode(entry.name, entry.path, False,
+                                                  file_stat.st_size, file_stat.st_mtime))
+        return bool(node.children)
+
+    def _load_git_tree(self, root_path):
+        """Legge l'indice del repository che contiene root_path (None se non è un repository)"""
+        repository = find_repository(root_path)
+        if repository is None:
+            return None
+        work_tree, git_dir = repository
+        prefix = os.path.relpath(os.path.abspath(root_path), work_tree).replace(os.sep, '/')
+        return build_index_tree(read_git_index(git_dir), '' if prefix == '.' else prefix)
+
+    def _is_pruned(self, name, is_dir, ignore, relative_dir, paths):
+        """Verifica le regole di percorso e di ignore per un elemento della directory.
+
+        Restituisce la tupla (scartato, percorso relativo, cursore del figlio).
+        """
+        child_paths = paths
+        if paths:
+            excluded, child_paths = self._path_rules.descend(paths, name)
+            if excluded:
+                return True, None, child_paths
+
+        relative_path = None
+        if ignore is not None:
+            relative_path = f"{relative_dir}/{name}" if relative_dir else name
+            if ignore.is_ignored(relative_path, is_dir):
+                return True, relative_path, child_paths
+        return False, relative_path, child_paths
+
+    def _scan_dir(self, node, depth, max_depth, include_files, ignore=None, relative_dir='', paths=()):
+        """Popola ricorsivamente i figli di un nodo directory.
+
+        ignore è il matcher gitignore ereditato dalla directory padre e paths il
+        cursore nel trie dei percorsi esclusi: le directory ignorate o escluse
+        vengono scartate prima di essere elencate.
+        """
+        if self._out_of_time(node):
+            return
+        try:
+            listing = self._list_dir(node.path)
+        except ListingTimeout:
+            node.timed_out = True
+            if self.retry_timeouts:
+                self._pending_retries.append((node, (depth, max_depth, include_files, ignore, relative_dir, paths)))
+            return
+        except ListingPoolExhausted:
+            # Non tentata: segnata come troncata, non come scaduta
+            node.truncated = True
+            return
+        except OSError:
+            return
+
+        if ignore is not None:
+            ignore = ignore.enter_directory(node.path, relative_dir, {entry.name for entry in listing})
+
+        totals = node.totals
+        for entry in self._ordered(listing, node, self._entry_key):
+            # A budget esaurito i fratelli restanti vengono comunque elencati (senza
+            # scendere nelle sottodirectory) così da sapere quale elemento è l'ultimo
+            exhausted = self._exhausted()
+            if exhausted and self._queue is not None:
+                # Nella visita per livelli ci si ferma: la directory resta incompleta
+                node.partial = True
+                break
+            if self._skip_entry(entry):
+                continue
+            is_dir = entry.is_dir()
+
+            pruned, relative_path, child_paths = self._is_pruned(entry.name, is_dir, ignore,
+                                                                 relative_dir, paths)
+            if pruned:
+                continue
+
+            if is_dir:
+                if self.filter_manager.is_excluded_dir(entry.name):
+                    continue
+                if max_depth is not None and depth + 1 > max_depth:
+                    if totals is not None:
+                        totals.add_directory(self._measure_dir(entry, ignore, relative_path, child_paths))
+                    continue
+                if self._is_full(node):
+                    measured = None
+                    if totals is not None or self._observer is not None:
+                        measured = self._measure_dir(entry, ignore, relative_path, child_paths,
+                                                     self._observed_levels(depth + 1, max_depth))
+                        if totals is not None:
+                            totals.add_directory(measured)
+                    self._omit(node, measured.size if measured is not None else 0)
+                    continue
+                child = ScanNode(entry.name, entry.path, True)
+                if totals is not None:
+                    child.totals = DirectoryTotals(self._entry_stat(entry))
+                self._append(node, child, entry)
+                if self._collapse is not None and self._collapse.matches(entry.name):
+                    child.collapsed = True
+                    # Il conteggio si salta solo nelle anteprime
+                    if self._budget is None:
+                        child.totals = self._measure_dir(entry, ignore, relative_path, child_paths,
+                                                         self._observed_levels(depth + 1, max_depth))
+                elif not exhausted and self._can_descend(entry):
+                    self._descend(self._scan_dir, child, depth + 1, max_depth, include_files, ignore,
+                                  relative_path, child_paths)
+                    self._collapse_if_heavy(child)
+                if totals is not None:
+                    totals.add_directory(child.totals)
+            else:
+                stat_result = self._entry_stat(entry) if totals is not None else None
+                if totals is not None:
+                    self._count_file(totals, stat_result)
+                if include_files and self.filter_manager.is_included_file(Path(entry.path)):
+                    if self._observer is not None:
+                        self._observe(entry)
+                    if self._is_full(node):
+                        if stat_result is None:
+                            stat_result = self._entry_stat(entry)
+                        self._omit(node, stat_result.st_size if stat_result is not None else 0)
+                    else:
+                        self._append(node, ScanNode(entry.name, entry.path, False), entry)
+
+    def _scan_git_dir(self, node, tracked, depth, max_depth, include_files, ignore=None, relative_dir='',
+                      paths=()):
+        """Popola i figli di un nodo dall'albero dell'indice git, senza elencare la directory.
+
+        Con include_untracked la directory viene elencata anche sul disco: i file
+        non tracciati si aggiungono e le sottodirectory non tracciate si scansionano
+        con la normale visita del filesystem. Come in git, le regole di ignore
+        valgono solo per gli elementi non tracciati.
+        """
+        if self._out_of_time(node):
+            return
+        items = self._git_items(node.path, tracked)
+
+        if ignore is not None:
+            ignore = ignore.enter_directory(node.path, relative_dir, {item[1] for item in items})
+
+        totals = node.totals
+        for is_dir, name, value in self._ordered(items, node, self._git_key):
+            exhausted = self._exhausted()
+            if exhausted and self._queue is not None:
+                node.partial = True
+                break
+            path = os.path.join(node.path, name)
+            untracked = isinstance(value, os.DirEntry)
+
+            pruned, relative_path, child_paths = self._is_pruned(
+                name, is_dir, ignore if untracked else None, relative_dir, paths)
+            if pruned:
+                continue
+            if relative_path is None and ignore is not None:
+                relative_path = f"{relative_dir}/{name}" if relative_dir else name
+
+            if is_dir:
+                if self.filter_manager.is_excluded_dir(name):
+                    continue
+                if max_depth is not None and depth + 1 > max_depth:
+                    if totals is not None:
+                        if untracked:
+                            measured = self._measure_dir(value, ignore, relative_path, child_paths)
+                        else:
+                            measured = self._measure_git_dir(path, value, ignore, relative_path, child_paths)
+                        totals.add_directory(measured)
+                    continue
+                if self._is_full(node):
+                    measured = None
+                    if totals is not None or self._observer is not None:
+                        levels = self._observed_levels(depth + 1, max_depth)
+                        if untracked:
+                            measured = self._measure_dir(value, ignore, relative_path, child_paths, levels)
+                        else:
+                            measured = self._measure_git_dir(path, value, ignore, relative_path, child_paths,
+                                                             levels)
+                        if totals is not None:
+                            totals.add_directory(measured)
+                    self._omit(node, measured.size if measured is not None else 0)
+                    continue
+                child = ScanNode(name, path, True)
+                if totals is not None:
+                    child.totals = DirectoryTotals(self._entry_stat(value) if untracked else self._path_stat(path))
+                if untracked:
+                    self._append(node, child, value)
+                else:
+                    self._append_node(node, child)
+                if self._collapse is not None and self._collapse.matches(name):
+                    child.collapsed = True
+                    levels = self._observed_levels(depth + 1, max_depth)
+                    if self._budget is None and untracked:
+                        child.totals = self._measure_dir(value, ignore, relative_path, child_paths, levels)
+                    elif self._budget is None:
+                        child.totals = self._measure_git_dir(path, value, ignore, relative_path, child_paths,
+                                                             levels)
+                elif untracked:
+                    if not exhausted and self._can_descend(value):
+                        self._descend(self._scan_dir, child, depth + 1, max_depth, include_files, ignore,
+                                      relative_path, child_paths)
+                        self._collapse_if_heavy(child)
+                elif not exhausted:
+                    self._descend(self._scan_git_dir, child, value, depth + 1, max_depth, include_files,
+                                  ignore, relative_path, child_paths)
+                    self._collapse_if_heavy(child)
+                if totals is not None:
+                    totals.add_directory(child.totals)
+            else:
+                if totals is not None:
+                    self._count_file(totals, self._entry_stat(value) if untracked else self._path_stat(path))
+                if not include_files:
+                    continue
+                if untracked:
+                    if not self.filter_manager.is_included_file(Path(path)):
+                        continue
+                    if self._observer is not None:
+                        self._observe(value)
+                    if self._is_full(node):
+                        stat_result = self._entry_stat(value)
+                        self._omit(node, stat_result.st_size if stat_result is not None else 0)
+                    else:
+                        self._append(node, ScanNode(name, path, False), value)
+                elif self.filter_manager.is_included_file(Path(path), stat_result=value):
+                    if self._observer is not None:
+                        self._observer(path, value)
+                    if self._is_full(node):
+                        self._omit(node, value.st_size)
+                    else:
+                        self._append_node(node, ScanNode(name, path, False, value.st_size, value.st_mtime))
+
+    def _git_items(self, dir_path, tracked):
+        """Elementi di una directory dell'indice, più quelli non tracciati se richiesti"""
+        items = [(isinstance(value, dict), name, value) for name, value in tracked.items()]
+
+        if self.include_untracked:
+            try:
+                for entry in self._list_dir(dir_path):
+                    if entry.name not in tracked and entry.name != '.git' and not self._skip_entry(entry):
+                        items.append((entry.is_dir(), entry.name, entry))
+            except OSError:
+                pass
+        return items
+
+    def _measure_dir(self, entry, ignore, relative_dir, paths, levels=None):
+        """Calcola i totali di una directory oltre max_depth, senza creare nodi.
+
+        Con levels (vedi _observed_levels) i file inclusi vengono passati anche
+        all'osservatore, scendendo al più di levels livelli.
+        """
+        totals = DirectoryTotals(self._entry_stat(entry))
+        if not self._can_descend(entry):
+            return totals
+        if self._out_of_time():
+            totals.truncated = True
+            return totals
+        try:
+            entries = self._list_dir(entry.path)
+        except OSError:
+            return totals
+
+        if ignore is not None:
+            ignore = ignore.enter_directory(entry.path, relative_dir, {child.name for child in entries})
+
+        for child in entries:
+            if self._skip_entry(child):
+                continue
+            is_dir = child.is_dir()
+            pruned, relative_path, child_paths = self._is_pruned(child.name, is_dir, ignore,
+                                                                 relative_dir, paths)
+            if pruned:
+                continue
+            if is_dir:
+                if not self.filter_manager.is_excluded_dir(child.name):
+                    totals.add_directory(self._measure_dir(child, ignore, relative_path, child_paths,
+                                                           self._sublevels(levels)))
+            else:
+                self._count_file(totals, self._entry_stat(child))
+                if levels is not None and self.filter_manager.is_included_file(Path(child.path)):
+                    self._observe(child)
+        return totals
+
+    def _measure_git_dir(self, dir_path, tracked, ignore, relative_dir, paths, levels=None):
+        """Calcola i totali di una directory dell'indice git oltre max_depth (levels come in _measure_dir)"""
+        totals = DirectoryTotals(self._path_stat(dir_path))
+        if self._out_of_time():
+            totals.truncated = True
+            return totals
+        items = self._git_items(dir_path, tracked)
+
+        if ignore is not None:
+            ignore = ignore.enter_directory(dir_path, relative_dir, {item[1] for item in items})
+
+        for is_dir, name, value in items:
+            untracked = isinstance(value, os.DirEntry)
+            pruned, relative_path, child_paths = self._is_pruned(
+                name, is_dir, ignore if untracked else None, relative_dir, paths)
+            if pruned:
+                continue
+            if relative_path is None and ignore is not None:
+                relative_path = f"{relative_dir}/{name}" if relative_dir else name
+
+            path = os.path.join(dir_path, name)
+            if is_dir:
+                if self.filter_manager.is_excluded_dir(name):
+                    continue
+                if untracked:
+                    totals.add_directory(self._measure_dir(value, ignore, relative_path, child_paths,
+                                                           self._sublevels(levels)))
+                else:
+                    totals.add_directory(self._measure_git_dir(path, value, ignore, relative_path, child_paths,
+                                                               self._sublevels(levels)))
+            else:
+                self._count_file(totals, self._entry_stat(value) if untracked else self._path_stat(path))
+                if levels is None:
+                    continue
+                if untracked:
+                    if self.filter_manager.is_included_file(Path(path)):
+                        self._observe(value)
+                elif self.filter_manager.is_included_file(Path(path), stat_result=value):
+                    self._observer(path, value)
+        return totals
+
+    def _list_dir(self, path):
+        """Elenca una directory rispettando il tempo massimo e ne registra la durata.
+
+        Solleva ListingTimeout (sottoclasse di OSError) se il tempo scade e
+        ListingPoolExhausted se tutti i thread sono bloccati in elenchi scaduti;
+        in entrambi i casi la directory viene annotata nel report.
+        """
+        start = time.perf_counter()
+        try:
+            if self.listing_timeout is None:
+                with os.scandir(path) as iterator:
+                    return list(iterator)
+            if self._listing_pool is None:
+                self._listing_pool = ListingPool()
+            return self._listing_pool.list(path, self.listing_timeout)
+        except ListingTimeout:
+            self.report.timed_out.append(path)
+            raise
+        except ListingPoolExhausted:
+            self.report.unlisted.append(path)
+            raise
+        finally:
+            self.report.record_listing(path, time.perf_counter() - start)
+
+    def _close_listing(self):
+        self._pending_retries = []
+        if self._listing_pool is not None:
+            self._listing_pool.close()
+            self._listing_pool = None
+
+    def _retry_timed_out(self, root):
+        """Riprova una volta le directory scadute, aggiornando i totali delle directory superiori"""
+        pending, self._pending_retries = self._pending_retries, []
+        retry_timeouts, self.retry_timeouts = self.retry_timeouts, False
+        try:
+            for node, args in pending:
+                node.timed_out = False
+                self.report.timed_out.remove(node.path)
+                before = self._totals_values(node.totals)
+                self._scan_dir(node, *args)
+                if node.totals is None:
+                    continue
+                delta = [after - previous for after, previous in zip(self._totals_values(node.totals), before)]
+                for ancestor in self._ancestors(root, node):
+                    ancestor.totals.size += delta[0]
+                    ancestor.totals.allocated += delta[1]
+                    ancestor.totals.files += delta[2]
+                    ancestor.totals.dirs += delta[3]
+        finally:
+            self.retry_timeouts = retry_timeouts
+
+    @staticmethod
+    def _totals_values(totals):
+        if totals is None:
+            return 0, 0, 0, 0
+        return totals.size, totals.allocated, totals.files, totals.dirs
+
+    @staticmethod
+    def _ancestors(root, node):
+        """Restituisce le directory dell'albero che contengono node, dalla radice"""
+        ancestors = []
+        current = root
+        for name in os.path.relpath(node.path, root.path).split(os.sep)[:-1]:
+            ancestors.append(current)
+            current = next(child for child in current.children if child.is_dir and child.name == name)
+        ancestors.append(current)
+        return ancestors
+
+    def _skip_entry(self, entry):
+        """Verifica se la voce è un link simbolico da ignorare secondo la politica impostata"""
+        return self.symlink_policy == SYMLINKS_SKIP and entry.is_symlink()
+
+    def _can_descend(self, entry):
+        """Verifica se si può scendere nella directory di una voce di os.scandir.
+
+        I link simbolici si seguono solo con la politica follow, e ogni directory
+        viene visitata una sola volta così che i cicli non causino ricorsioni infinite.
+        """
+        if self.symlink_policy != SYMLINKS_FOLLOW and entry.is_symlink():
+            return False
+        try:
+            stat_result = entry.stat()
+            if not stat_result.st_ino:
+                # Su Windows le voci di os.scandir non riportano l'inode
+                stat_result = os.stat(entry.path)
+            return self._may_enter(entry.path, stat_result)
+        except OSError:
+            return False
+
+    def _may_enter(self, path, stat_result):
+        """Verifica filesystem e visite precedenti prima di scendere in una directory"""
+        if self.one_filesystem and self._root_dev is not None and stat_result.st_dev != self._root_dev:
+            self.report.skipped_mounts.append(path)
+            return False
+        return self._first_visit(stat_result)
+
+    def _start_report(self):
+        self.report = ScanReport()
+        self._entry_key = make_sort_key(self.sort_order, lambda entry: (entry.is_dir(), entry.name),
+                                        self._entry_stat)
+        self._git_key = make_sort_key(self.sort_order, lambda item: (item[0], item[1]), self._git_item_stat)
+        self._root_dev = None
+        self._deadline = None if self.max_duration is None else time.monotonic() + self.max_duration
+
+    def _out_of_time(self, node=None):
+        """Verifica se la durata massima è esaurita, segnando come troncata la directory indicata.
+
+        Anche i totali della directory, se calcolati, risultano parziali. Solo le
+        directory segnate contano nel riepilogo: le misurazioni interrotte (node
+        None) non tolgono elementi all'albero esportato.
+        """
+        if self._deadline is None or time.monotonic() < self._deadline:
+            return False
+        if node is not None:
+            node.truncated = True
+            if node.totals is not None:
+                node.totals.truncated = True
+            self.report.truncated += 1
+        return True
+
+    def _first_visit(self, stat_result):
+        """Registra una directory come visitata; False se (dispositivo, inode) era già stato visto"""
+        if not stat_result.st_ino:
+            return True
+        key = (stat_result.st_dev, stat_result.st_ino)
+        if key in self._visited_dirs:
+            return False
+        self._visited_dirs.add(key)
+        return True
+
+    @staticmethod
+    def _entry_stat(entry):
+        """Metadati di una voce di os.scandir senza seguire i link simbolici (None se illeggibili)"""
+        try:
+            return entry.stat(follow_symlinks=False)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _path_stat(path):
+        try:
+            return os.lstat(path)
+        except OSError:
+            return None
+
+    def _count_file(self, totals, stat_result):
+        """Aggiunge un file ai totali; i file con più hardlink vengono contati una volta sola"""
+        if stat_result is None:
+            return
+        if stat_result.st_nlink > 1 and stat_result.st_ino:
+            key = (stat_result.st_dev, stat_result.st_ino)
+            if key in self._seen_inodes:
+                return
+            self._seen_inodes.add(key)
+        totals.add_file(stat_result)
+
+    def _ordered(self, items, node, key):
+        """Restituisce gli elementi di una directory in ordine di key.
+
+        Con un limite di elementi per directory gli elementi vengono estratti da
+        un heap solo finché il nodo non è pieno; i restanti, destinati al
+        riepilogo, seguono senza essere ordinati. key deve essere univoca; con
+        key None gli elementi restano nell'ordine del filesystem.
+        """
+        if key is None:
+            yield from items
+            return
+        if self._max_entries is None:
+            yield from sorted(items, key=key)
+            return
+        heap = [(key(item), item) for item in items]
+        heapq.heapify(heap)
+        while heap and not self._is_full(node):
+            yield heapq.heappop(heap)[1]
+        for _, item in heap:
+            yield item
+
+    def _git_item_stat(self, item):
+        """Metadati di un file dell'indice git (o non tracciato), None per le directory"""
+        if item[0]:
+            return None
+        return self._entry_stat(item[2]) if isinstance(item[2], os.DirEntry) else item[2]
+
+    def _is_full(self, node):
+        """Verifica se la directory ha raggiunto il limite di elementi per directory"""
+        return self._max_entries is not None and len(node.children) >= self._max_entries
+
+    def _observed_levels(self, depth, max_depth):
+        """Livelli di sottodirectory esportabili sotto una directory a profondità depth.
+
+        None se non c'è un osservatore: i file della directory e delle
+        sottodirectory entro quei livelli vanno passati all'osservatore.
+        """
+        if self._observer is None:
+            return None
+        return math.inf if max_depth is None else max_depth - depth
+
+    @staticmethod
+    def _sublevels(levels):
+        """Livelli osservati in una sottodirectory (None oltre l'ultimo)"""
+        return levels - 1 if levels is not None and levels > 0 else None
+
+    def _observe(self, entry):
+        """Passa all'osservatore un file incluso con i metadati usati anche per i nodi"""
+        try:
+            stat_result = entry.stat()
+        except OSError:
+            return
+        self._observer(entry.path, stat_result)
+
+    @staticmethod
+    def _omit(node, size):
+        """Conta nel riepilogo della directory un elemento oltre il limite"""
+        if node.omitted is None:
+            node.omitted = OmittedEntries()
+        node.omitted.add(size)
+
+    def _collapse_if_heavy(self, node):
+        """Riassume una directory già visitata se i suoi totali superano le soglie"""
+        if self._collapse is None or node.totals is None or not self._collapse.exceeds(node.totals):
+            return
+        node.children = []
+        node.omitted = None
+        node.collapsed = True
+        # Le directory scadute all'interno non vanno più riprovate
+        prefix = node.path + os.sep
+        self._pending_retries = [item for item in self._pending_retries if not item[0].path.startswith(prefix)]
+
+    def _exhausted(self):
+        """Verifica se il numero massimo di nodi dell'anteprima è stato raggiunto"""
+        return self._budget is not None and self._budget <= 0
+
+    def _descend(self, scan_method, node, *args):
+        """Visita subito una sottodirectory, o la accoda nella visita in ampiezza"""
+        if self._queue is not None:
+            self._queue.append((scan_method, node, args))
+        else:
+            scan_method(node, *args)
+
+    def _append_node(self, parent, child):
+        """Aggiunge un figlio i cui metadati sono già noti"""
+        parent.children.append(child)
+        if self._budget is not None:
+            self._budget -= 1
+
+    def _append(self, parent, child, entry):
+        """Aggiunge un figlio al nodo, leggendo i metadati se richiesto"""
+        if self._collect_stat:
+            try:
+                stat_result = entry.stat()
+                child.size = 0 if child.is_dir else stat_result.st_size
+                child.mtime = stat_result.st_mtime
+            except OSError:
+                pass
+        self._append_node(parent, child)
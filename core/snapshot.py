@@ -0,0 +1,322 @@
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import time
+from collections import deque
+
+from core.merkle import DIGEST_SIZE, MERKLE_CONTENT, MERKLE_METADATA
+from core.scanner import file_extension
+
+# Formato binario dello snapshot:
+#   header | record dei nodi a larghezza fissa (ordine BFS) | [hash di Merkle] | tabella delle stringhe
+# In ordine BFS i figli di ogni directory sono contigui, quindi ogni nodo
+# conserva solo l'indice del primo figlio e il numero di figli. La sezione
+# opzionale degli hash (32 byte per nodo, stesso ordine) è segnalata da un flag
+# e precede la tabella delle stringhe, quindi i lettori che la ignorano
+# continuano a funzionare.
+SNAPSHOT_SUFFIX = '.dsnap'
+SNAPSHOT_MAGIC = b'DSXSNAP\x00'
+SNAPSHOT_VERSION = 1
+
+# Flag dell'header
+SNAPSHOT_SORTED_BY_NAME = 0x1   # I figli sono ordinati (directory prima, poi per nome)
+SNAPSHOT_HAS_DIGESTS = 0x2      # Presente la sezione degli hash di Merkle
+SNAPSHOT_CONTENT_DIGESTS = 0x4  # Hash dei file calcolati sul contenuto (altrimenti sui metadati)
+
+# Flag dei nodi
+NODE_DIR = 0x1
+
+NO_PARENT = 0xFFFFFFFF
+
+# magic, versione, flag, numero nodi, offset nodi, offset stringhe, dimensione stringhe,
+# data di creazione, offset e lunghezza del percorso radice
+_HEADER = struct.Struct('<8sHHQQQQdQI')
+# genitore, primo figlio, numero figli, flag, lunghezza nome, offset nome, dimensione, data modifica
+_NODE = struct.Struct('<IIIHHQQd')
+
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def is_snapshot_file(path):
+    """Verifica se il percorso indica un file snapshot"""
+    return str(path).lower().endswith(SNAPSHOT_SUFFIX) and os.path.isfile(path)
+
+
+def _encode(text):
+    return text.encode('utf-8', 'surrogateescape')
+
+
+def _decode(data):
+    return data.decode('utf-8', 'surrogateescape')
+
+
+def write_snapshot(root, output_file_path, root_path=None, sorted_by_name=True, merkle_mode=None):
+    """Scrive l'albero con radice root in un file snapshot binario.
+
+    I record dei nodi vengono scritti in streaming; la tabella delle stringhe
+    (e gli hash di Merkle, se i nodi li hanno e merkle_mode li descrive)
+    viene accumulata in un file temporaneo e accodata alla fine.
+    """
+    root_path = root_path if root_path is not None else getattr(root, 'path', root.name)
+    flags = SNAPSHOT_SORTED_BY_NAME if sorted_by_name else 0
+    with_digests = merkle_mode is not None and getattr(root, 'digest', None) is not None
+    if with_digests:
+        flags |= SNAPSHOT_HAS_DIGESTS
+        if merkle_mode == MERKLE_CONTENT:
+            flags |= SNAPSHOT_CONTENT_DIGESTS
+
+    with open(output_file_path, 'wb') as output, tempfile.TemporaryFile() as strings, \
+            tempfile.TemporaryFile() as digests:
+        output.write(b'\0' * _HEADER.size)
+
+        strings_size = 0
+        buffer = bytearray()
+        queue = deque([(root, NO_PARENT)])
+        next_index = 1
+        count = 0
+
+        while queue:
+            node, parent_index = queue.popleft()
+            children = node.children if node.is_dir else None
+            child_count = len(children) if children else 0
+            first_child = next_index if child_count else 0
+            if child_count:
+                for child in children:
+                    queue.append((child, count))
+                next_index += child_count
+
+            name = _encode(node.name)
+            buffer += _NODE.pack(parent_index, first_child, child_count,
+                                 NODE_DIR if node.is_dir else 0, len(name), strings_size,
+                                 node.size or 0, node.mtime or 0.0)
+            strings.write(name)
+            strings_size += len(name)
+            if with_digests:
+                digests.write(node.digest)
+            count += 1
+
+            if len(buffer) >= _WRITE_BUFFER_SIZE:
+                output.write(buffer)
+                buffer.clear()
+
+        output.write(buffer)
+
+        if with_digests:
+            digests.seek(0)
+            shutil.copyfileobj(digests, output)
+
+        encoded_root = _encode(str(root_path))
+        strings.write(encoded_root)
+        root_path_offset = strings_size
+        strings_size += len(encoded_root)
+
+        strings_offset = output.tell()
+        strings.seek(0)
+        shutil.copyfileobj(strings, output)
+
+        output.seek(0)
+        output.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, count, _HEADER.size,
+                                  strings_offset, strings_size, time.time(),
+                                  root_path_offset, len(encoded_root)))
+    return count
+
+
+class SnapshotNode:
+    """Vista su un nodo dello snapshot, letta direttamente dalla memoria mappata"""
+
+    __slots__ = ('snapshot', 'index', '_record')
+
+    def __init__(self, snapshot, index):
+        self.snapshot = snapshot
+        self.index = index
+        self._record = snapshot._read_record(index)
+
+    @property
+    def name(self):
+        return self.snapshot._read_string(self._record[5], self._record[4])
+
+    @property
+    def is_dir(self):
+        return bool(self._record[3] & NODE_DIR)
+
+    @property
+    def size(self):
+        return self._record[6]
+
+    @property
+    def mtime(self):
+        return self._record[7]
+
+    @property
+    def extension(self):
+        return '' if self.is_dir else file_extension(self.name)
+
+    @property
+    def digest(self):
+        return self.snapshot._read_digest(self.index)
+
+    @property
+    def child_count(self):
+        return self._record[2]
+
+    @property
+    def has_subdirectories(self):
+        """Indica se la directory contiene sottodirectory: negli snapshot ordinati basta il primo figlio"""
+        first, count = self._record[1], self._record[2]
+        if not self.is_dir or count == 0:
+            return False
+        if self.snapshot.flags & SNAPSHOT_SORTED_BY_NAME:
+            return bool(self.snapshot._read_record(first)[3] & NODE_DIR)
+        return any(self.snapshot._read_record(index)[3] & NODE_DIR for index in range(first, first + count))
+
+    @property
+    def children(self):
+        if not self.is_dir:
+            return None
+        first, count = self._record[1], self._record[2]
+        return [SnapshotNode(self.snapshot, i) for i in range(first, first + count)]
+
+    @property
+    def parent(self):
+        parent_index = self._record[0]
+        if parent_index == NO_PARENT:
+            return None
+        return SnapshotNode(self.snapshot, parent_index)
+
+    @property
+    def path(self):
+        names = []
+        node = self
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return os.path.join(self.snapshot.root_path, *reversed(names))
+
+
+class Snapshot:
+    """Snapshot binario aperto in sola lettura tramite mmap.
+
+    Solo le pagine effettivamente visitate vengono caricate dal sistema operativo,
+    quindi l'apertura è immediata anche per snapshot con milioni di elementi.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = str(file_path)
+        self._file = open(file_path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self._file.close()
+            raise ValueError(f"File snapshot non valido: '{file_path}'")
+
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"File snapshot non valido: '{file_path}'")
+
+        (magic, version, self.flags, self.node_count, self._nodes_offset,
+         self._strings_offset, self._strings_size, self.created,
+         root_path_offset, root_path_length) = _HEADER.unpack_from(self._map, 0)
+
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or self.node_count == 0:
+            self.close()
+            raise ValueError(f"File snapshot non valido o versione non supportata: '{file_path}'")
+
+        self.root_path = self._read_string(root_path_offset, root_path_length)
+        self._digests_offset = self._nodes_offset + self.node_count * _NODE.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.node_count
+
+    def close(self):
+        """Chiude la mappatura e il file"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def merkle_mode(self):
+        """Modalità degli hash di Merkle memorizzati, o None se lo snapshot non li contiene"""
+        if not self.flags & SNAPSHOT_HAS_DIGESTS:
+            return None
+        return MERKLE_CONTENT if self.flags & SNAPSHOT_CONTENT_DIGESTS else MERKLE_METADATA
+
+    @property
+    def root(self):
+        return SnapshotNode(self, 0)
+
+    def node(self, index):
+        """Restituisce il nodo con l'indice specificato"""
+        if not 0 <= index < self.node_count:
+            raise IndexError(index)
+        return SnapshotNode(self, index)
+
+    def find(self, relative_path):
+        """Restituisce il nodo corrispondente a un percorso relativo alla radice, o None"""
+        node = self.root
+        for part in str(relative_path).replace('\\', '/').split('/'):
+            if not part or part == '.':
+                continue
+            if not node.is_dir:
+                return None
+            index = self._find_child(node, part)
+            if index is None:
+                return None
+            node = SnapshotNode(self, index)
+        return node
+
+    def _find_child(self, node, name):
+        """Cerca un figlio per nome (ricerca binaria se i figli sono ordinati)"""
+        first, count = node._record[1], node._record[2]
+        if not self.flags & SNAPSHOT_SORTED_BY_NAME:
+            encoded = _encode(name)
+            for index in range(first, first + count):
+                record = self._read_record(index)
+                if self._map[self._strings_offset + record[5]:
+                             self._strings_offset + record[5] + record[4]] == encoded:
+                    return index
+            return None
+
+        # Le directory precedono i file: trova il confine, poi cerca nei due segmenti
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            if self._read_record(middle)[3] & NODE_DIR:
+                low = middle + 1
+            else:
+                high = middle
+        for start, end in ((first, low), (low, first + count)):
+            while start < end:
+                middle = (start + end) // 2
+                record = self._read_record(middle)
+                current = self._read_string(record[5], record[4])
+                if current == name:
+                    return middle
+                if current < name:
+                    start = middle + 1
+                else:
+                    end = middle
+        return None
+
+    def _read_record(self, index):
+        return _NODE.unpack_from(self._map, self._nodes_offset + index * _NODE.size)
+
+    def _read_digest(self, index):
+        if not self.flags & SNAPSHOT_HAS_DIGESTS:
+            return None
+        start = self._digests_offset + index * DIGEST_SIZE
+        return self._map[start:start + DIGEST_SIZE]
+
+    def _read_string(self, offset, length):
+        start = self._strings_offset + offset
+        return _decode(self._map[start:start + length])
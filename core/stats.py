@@ -0,0 +1,68 @@
+from core.scanner import file_extension
+
+
+class Histogram:
+    """Numero di file e byte totali per chiave"""
+
+    def __init__(self):
+        self.buckets = {}
+
+    def add(self, key, size):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = [1, size]
+        else:
+            bucket[0] += 1
+            bucket[1] += size
+
+    def items(self, by_size=False):
+        """Restituisce le terne (chiave, file, byte), per chiave o dalla dimensione maggiore"""
+        if by_size:
+            ordered = sorted(self.buckets.items(), key=lambda item: (-item[1][1], item[0]))
+        else:
+            ordered = sorted(self.buckets.items())
+        return [(key, files, size) for key, (files, size) in ordered]
+
+
+class TreeStats:
+    """Statistiche dei file di un albero: per estensione, per livello e per directory di primo livello.
+
+    Il livello 1 corrisponde ai file della radice; i file della radice
+    compaiono tra le directory di primo livello con chiave ''.
+    Le estensioni sono in minuscolo ('' per i file senza estensione).
+    """
+
+    def __init__(self):
+        self.extensions = Histogram()
+        self.depths = Histogram()
+        self.top_level = Histogram()
+
+    def add_file(self, path, size):
+        """Aggiunge un file dato il percorso relativo alla radice, con '/' come separatore"""
+        parts = path.split('/')
+        size = size or 0
+        self.extensions.add(file_extension(parts[-1]).lower(), size)
+        self.depths.add(len(parts), size)
+        self.top_level.add(parts[0] if len(parts) > 1 else '', size)
+
+    @classmethod
+    def from_tree(cls, root):
+        """Calcola le statistiche con una visita dell'albero già in memoria.
+
+        I file riassunti tra gli omessi o nelle directory compresse non sono
+        nell'albero: per includerli le statistiche vanno raccolte durante la
+        scansione con add_file.
+        """
+        stats = cls()
+        stack = [(root, 1, '')]
+        while stack:
+            node, depth, top_level = stack.pop()
+            for child in node.children:
+                if child.is_dir:
+                    stack.append((child, depth + 1, top_level if depth > 1 else child.name))
+                else:
+                    size = child.size or 0
+                    stats.extensions.add(file_extension(child.name).lower(), size)
+                    stats.depths.add(depth, size)
+                    stats.top_level.add(top_level, size)
+        return stats
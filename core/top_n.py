@@ -0,0 +1,86 @@
+import heapq
+import itertools
+
+
+class TopN:
+    """Conserva gli n elementi con la chiave maggiore in un heap limitato.
+
+    Ogni inserimento costa O(log n) e la memoria resta O(n) qualunque sia il
+    numero di elementi visti, quindi la classifica si aggiorna durante la
+    visita senza conservare né ordinare tutti gli elementi.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self._heap = []
+        # Spareggio tra chiavi uguali, così gli elementi non vengono mai confrontati
+        self._counter = itertools.count()
+
+    def add(self, key, item):
+        if self.n <= 0:
+            return
+        entry = (key, next(self._counter), item)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif key > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Restituisce le coppie (chiave, elemento) dalla chiave maggiore"""
+        return [(key, item) for key, _, item in sorted(self._heap, reverse=True)]
+
+
+class TopReport:
+    """File più grandi, file modificati più di recente e directory più grandi di un albero.
+
+    I percorsi sono relativi alla radice, con '/' come separatore. Le
+    directory compaiono solo se l'albero ha i totali (attributo totals).
+    """
+
+    def __init__(self, n):
+        self.largest_files = TopN(n)
+        self.newest_files = TopN(n)
+        self.largest_dirs = TopN(n)
+
+    def add_file(self, path, size, mtime):
+        """Aggiunge un file (percorso relativo con '/') alle classifiche dei file"""
+        self.largest_files.add(size or 0, path)
+        self.newest_files.add(mtime or 0.0, path)
+
+    def add_directories(self, root):
+        """Aggiunge le directory dell'albero in memoria che hanno i totali"""
+        for path, node in _iter_tree(root):
+            if node.is_dir:
+                totals = getattr(node, 'totals', None)
+                if totals is not None:
+                    self.largest_dirs.add(totals.size, path)
+
+    @classmethod
+    def from_tree(cls, root, n):
+        """Compila il report con una visita dell'albero già in memoria.
+
+        I file riassunti tra gli omessi o nelle directory compresse non sono
+        nell'albero: per includerli il report va compilato durante la
+        scansione con add_file e add_directories.
+        """
+        report = cls(n)
+        for path, node in _iter_tree(root):
+            if node.is_dir:
+                totals = getattr(node, 'totals', None)
+                if totals is not None:
+                    report.largest_dirs.add(totals.size, path)
+            else:
+                report.add_file(path, node.size, node.mtime)
+        return report
+
+
+def _iter_tree(root):
+    """Restituisce le coppie (percorso relativo, nodo) dell'albero, radice esclusa"""
+    stack = [(root, '')]
+    while stack:
+        node, prefix = stack.pop()
+        for child in node.children:
+            path = prefix + child.name
+            yield path, child
+            if child.is_dir and child.children:
+                stack.append((child, path + '/'))
@@ -0,0 +1,114 @@
+import os
+from collections import namedtuple
+
+from core.merkle import child_sort_key
+from core.scanner import ScanNode
+
+# Tipi di differenza tra due alberi
+CHANGE_ADDED = 'added'
+CHANGE_REMOVED = 'removed'
+CHANGE_MODIFIED = 'modified'
+
+# path è relativo alle radici, con '/' come separatore; old/new sono i nodi (None se assenti)
+TreeChange = namedtuple('TreeChange', ['kind', 'path', 'old', 'new'])
+
+
+def _same_digest(old, new):
+    old_digest = getattr(old, 'digest', None)
+    new_digest = getattr(new, 'digest', None)
+    return old_digest is not None and new_digest is not None and old_digest == new_digest
+
+
+def _file_changed(old, new, use_digests=True):
+    old_digest = getattr(old, 'digest', None)
+    new_digest = getattr(new, 'digest', None)
+    if use_digests and old_digest is not None and new_digest is not None:
+        return old_digest != new_digest
+    return old.size != new.size or old.mtime != new.mtime
+
+
+class DiffNode(ScanNode):
+    """Elemento dell'albero delle differenze.
+
+    change è il tipo di differenza, oppure None per le directory presenti solo
+    perché contengono differenze.
+    """
+
+    __slots__ = ('change',)
+
+    def __init__(self, name, path, is_dir, size=0, mtime=0.0, change=None):
+        super().__init__(name, path, is_dir, size, mtime)
+        self.change = change
+
+
+def diff_trees(old_root, new_root, use_digests=True, prefix=''):
+    """Confronta due alberi (scansioni o snapshot) e restituisce le differenze in ordine di visita.
+
+    I figli vengono confrontati con un merge dei due elenchi ordinati, quindi
+    ogni directory è percorsa una sola volta. Se entrambi gli alberi hanno gli
+    hash di Merkle (calcolati nella stessa modalità) i sottoalberi con hash
+    uguale vengono saltati senza visitarli. Una directory aggiunta o rimossa
+    produce una sola differenza per l'intero sottoalbero.
+    use_digests va disattivato se gli hash dei due alberi non sono confrontabili.
+    """
+    if use_digests and _same_digest(old_root, new_root):
+        return
+
+    old_children = sorted(old_root.children, key=child_sort_key)
+    new_children = sorted(new_root.children, key=child_sort_key)
+    i = j = 0
+    while i < len(old_children) or j < len(new_children):
+        old = old_children[i] if i < len(old_children) else None
+        new = new_children[j] if j < len(new_children) else None
+
+        if new is None or (old is not None and child_sort_key(old) < child_sort_key(new)):
+            yield TreeChange(CHANGE_REMOVED, prefix + old.name, old, None)
+            i += 1
+        elif old is None or child_sort_key(new) < child_sort_key(old):
+            yield TreeChange(CHANGE_ADDED, prefix + new.name, None, new)
+            j += 1
+        else:
+            if old.is_dir:
+                yield from diff_trees(old, new, use_digests, f"{prefix}{old.name}/")
+            elif _file_changed(old, new, use_digests):
+                yield TreeChange(CHANGE_MODIFIED, prefix + old.name, old, new)
+            i += 1
+            j += 1
+
+
+def build_diff_tree(old_root, new_root, use_digests=True, include_files=True, max_depth=None):
+    """Costruisce l'albero delle differenze, con radice corrispondente a new_root.
+
+    Contiene solo gli elementi aggiunti, rimossi o modificati (DiffNode.change)
+    e le directory che li contengono, nello stesso ordine della scansione, così
+    che possa essere esportato con gli stessi metodi di un albero normale. Le
+    differenze che non sarebbero visibili con include_files e max_depth vengono
+    omesse.
+    """
+    root = DiffNode(new_root.name, new_root.path, True)
+    directories = {'': root}
+
+    def directory(relative):
+        node = directories.get(relative)
+        if node is None:
+            parent_relative, _, name = relative.rpartition('/')
+            parent = directory(parent_relative)
+            node = DiffNode(name, os.path.join(parent.path, name), True)
+            parent.children.append(node)
+            directories[relative] = node
+        return node
+
+    for change in diff_trees(old_root, new_root, use_digests):
+        entry = change.new if change.new is not None else change.old
+        depth = change.path.count('/') + 1
+        if entry.is_dir:
+            visible = max_depth is None or depth <= max_depth
+        else:
+            visible = include_files and (max_depth is None or depth <= max_depth + 1)
+        if not visible:
+            continue
+
+        parent = directory(change.path.rpartition('/')[0])
+        parent.children.append(DiffNode(entry.name, entry.path, entry.is_dir,
+                                        entry.size, entry.mtime, change.kind))
+    return root
@@ -0,0 +1,123 @@
+import json
+import os
+import time
+
+import pytest
+
+from core.change_index import CHANGE_INDEX_VERSION, ChangeIndex
+from core.filters import FilterManager
+from core.scanner import TreeScanner
+
+
+def test_update_save_load(tmp_path):
+    index = ChangeIndex()
+    assert index.get(tmp_path) is None
+    directories = {'': [1, ['src'], ['a.js'], []], 'src': [2, [], ['b.js'], []]}
+    index.update(tmp_path, 123.5, directories)
+    assert index.modified
+
+    index_file = str(tmp_path / 'index.json')
+    index.save(index_file)
+    assert not index.modified
+
+    loaded = ChangeIndex()
+    assert loaded.load(index_file)
+    # La radice è riconosciuta anche con un percorso scritto diversamente
+    assert loaded.get(str(tmp_path) + os.sep) == (123.5, directories)
+
+
+def test_load_rejects_other_versions(tmp_path):
+    index_file = tmp_path / 'index.json'
+    index_file.write_text(json.dumps({'version': CHANGE_INDEX_VERSION - 1, 'roots': {'x': {}}}))
+    assert not ChangeIndex().load(str(index_file))
+    assert not ChangeIndex().load(str(tmp_path / 'missing.json'))
+
+
+class CountingScanner(TreeScanner):
+    """Scanner che conta le directory elencate"""
+
+    def __init__(self):
+        super().__init__(FilterManager())
+        self.listed = []
+
+    def _list_dir(self, path):
+        self.listed.append(os.path.relpath(path, self.root_dir))
+        return super()._list_dir(path)
+
+    def changes(self, root_dir, since, previous):
+        self.root_dir = root_dir
+        self.listed = []
+        root, directories = self.scan_changes(root_dir, since, previous)
+        return names(root), directories
+
+
+def names(node, prefix=''):
+    """Percorsi relativi dei file presenti nell'albero"""
+    result = []
+    for child in node.children:
+        if child.is_dir:
+            result.extend(names(child, f"{prefix}{child.name}/"))
+        else:
+            result.append(prefix + child.name)
+    return sorted(result)
+
+
+def touch_later(path, content):
+    """Riscrive un file sul posto con una data di modifica sicuramente successiva all'ultima visita"""
+    path.write_text(content)
+    later = time.time() + 10
+    os.utime(path, (later, later))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'src' / 'lib').mkdir(parents=True)
+    (root / 'a.js').write_text('a')
+    (root / 'src' / 'b.js').write_text('b')
+    (root / 'src' / 'lib' / 'c.js').write_text('c')
+    return root
+
+
+def test_first_run_reports_everything(tree):
+    scanner = CountingScanner()
+    files, directories = scanner.changes(str(tree), 0.0, None)
+    assert files == ['a.js', 'src/b.js', 'src/lib/c.js']
+    assert set(directories) == {'', 'src', 'src/lib'}
+    assert directories['src'][1:3] == [['lib'], ['b.js']]
+
+
+def test_unchanged_directories_are_not_listed(tree):
+    scanner = CountingScanner()
+    _, directories = scanner.changes(str(tree), 0.0, None)
+    since = time.time() + 5
+
+    files, _ = scanner.changes(str(tree), since, directories)
+    assert files == []
+    assert scanner.listed == []
+
+
+def test_file_rewritten_in_place_is_reported(tree):
+    scanner = CountingScanner()
+    _, directories = scanner.changes(str(tree), 0.0, None)
+    since = time.time() + 5
+    touch_later(tree / 'src' / 'lib' / 'c.js', 'changed')
+
+    files, _ = scanner.changes(str(tree), since, directories)
+    assert files == ['src/lib/c.js']
+    assert scanner.listed == []
+
+
+def test_new_file_lists_only_its_directory(tree):
+    scanner = CountingScanner()
+    _, directories = scanner.changes(str(tree), 0.0, None)
+    since = time.time() + 5
+    touch_later(tree / 'src' / 'new.js', 'new')
+    # La data della directory cambia quando guadagna un elemento
+    later = time.time() + 20
+    os.utime(tree / 'src', (later, later))
+
+    files, new_directories = scanner.changes(str(tree), since, directories)
+    assert files == ['src/new.js']
+    assert scanner.listed == ['src']
+    assert 'new.js' in new_directories['src'][2]
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+from core.git_index import (GIT_MODE_GITLINK, GitIndexEntry, build_index_tree, find_repository,
+                            read_git_index)
+
+requires_git = pytest.mark.skipif(shutil.which('git') is None, reason="eseguibile git non disponibile")
+
+
+def write_index(git_dir, paths, version=2, extensions=b''):
+    """Scrive un indice sintetico con le voci indicate (mode, percorso, dimensione)"""
+    data = bytearray(struct.pack('>4sII', b'DIRC', version, len(paths)))
+    previous = b''
+    for mode, path, size in paths:
+        encoded = path.encode('utf-8')
+        start = len(data)
+        data += struct.pack('>10I', 1, 0, 2, 500_000_000, 0, 0, mode, 0, 0, size)
+        data += b'\0' * 20 + struct.pack('>H', min(len(encoded), 0xFFF))
+        if version == 4:
+            common = os.path.commonprefix([previous, encoded])
+            data += _varint(len(previous) - len(common)) + encoded[len(common):] + b'\0'
+        else:
+            data += encoded + b'\0'
+            while (len(data) - start) % 8:
+                data += b'\0'
+        previous = encoded
+    data += extensions
+    data += hashlib.sha1(data).digest()
+    os.makedirs(git_dir, exist_ok=True)
+    with open(os.path.join(git_dir, 'index'), 'wb') as f:
+        f.write(data)
+
+
+def _varint(value):
+    """Codifica "offset" di git (inversa di _read_varint)"""
+    encoded = [value & 0x7f]
+    value >>= 7
+    while value:
+        value -= 1
+        encoded.insert(0, 0x80 | (value & 0x7f))
+        value >>= 7
+    return bytes(encoded)
+
+
+def extension(signature, payload):
+    return struct.pack('>4sI', signature, len(payload)) + payload
+
+
+PATHS = [(0o100644, 'README.md', 10), (0o100644, 'src/app/main.js', 20),
+         (0o100644, 'src/app/util.js', 30), (0o100755, 'src/run.sh', 40), (GIT_MODE_GITLINK, 'vendor/lib', 0)]
+
+
+@pytest.mark.parametrize('version', [2, 3, 4])
+def test_synthetic_versions(tmp_path, version):
+    write_index(tmp_path, PATHS, version)
+
+    entries = read_git_index(tmp_path)
+    assert [(entry.mode, entry.path, entry.st_size) for entry in entries] == PATHS
+    assert entries[0].st_mtime == pytest.approx(2.5)
+
+
+def test_extensions_are_skipped(tmp_path):
+    write_index(tmp_path, PATHS, 2, extension(b'TREE', b'\0' * 13) + extension(b'UNTR', b'x' * 7))
+    assert len(read_git_index(tmp_path)) == len(PATHS)
+
+
+@pytest.mark.parametrize('extensions', [
+    extension(b'link', b'\0' * 20),
+    extension(b'TREE', b'\0' * 13) + extension(b'link', b'\0' * 20),
+])
+def test_split_index_is_rejected(tmp_path, extensions):
+    write_index(tmp_path, PATHS, 2, extensions)
+    with pytest.raises(ValueError, match='split index'):
+        read_git_index(tmp_path)
+
+
+def test_invalid_index(tmp_path):
+    (tmp_path / 'index').write_bytes(b'XXXX' + b'\0' * 40)
+    with pytest.raises(ValueError):
+        read_git_index(tmp_path)
+
+
+def test_build_index_tree():
+    entries = [GitIndexEntry(path, mode, size, 0.0, 0.0) for mode, path, size in PATHS]
+
+    tree = build_index_tree(entries)
+    assert set(tree) == {'README.md', 'src', 'vendor'}
+    assert set(tree['src']['app']) == {'main.js', 'util.js'}
+    assert tree['src']['run.sh'].st_size == 40
+    # I sottomoduli diventano directory vuote
+    assert tree['vendor'] == {'lib': {}}
+
+    assert set(build_index_tree(entries, 'src/')) == {'app', 'run.sh'}
+
+
+def git(repository, *args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                   cwd=repository, check=True, capture_output=True)
+
+
+@requires_git
+@pytest.mark.parametrize('version', [2, 3, 4])
+def test_real_index(tmp_path, version):
+    git(tmp_path, 'init', '-q')
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'main.js').write_text('main')
+    (tmp_path / 'a.txt').write_text('abc')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'update-index', '--index-version', str(version))
+
+    work_tree, git_dir = find_repository(tmp_path / 'src')
+    assert os.path.samefile(work_tree, tmp_path)
+    entries = read_git_index(git_dir)
+    assert [(entry.path, entry.st_size) for entry in entries] == [('a.txt', 3), ('src/main.js', 4)]
+
+
+@requires_git
+def test_real_split_index(tmp_path):
+    git(tmp_path, 'init', '-q')
+    (tmp_path / 'a.txt').write_text('abc')
+    git(tmp_path, 'add', '.')
+    git(tmp_path, 'update-index', '--split-index')
+
+    with pytest.raises(ValueError, match='split index'):
+        read_git_index(str(tmp_path / '.git'))
+
+
+def test_find_repository_gitdir_file(tmp_path):
+    (tmp_path / 'worktree').mkdir()
+    (tmp_path / 'worktree' / '.git').write_text('gitdir: ../real.git\n')
+
+    work_tree, git_dir = find_repository(tmp_path / 'worktree')
+    assert work_tree == str(tmp_path / 'worktree')
+    assert git_dir == os.path.normpath(str(tmp_path / 'real.git'))
@@ -0,0 +1,126 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from core.gitignore import IgnoreMatcher, compile_pattern
+
+
+def matcher_for(lines, relative_dir=''):
+    """Matcher con le sole regole indicate, definite nella directory relative_dir"""
+    rules = [rule for rule in map(compile_pattern, lines) if rule is not None]
+    strip = len(relative_dir) + 1 if relative_dir else 0
+    return IgnoreMatcher([(strip, '', rules)])
+
+
+@pytest.mark.parametrize('line', ['', '#comment', '   ', '/', '!'])
+def test_lines_without_rules(line):
+    assert compile_pattern(line) is None
+
+
+@pytest.mark.parametrize('lines, path, is_dir, expected', [
+    (['*.log'], 'a.log', False, True),
+    (['*.log'], 'deep/dir/a.log', False, True),
+    (['*.log'], 'a.log.txt', False, False),
+    (['build/'], 'build', True, True),
+    (['build/'], 'build', False, False),
+    (['/build'], 'sub/build', True, False),
+    (['/build'], 'build', True, True),
+    (['doc/*.txt'], 'doc/a.txt', False, True),
+    (['doc/*.txt'], 'doc/sub/a.txt', False, False),
+    (['**/cache'], 'a/b/cache', True, True),
+    (['logs/**'], 'logs/a/b.txt', False, True),
+    (['a/**/b'], 'a/b', False, True),
+    (['a/**/b'], 'a/x/y/b', False, True),
+    (['file?.js'], 'file1.js', False, True),
+    (['file?.js'], 'file10.js', False, False),
+    (['[abc].js'], 'b.js', False, True),
+    (['[!abc].js'], 'b.js', False, False),
+    (['[!abc].js'], 'd.js', False, True),
+    (['\\#hash'], '#hash', False, True),
+    (['\\!bang'], '!bang', False, True),
+    (['trailing   '], 'trailing', False, True),
+    (['space\\ '], 'space ', False, True),
+    (['*.js', '!keep.js'], 'keep.js', False, False),
+    (['*.js', '!keep.js'], 'drop.js', False, True),
+    (['!keep.js', '*.js'], 'keep.js', False, True),
+])
+def test_patterns(lines, path, is_dir, expected):
+    assert matcher_for(lines).is_ignored(path, is_dir) == expected
+
+
+def test_nested_levels_take_precedence():
+    root = matcher_for(['*.js'])
+    nested = IgnoreMatcher(root.levels + matcher_for(['!keep.js', '/local.js'], 'sub').levels)
+
+    assert nested.is_ignored('sub/keep.js', False) is False
+    assert nested.is_ignored('sub/other.js', False) is True
+    # Le regole ancorate si riferiscono alla directory del file di ignore
+    assert nested.is_ignored('sub/local.js', False) is True
+    assert nested.is_ignored('local.js', False) is True
+
+
+def test_enter_directory_reads_listed_files_only(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / '.gitignore').write_text('*.tmp\n')
+    (tmp_path / 'sub' / '.ignore').write_text('!keep.tmp\n')
+
+    matcher = IgnoreMatcher()
+    assert matcher.enter_directory(str(tmp_path / 'sub'), 'sub', {'a.tmp'}) is matcher
+
+    inner = matcher.enter_directory(str(tmp_path / 'sub'), 'sub', {'.gitignore', '.ignore'})
+    assert inner.is_ignored('sub/a.tmp', False)
+    assert not inner.is_ignored('sub/keep.tmp', False)
+
+
+def test_for_root_loads_ancestors_and_exclude(tmp_path):
+    (tmp_path / '.git' / 'info').mkdir(parents=True)
+    (tmp_path / '.git' / 'info' / 'exclude').write_text('*.secret\n')
+    (tmp_path / '.gitignore').write_text('/top.js\nproject/generated/\n')
+    (tmp_path / 'project' / 'src').mkdir(parents=True)
+    (tmp_path / 'project' / '.gitignore').write_text('*.map\n')
+
+    matcher = IgnoreMatcher.for_root(tmp_path / 'project' / 'src')
+    assert matcher.is_ignored('a.secret', False)
+    assert matcher.is_ignored('app.js.map', False)
+    assert not matcher.is_ignored('top.js', False)
+
+    project = IgnoreMatcher.for_root(tmp_path / 'project')
+    assert project.is_ignored('generated', True)
+    assert not project.is_ignored('src', True)
+
+
+CHECK_PATHS = ['a.log', 'keep.log', 'build/out.js', 'src/build', 'src/x.tmp', 'src/keep.tmp',
+               'doc/a.txt', 'doc/sub/a.txt', 'deep/cache/x', 'file1.js', 'file10.js']
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason="eseguibile git non disponibile")
+def test_agrees_with_git_check_ignore(tmp_path):
+    subprocess.run(['git', 'init', '-q'], cwd=tmp_path, check=True)
+    (tmp_path / '.gitignore').write_text('*.log\n!keep.log\n/build/\ndoc/*.txt\n**/cache/\nfile?.js\n')
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / '.gitignore').write_text('*.tmp\n!keep.tmp\nbuild\n')
+    for path in CHECK_PATHS:
+        full_path = tmp_path / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text('x')
+
+    result = subprocess.run(['git', 'check-ignore', '--no-index', *CHECK_PATHS], cwd=tmp_path,
+                            capture_output=True, text=True)
+    ignored_by_git = set(result.stdout.split())
+
+    root = IgnoreMatcher.for_root(tmp_path).enter_directory(str(tmp_path), '', set(os.listdir(tmp_path)))
+    src = root.enter_directory(str(tmp_path / 'src'), 'src', set(os.listdir(tmp_path / 'src')))
+
+    def ignored(path):
+        # Come git: un elemento è ignorato anche se lo è una directory che lo contiene
+        parts = path.split('/')
+        for depth in range(1, len(parts) + 1):
+            matcher = src if parts[0] == 'src' and depth > 1 else root
+            if matcher.is_ignored('/'.join(parts[:depth]), depth < len(parts)):
+                return True
+        return False
+
+    assert ignored_by_git
+    assert {path for path in CHECK_PATHS if ignored(path)} == ignored_by_git
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+
+from core import hash_cache
+from core.hash_cache import HASH_CACHE_VERSION, HASH_SHA256, HashCache, file_sha256
+
+
+def write(path, content):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_file_sha256(tmp_path, monkeypatch):
+    content = os.urandom(3 * 1024 + 7)
+    path = write(tmp_path / 'data.bin', content)
+    assert file_sha256(path) == hashlib.sha256(content).hexdigest()
+
+    # Oltre la soglia il file viene mappato in memoria: il digest non cambia
+    monkeypatch.setattr(hash_cache, 'MMAP_THRESHOLD', 1024)
+    assert file_sha256(path) == hashlib.sha256(content).hexdigest()
+    empty = write(tmp_path / 'empty.bin', b'')
+    assert file_sha256(empty) == hashlib.sha256(b'').hexdigest()
+
+
+def test_sha256_reads_each_version_once(tmp_path, monkeypatch):
+    path = write(tmp_path / 'a.js', b'one')
+    reads = []
+    monkeypatch.setattr(hash_cache, 'file_sha256', lambda p: reads.append(p) or 'digest-' + str(len(reads)))
+
+    cache = HashCache()
+    assert cache.sha256(path, os.stat(path)) == 'digest-1'
+    assert cache.sha256(path, os.stat(path)) == 'digest-1'
+    assert len(reads) == 1
+
+    # Una nuova versione del file ha una chiave diversa
+    write(tmp_path / 'a.js', b'changed')
+    os.utime(path, ns=(1, 1))
+    assert cache.sha256(path, os.stat(path)) == 'digest-2'
+
+
+def test_save_and_load(tmp_path):
+    path = write(tmp_path / 'a.js', b'one')
+    cache = HashCache()
+    cache.put(HASH_SHA256, path, os.stat(path), 'abc')
+    assert cache.modified
+    cache_file = str(tmp_path / 'cache.json')
+    cache.save(cache_file)
+    assert not cache.modified
+    assert not os.path.exists(cache_file + '.tmp')
+
+    loaded = HashCache()
+    assert loaded.load(cache_file)
+    assert loaded.get(HASH_SHA256, path, os.stat(path)) == 'abc'
+    assert loaded.get('other', path, os.stat(path)) is None
+
+
+def test_load_ignores_missing_and_invalid_files(tmp_path):
+    cache = HashCache()
+    assert not cache.load(str(tmp_path / 'missing.json'))
+    invalid = tmp_path / 'invalid.json'
+    invalid.write_text('{not json')
+    assert not cache.load(str(invalid))
+    invalid.write_text(json.dumps({'version': HASH_CACHE_VERSION + 1, 'entries': []}))
+    assert not cache.load(str(invalid))
+    assert len(cache) == 0
+
+
+def test_save_keeps_valid_entries_of_other_trees(tmp_path):
+    first = write(tmp_path / 'first.js', b'first')
+    second = write(tmp_path / 'second.js', b'second')
+    cache_file = str(tmp_path / 'cache.json')
+
+    cache = HashCache()
+    cache.put(HASH_SHA256, first, os.stat(first), 'd1')
+    cache.put(HASH_SHA256, second, os.stat(second), 'd2')
+    cache.save(cache_file)
+
+    # Esecuzione successiva che usa solo il primo file: il secondo resta valido
+    cache = HashCache()
+    cache.load(cache_file)
+    assert cache.get(HASH_SHA256, first, os.stat(first)) == 'd1'
+    cache.save(cache_file)
+    cache = HashCache()
+    cache.load(cache_file)
+    assert len(cache) == 2
+    assert cache.get(HASH_SHA256, second, os.stat(second)) == 'd2'
+
+
+def test_prune_drops_deleted_and_modified_files(tmp_path):
+    kept = write(tmp_path / 'kept.js', b'kept')
+    deleted = write(tmp_path / 'deleted.js', b'deleted')
+    modified = write(tmp_path / 'modified.js', b'modified')
+    cache_file = str(tmp_path / 'cache.json')
+
+    cache = HashCache()
+    for path in (kept, deleted, modified):
+        cache.put(HASH_SHA256, path, os.stat(path), path)
+    cache.save(cache_file)
+
+    os.remove(deleted)
+    write(tmp_path / 'modified.js', b'modified again')
+    cache = HashCache()
+    cache.load(cache_file)
+    assert cache.prune() == 2
+    assert len(cache) == 1
+    assert cache.get(HASH_SHA256, kept, os.stat(kept)) == kept
+    # Le chiavi già verificate non vengono ricontrollate
+    assert cache.prune() == 0
+
+
+def test_version_1_entries_without_paths_are_dropped(tmp_path):
+    path = write(tmp_path / 'a.js', b'one')
+    stat_result = os.stat(path)
+    cache_file = tmp_path / 'cache.json'
+    cache_file.write_text(json.dumps({'version': 1, 'entries': [
+        [HASH_SHA256, stat_result.st_dev, stat_result.st_ino, None, stat_result.st_size,
+         stat_result.st_mtime_ns, 'old'],
+    ]}))
+
+    cache = HashCache()
+    assert cache.load(str(cache_file))
+    assert cache.get(HASH_SHA256, path, stat_result) == 'old'
+    cache.save(str(cache_file))
+    reloaded = HashCache()
+    reloaded.load(str(cache_file))
+    # Usata nell'esecuzione: salvata con il percorso e quindi verificabile
+    assert reloaded.get(HASH_SHA256, path, stat_result) == 'old'
+
+    unused = HashCache()
+    cache_file.write_text(json.dumps({'version': 1, 'entries': [
+        [HASH_SHA256, stat_result.st_dev, stat_result.st_ino, None, stat_result.st_size,
+         stat_result.st_mtime_ns, 'old'],
+    ]}))
+    unused.load(str(cache_file))
+    assert unused.prune() == 1
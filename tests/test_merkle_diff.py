@@ -0,0 +1,132 @@
+import copy
+import hashlib
+
+import pytest
+
+from core.merkle import MERKLE_CONTENT, MERKLE_METADATA, compute_merkle
+from core.scanner import ScanNode
+from core.snapshot import Snapshot, write_snapshot
+from core.tree_diff import CHANGE_ADDED, CHANGE_MODIFIED, CHANGE_REMOVED, build_diff_tree, diff_trees
+
+
+def tree(spec, name='root', path='/root'):
+    """Costruisce un albero da un dizionario: dizionari per le directory, (size, mtime) per i file"""
+    node = ScanNode(name, path, True)
+    for child_name, value in spec.items():
+        child_path = f"{path}/{child_name}"
+        if isinstance(value, dict):
+            node.children.append(tree(value, child_name, child_path))
+        else:
+            node.children.append(ScanNode(child_name, child_path, False, *value))
+    return node
+
+
+BASE = {'src': {'a.js': (1, 1.0), 'b.js': (2, 2.0), 'lib': {'c.js': (3, 3.0)}}, 'README.md': (4, 4.0)}
+
+
+def changes(old, new, use_digests=True):
+    return [(change.kind, change.path) for change in diff_trees(old, new, use_digests)]
+
+
+def test_identical_trees_have_equal_digests():
+    old, new = tree(BASE), tree(BASE)
+    # L'ordine dei figli non influisce sull'hash
+    new.children.reverse()
+    assert compute_merkle(old) == compute_merkle(new)
+    assert len(old.digest) == 32
+
+
+@pytest.mark.parametrize('path, value', [
+    (('src', 'a.js'), (1, 9.0)),
+    (('src', 'lib', 'c.js'), (30, 3.0)),
+])
+def test_any_change_reaches_the_root(path, value):
+    modified = copy.deepcopy(BASE)
+    target = modified
+    for part in path[:-1]:
+        target = target[part]
+    target[path[-1]] = value
+
+    old, new = tree(BASE), tree(modified)
+    compute_merkle(old)
+    compute_merkle(new)
+    assert old.digest != new.digest
+    assert old.children[0].digest != new.children[0].digest
+    # Il file non modificato conserva il proprio hash
+    assert old.children[1].digest == new.children[1].digest
+
+
+def test_renaming_changes_the_digest():
+    renamed = copy.deepcopy(BASE)
+    renamed['README.txt'] = renamed.pop('README.md')
+    assert compute_merkle(tree(BASE)) != compute_merkle(tree(renamed))
+
+
+def test_content_mode(tmp_path):
+    (tmp_path / 'a.js').write_bytes(b'same')
+    (tmp_path / 'b.js').write_bytes(b'same')
+    root = ScanNode('root', str(tmp_path), True)
+    root.children = [ScanNode('a.js', str(tmp_path / 'a.js'), False, 4, 1.0),
+                     ScanNode('b.js', str(tmp_path / 'b.js'), False, 4, 2.0)]
+
+    compute_merkle(root, MERKLE_CONTENT, max_workers=2)
+    assert root.children[0].digest == root.children[1].digest == hashlib.sha256(b'same').digest()
+    compute_merkle(root, MERKLE_METADATA)
+    assert root.children[0].digest != root.children[1].digest
+
+
+def test_diff_trees():
+    new_spec = {'src': {'a.js': (1, 1.0), 'b.js': (20, 2.0), 'd.js': (5, 5.0)}, 'docs': {'x.md': (1, 1.0)},
+                'README.md': (4, 4.0)}
+    old, new = tree(BASE), tree(new_spec)
+    expected = [(CHANGE_ADDED, 'docs'), (CHANGE_REMOVED, 'src/lib'), (CHANGE_MODIFIED, 'src/b.js'),
+                (CHANGE_ADDED, 'src/d.js')]
+    assert changes(old, new, use_digests=False) == expected
+
+    compute_merkle(old)
+    compute_merkle(new)
+    assert changes(old, new) == expected
+
+
+def test_equal_digests_skip_subtrees():
+    old, new = tree(BASE), tree(BASE)
+    compute_merkle(old)
+    compute_merkle(new)
+    # Con hash uguali il sottoalbero non viene visitato, anche se i metadati differiscono
+    new.children[0].children[0].size = 100
+    assert changes(old, new) == []
+    assert changes(old, new, use_digests=False) == [(CHANGE_MODIFIED, 'src/a.js')]
+
+
+def test_diff_against_snapshot(tmp_path):
+    old = tree(BASE)
+    compute_merkle(old)
+    path = tmp_path / 'old.dsnap'
+    write_snapshot(old, path, merkle_mode=MERKLE_METADATA)
+
+    new_spec = {'src': {'a.js': (1, 1.0), 'b.js': (2, 2.5), 'lib': {'c.js': (3, 3.0)}}, 'README.md': (4, 4.0)}
+    new = tree(new_spec)
+    compute_merkle(new)
+    with Snapshot(path) as snapshot:
+        assert snapshot.merkle_mode == MERKLE_METADATA
+        assert snapshot.root.digest == old.digest
+        assert changes(snapshot.root, new) == [(CHANGE_MODIFIED, 'src/b.js')]
+
+
+def test_build_diff_tree_filters():
+    new_spec = {'src': {'a.js': (1, 1.0), 'lib': {'c.js': (30, 3.0), 'e': {}}}, 'README.md': (4, 4.0)}
+    old, new = tree(BASE), tree(new_spec)
+
+    root = build_diff_tree(old, new)
+    src = root.children[0]
+    # Stesso ordine della scansione: directory prima dei file
+    assert [(child.name, child.change) for child in src.children] == [('lib', None), ('b.js', CHANGE_REMOVED)]
+    assert [(child.name, child.change) for child in src.children[0].children] == [
+        ('e', CHANGE_ADDED), ('c.js', CHANGE_MODIFIED)]
+
+    without_files = build_diff_tree(old, new, include_files=False)
+    assert [child.name for child in without_files.children[0].children] == ['lib']
+    assert [child.name for child in without_files.children[0].children[0].children] == ['e']
+
+    shallow = build_diff_tree(old, new, max_depth=1)
+    assert [child.name for child in shallow.children[0].children] == ['b.js']
@@ -0,0 +1,77 @@
+import random
+import re
+
+import pytest
+
+from core.name_matcher import NameMatcher
+
+PATTERNS = [
+    r'^node_modules$', r'^\.git$', r'^build', r'^tmp_', r'\.min\.js$', r'\.log$', r'~$',
+    r'cache', r'backup', r'\.bak', r'^a\.b\.c$', r'\$HOME', r'^\^caret', r'end\\$',
+    r'^test_.*\.py$', r'[0-9]{4}-[0-9]{2}', r'(?i)readme', r'(ab)\1', r'^(?:foo|bar)baz$',
+    r'[invalid', r'',
+]
+
+NAMES = [
+    'node_modules', 'node_modules2', 'my_node_modules', '.git', '.gitignore', 'build', 'builder',
+    'rebuild', 'tmp_file', 'tmp', 'app.min.js', 'app.min.js.map', 'server.log', 'server.log.1',
+    'notes~', 'webcache', 'Cache', 'backup.tar', 'x.bak.old', 'a.b.c', 'aXbXc', '$HOME.txt',
+    '^caret', 'caret', 'end\\', 'end', 'test_scanner.py', 'test_scanner.pyc', '2024-01 report',
+    'README.md', 'ReadMe', 'abab', 'abba', 'foobaz', 'barbaz', 'bazbaz', '', 'ünïcödé', 'name\n', 'server.log\n', 'a.b.c\n',
+]
+
+
+def reference(names, patterns, ignore_case_names, name):
+    """Semantica di riferimento: nome esatto oppure re.search di almeno una regex valida"""
+    if (name.lower() if ignore_case_names else name) in {n.lower() if ignore_case_names else n for n in names}:
+        return True
+    for pattern in patterns:
+        try:
+            if re.search(pattern, name):
+                return True
+        except re.error:
+            pass
+    return False
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_single_pattern_matches_re_search(pattern):
+    matcher = NameMatcher(patterns=[pattern])
+    for name in NAMES:
+        assert matcher.matches(name) == reference((), [pattern], False, name), (pattern, name)
+
+
+def test_all_patterns_match_re_search():
+    matcher = NameMatcher(patterns=PATTERNS)
+    for name in NAMES:
+        assert matcher.matches(name) == reference((), PATTERNS, False, name), name
+
+
+def test_random_rule_sets_match_re_search():
+    rng = random.Random(1234)
+    valid = [pattern for pattern in PATTERNS if pattern and pattern != '[invalid']
+    for _ in range(200):
+        patterns = rng.sample(valid, rng.randint(1, 6))
+        names = rng.sample(NAMES, 3)
+        matcher = NameMatcher(names, patterns, ignore_case_names=rng.random() < 0.5)
+        for name in NAMES:
+            expected = reference(names, patterns, matcher.ignore_case_names, name)
+            assert matcher.matches(name) == expected, (patterns, names, name)
+
+
+def test_exact_names():
+    matcher = NameMatcher(names=['Thumbs.db', 'DESKTOP.INI'], ignore_case_names=True)
+    assert matcher.matches('thumbs.db')
+    assert matcher.matches('desktop.ini')
+    assert not matcher.matches('thumbs.db.bak')
+
+    case_sensitive = NameMatcher(names=['Thumbs.db'])
+    assert case_sensitive.matches('Thumbs.db')
+    assert not case_sensitive.matches('thumbs.db')
+
+
+def test_empty_matcher():
+    matcher = NameMatcher()
+    assert not matcher
+    assert not matcher.matches('anything')
+    assert NameMatcher(patterns=['x'])
@@ -0,0 +1,83 @@
+import pytest
+
+from core.scanner import ScanNode
+from core.snapshot import SNAPSHOT_SORTED_BY_NAME, Snapshot, is_snapshot_file, write_snapshot
+
+
+def build_tree(sorted_children=True):
+    """Albero di prova: radice con una sottodirectory (due file) e un file"""
+    root = ScanNode('root', '/data/root', True)
+    src = ScanNode('src', '/data/root/src', True, mtime=10.0)
+    src.children = [ScanNode('a.js', '/data/root/src/a.js', False, 3, 11.0),
+                    ScanNode('b.js', '/data/root/src/b.js', False, 5, 12.0)]
+    readme = ScanNode('README.md', '/data/root/README.md', False, 7, 13.0)
+    root.children = [src, readme] if sorted_children else [readme, src]
+    return root
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'tree.dsnap'
+    assert write_snapshot(build_tree(), path) == 5
+
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 5
+        assert snapshot.root_path == '/data/root'
+        assert snapshot.flags & SNAPSHOT_SORTED_BY_NAME
+        root = snapshot.root
+        assert [child.name for child in root.children] == ['src', 'README.md']
+        src = root.children[0]
+        assert src.is_dir and src.child_count == 2 and src.mtime == 10.0
+        assert [(f.name, f.size, f.mtime) for f in src.children] == [('a.js', 3, 11.0), ('b.js', 5, 12.0)]
+        assert src.children[1].path.replace('\\', '/') == '/data/root/src/b.js'
+        assert src.children[0].parent.name == 'src'
+        assert root.parent is None
+
+
+@pytest.mark.parametrize('sorted_by_name', [True, False])
+def test_find(tmp_path, sorted_by_name):
+    path = tmp_path / 'tree.dsnap'
+    write_snapshot(build_tree(sorted_by_name), path, sorted_by_name=sorted_by_name)
+
+    with Snapshot(path) as snapshot:
+        assert snapshot.find('src/b.js').size == 5
+        assert snapshot.find('README.md').size == 7
+        assert snapshot.find('.').name == 'root'
+        assert snapshot.find('src/missing.js') is None
+        assert snapshot.find('README.md/x') is None
+
+
+@pytest.mark.parametrize('sorted_by_name', [True, False])
+def test_has_subdirectories(tmp_path, sorted_by_name):
+    path = tmp_path / 'tree.dsnap'
+    write_snapshot(build_tree(sorted_by_name), path, sorted_by_name=sorted_by_name)
+
+    with Snapshot(path) as snapshot:
+        assert snapshot.root.has_subdirectories
+        assert not snapshot.find('src').has_subdirectories
+        assert not snapshot.find('README.md').has_subdirectories
+
+
+def test_surrogate_names(tmp_path):
+    # Nomi non UTF-8 letti dal filesystem (surrogateescape) devono sopravvivere al formato
+    name = b'caf\xe9.js'.decode('utf-8', 'surrogateescape')
+    root = ScanNode('root', '/r', True)
+    root.children = [ScanNode(name, '/r/' + name, False, 1)]
+    path = tmp_path / 'names.dsnap'
+    write_snapshot(root, path)
+
+    with Snapshot(path) as snapshot:
+        assert snapshot.root.children[0].name == name
+
+
+def test_invalid_files(tmp_path):
+    empty = tmp_path / 'empty.dsnap'
+    empty.write_bytes(b'')
+    garbage = tmp_path / 'garbage.dsnap'
+    garbage.write_bytes(b'not a snapshot' * 10)
+
+    for path in (empty, garbage):
+        with pytest.raises(ValueError):
+            Snapshot(path)
+    assert is_snapshot_file(garbage)
+    assert not is_snapshot_file(tmp_path / 'missing.dsnap')
+    assert not is_snapshot_file(tmp_path)
@@ -79,21 +79,26 @@ class ConfigTab(QWidget):
             self.excluded_dirs_list.addItem(dir_name)
         for pattern in self.filter_manager.excluded_dirs_regex:
             self.excluded_dirs_list.addItem(f"[regex] {pattern}")
+        for path in self.filter_manager.excluded_paths:
+            self.excluded_dirs_list.addItem(f"[path] {path}")
 
         excluded_buttons_layout = QHBoxLayout()
         self.add_excluded_btn = QPushButton(tr("Aggiungi"))
         self.add_excluded_regex_btn = QPushButton(tr("Aggiungi Regex"))
+        self.add_excluded_path_btn = QPushButton(tr("Aggiungi percorso"))
         self.remove_excluded_btn = QPushButton(tr("Rimuovi"))
         self.regex_help_btn = QPushButton("?")
         
         self.add_excluded_btn.clicked.connect(self.add_excluded_dir)
         self.add_excluded_regex_btn.clicked.connect(self.add_excluded_dir_regex)
+        self.add_excluded_path_btn.clicked.connect(self.add_excluded_path)
         self.remove_excluded_btn.clicked.connect(self.remove_excluded_dir)
         self.regex_help_btn.setFixedSize(25, 25)
         self.regex_help_btn.clicked.connect(self.show_regex_help)
         
         excluded_buttons_layout.addWidget(self.add_excluded_btn)
         excluded_buttons_layout.addWidget(self.add_excluded_regex_btn)
+        excluded_buttons_layout.addWidget(self.add_excluded_path_btn)
         excluded_buttons_layout.addWidget(self.remove_excluded_btn)
         excluded_buttons_layout.addWidget(self.regex_help_btn)
         
@@ -207,6 +212,7 @@ class ConfigTab(QWidget):
         # Directory escluse
         self.add_excluded_btn.setText(tr("Aggiungi"))
         self.add_excluded_regex_btn.setText(tr("Aggiungi Regex"))
+        self.add_excluded_path_btn.setText(tr("Aggiungi percorso"))
         self.remove_excluded_btn.setText(tr("Rimuovi"))
         
         # File esclusi
@@ -399,6 +405,15 @@ class ConfigTab(QWidget):
                     tr("L'espressione regolare inserita non è valida.")
                 )
     
+    def add_excluded_path(self):
+        path, ok = QInputDialog.getText(
+            self,
+            tr("Aggiungi percorso"),
+            tr("Percorso relativo alla radice (es. services/legacy/build) o assoluto; * corrisponde a un nome qualsiasi:")
+        )
+        if ok and path and self.filter_manager.add_excluded_path(path):
+            self.excluded_dirs_list.addItem(f"[path] {path.strip()}")
+    
     def remove_excluded_dir(self):
         selected_items = self.excluded_dirs_list.selectedItems()
         if selected_items:
@@ -410,6 +425,8 @@ class ConfigTab(QWidget):
                 if dir_name.startswith("[regex] "):
                     pattern = dir_name[8:]  # Rimuovi il prefisso "[regex] "
                     self.filter_manager.remove_excluded_dir_regex(pattern)
+                elif dir_name.startswith("[path] "):
+                    self.filter_manager.remove_excluded_path(dir_name[7:])  # Rimuovi il prefisso "[path] "
                 else:
                     self.filter_manager.remove_excluded_dir(dir_name)
     
@@ -543,6 +560,8 @@ class ConfigTab(QWidget):
             self.excluded_dirs_list.addItem(dir_name)
         for pattern in self.filter_manager.excluded_dirs_regex:
             self.excluded_dirs_list.addItem(f"[regex] {pattern}")
+        for path in self.filter_manager.excluded_paths:
+            self.excluded_dirs_list.addItem(f"[path] {path}")
         
         # File esclusi
         self.excluded_files_list.clear()
@@ -562,6 +581,7 @@ class ConfigTab(QWidget):
         """Salva le impostazioni della scheda"""
         self.settings.setValue("excluded_dirs", list(self.filter_manager.excluded_dirs))
         self.settings.setValue("excluded_dirs_regex", list(self.filter_manager.excluded_dirs_regex))
+        self.settings.setValue("excluded_paths", list(self.filter_manager.excluded_paths))
         self.settings.setValue("excluded_files", list(self.filter_manager.excluded_files))
         self.settings.setValue("excluded_files_regex", list(self.filter_manager.excluded_files_regex))
         self.settings.setValue("included_extensions", list(self.filter_manager.included_file_extensions))
@@ -579,6 +599,10 @@ class ConfigTab(QWidget):
         if excluded_dirs_regex:
             self.filter_manager.excluded_dirs_regex = set(excluded_dirs_regex)
         
+        excluded_paths = self.settings.value("excluded_paths", None)
+        if excluded_paths:
+            self.filter_manager.excluded_paths = set(excluded_paths)
+        
         # File esclusi
         excluded_files = self.settings.value("excluded_files", None)
         if excluded_files:
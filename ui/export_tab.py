@@ -1,22 +1,77 @@
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, 
                             QLineEdit, QFileDialog, QGroupBox, QCheckBox, QSpinBox, 
-                            QComboBox, QMessageBox, QTreeWidget, QTreeWidgetItem, QMenu)
-from PyQt6.QtCore import Qt, QSettings, QUrl
+                            QComboBox, QMessageBox, QTreeWidget, QTreeWidgetItem, QMenu, QDateTimeEdit)
+from PyQt6.QtCore import Qt, QSettings, QUrl, QDateTime, QStandardPaths
 from PyQt6.QtGui import QColor, QDesktopServices
 from PyQt6.QtWidgets import QApplication, QStyle
+import os
+import shutil
 from pathlib import Path
 from PyQt6.QtCore import Qt, QSettings, QUrl, QMimeData
 from PyQt6.QtGui import QColor, QDesktopServices, QDragEnterEvent, QDropEvent
 from PyQt6.QtWidgets import QProgressBar
 
+from core.columnar import COLUMNAR_SUFFIX, pyarrow_available
+from core.compression import (COMPRESSION_BZ2, COMPRESSION_GZIP, COMPRESSION_SUFFIXES, COMPRESSION_XZ,
+                              COMPRESSION_ZSTD, detect_compression, zstd_available)
+from core.database import DATABASE_SUFFIX
+from core.gitignore import IGNORE_FILE_NAMES, IgnoreMatcher
+from core.manifest import MANIFEST_SUFFIX
+from core.merkle import MERKLE_CONTENT, MERKLE_METADATA
+from core.scanner import (SORT_EXTENSION, SORT_FILESYSTEM, SORT_MTIME, SORT_NAME, SORT_NAME_NOCASE, SORT_NATURAL,
+                          SORT_SIZE, SOURCE_FILESYSTEM, SOURCE_GIT_INDEX, SYMLINKS_FOLLOW, SYMLINKS_LIST,
+                          SYMLINKS_SKIP)
+from core.snapshot import Snapshot, SNAPSHOT_SUFFIX, is_snapshot_file
 from utils.translation_manager import tr
 
+# Estensione del file di output per ciascun formato
+FORMAT_EXTENSIONS = {
+    "TXT": ".txt",
+    "HTML": ".html",
+    "JSON": ".json",
+    "XML": ".xml",
+    "SNAPSHOT": SNAPSHOT_SUFFIX,
+    "MANIFEST": MANIFEST_SUFFIX,
+    "SQLITE": DATABASE_SUFFIX,
+    "PARQUET" if pyarrow_available() else "CSV": COLUMNAR_SUFFIX
+}
+
+def app_data_file(file_name):
+    """Restituisce il percorso di un file nella cartella dei dati dell'applicazione, creandola se serve"""
+    directory = Path(QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation))
+    directory.mkdir(parents=True, exist_ok=True)
+    return str(directory / file_name)
+
+
+def app_data_setting(stored_path, file_name):
+    """Restituisce il file dei dati indicato nelle impostazioni, nella cartella dei dati se relativo.
+
+    Le versioni precedenti salvavano percorsi relativi alla directory di avvio:
+    se quel file esiste viene spostato nella cartella dei dati, dove non
+    sostituisce un file già presente.
+    """
+    if stored_path and Path(stored_path).is_absolute():
+        return stored_path
+    target = app_data_file(file_name)
+    # Senza impostazione valeva il nome predefinito, relativo alla directory di avvio
+    legacy_path = stored_path or file_name
+    if Path(legacy_path).is_file() and not Path(target).exists():
+        try:
+            shutil.move(legacy_path, target)
+        except OSError:
+            pass
+    return target
+
+
 class ExportTab(QWidget):
     def __init__(self, exporter, filter_manager, settings):
         super().__init__()
         self.exporter = exporter
         self.filter_manager = filter_manager
         self.settings = settings
+        self.snapshot = None
+        # Matcher gitignore delle directory dell'albero già visitate, per percorso
+        self.ignore_matchers = {}
         self.setup_ui()
         self.setup_tree_context_menu()
         self.load_settings()
@@ -32,6 +87,8 @@ class ExportTab(QWidget):
         self.dir_path = QLineEdit()
         self.browse_dir_btn = QPushButton(tr("Sfoglia..."))
         self.browse_dir_btn.clicked.connect(self.browse_directory)
+        self.open_snapshot_btn = QPushButton(tr("Apri snapshot..."))
+        self.open_snapshot_btn.clicked.connect(self.browse_snapshot)
         
         self.drop_hint = QLabel(tr("Trascina qui una cartella"))
         self.drop_hint.setStyleSheet("color: gray; font-style: italic;")
@@ -41,6 +98,7 @@ class ExportTab(QWidget):
         dir_layout.addWidget(self.dir_label)
         dir_layout.addWidget(self.dir_path, 1)
         dir_layout.addWidget(self.browse_dir_btn)
+        dir_layout.addWidget(self.open_snapshot_btn)
         dir_layout.addWidget(self.drop_hint)
         self.dir_group.setLayout(dir_layout)
         
@@ -66,11 +124,20 @@ class ExportTab(QWidget):
         self.format_label = QLabel(tr("Formato:"))
         format_style_layout.addWidget(self.format_label)
         self.format_combo = QComboBox()
-        self.format_combo.addItems(["TXT", "HTML", "JSON", "XML"])
+        self.format_combo.addItems(list(FORMAT_EXTENSIONS.keys()))
         format_style_layout.addWidget(self.format_combo)
         
         format_style_layout.addSpacing(20)
         
+        # Compressione in streaming (TXT, HTML, JSON, XML)
+        self.compression_label = QLabel(tr("Compressione:"))
+        format_style_layout.addWidget(self.compression_label)
+        self.compression_combo = QComboBox()
+        self.populate_compressions()
+        format_style_layout.addWidget(self.compression_combo)
+        
+        format_style_layout.addSpacing(20)
+        
         # Selezione stile indentazione
         self.indent_style_label = QLabel(tr("Stile indentazione:"))
         format_style_layout.addWidget(self.indent_style_label)
@@ -103,6 +170,185 @@ class ExportTab(QWidget):
         depth_layout.addWidget(self.depth_spin)
         options_layout.addLayout(depth_layout)
         
+        # Sorgente degli elementi (filesystem o indice git)
+        source_layout = QHBoxLayout()
+        self.source_label = QLabel(tr("Sorgente:"))
+        source_layout.addWidget(self.source_label)
+        self.source_combo = QComboBox()
+        self.populate_source_modes()
+        self.source_combo.currentIndexChanged.connect(self.update_source_options)
+        source_layout.addWidget(self.source_combo)
+        self.include_untracked_check = QCheckBox(tr("Includi file non tracciati"))
+        source_layout.addWidget(self.include_untracked_check)
+        source_layout.addStretch(1)
+        options_layout.addLayout(source_layout)
+        self.update_source_options()
+        
+        # Trattamento dei link simbolici
+        symlink_layout = QHBoxLayout()
+        self.symlink_label = QLabel(tr("Link simbolici:"))
+        symlink_layout.addWidget(self.symlink_label)
+        self.symlink_combo = QComboBox()
+        self.populate_symlink_policies()
+        self.symlink_combo.currentIndexChanged.connect(self.reload_tree_structure)
+        symlink_layout.addWidget(self.symlink_combo)
+        self.one_filesystem_check = QCheckBox(tr("Non attraversare altri filesystem"))
+        self.one_filesystem_check.stateChanged.connect(self.reload_tree_structure)
+        symlink_layout.addWidget(self.one_filesystem_check)
+        symlink_layout.addStretch(1)
+        options_layout.addLayout(symlink_layout)
+        
+        # Ordine degli elementi di ogni directory nelle esportazioni
+        sort_layout = QHBoxLayout()
+        self.sort_label = QLabel(tr("Ordinamento:"))
+        sort_layout.addWidget(self.sort_label)
+        self.sort_combo = QComboBox()
+        self.populate_sort_orders()
+        sort_layout.addWidget(self.sort_combo)
+        sort_layout.addStretch(1)
+        options_layout.addLayout(sort_layout)
+        
+        # Tempo massimo per elencare ogni directory (filesystem di rete lenti)
+        timeout_layout = QHBoxLayout()
+        self.listing_timeout_label = QLabel(tr("Tempo massimo per directory (s):"))
+        timeout_layout.addWidget(self.listing_timeout_label)
+        self.listing_timeout_spin = QSpinBox()
+        self.listing_timeout_spin.setMinimum(0)
+        self.listing_timeout_spin.setMaximum(3600)
+        self.listing_timeout_spin.setSpecialValueText(tr("Illimitato"))
+        timeout_layout.addWidget(self.listing_timeout_spin)
+        self.retry_timeouts_check = QCheckBox(tr("Riprova alla fine le directory scadute"))
+        timeout_layout.addWidget(self.retry_timeouts_check)
+        timeout_layout.addStretch(1)
+        options_layout.addLayout(timeout_layout)
+        
+        # Durata massima della scansione: scaduta, le directory restanti sono segnate come troncate
+        duration_layout = QHBoxLayout()
+        self.max_duration_label = QLabel(tr("Durata massima della scansione (s):"))
+        duration_layout.addWidget(self.max_duration_label)
+        self.max_duration_spin = QSpinBox()
+        self.max_duration_spin.setMinimum(0)
+        self.max_duration_spin.setMaximum(86400)
+        self.max_duration_spin.setSpecialValueText(tr("Illimitato"))
+        duration_layout.addWidget(self.max_duration_spin)
+        duration_layout.addStretch(1)
+        options_layout.addLayout(duration_layout)
+        
+        # Limite di elementi per directory: i restanti sono riassunti in una riga con numero e dimensione
+        entries_layout = QHBoxLayout()
+        self.max_entries_label = QLabel(tr("Elementi massimi per directory:"))
+        entries_layout.addWidget(self.max_entries_label)
+        self.max_entries_spin = QSpinBox()
+        self.max_entries_spin.setMinimum(0)
+        self.max_entries_spin.setMaximum(1000000)
+        self.max_entries_spin.setSpecialValueText(tr("Illimitato"))
+        entries_layout.addWidget(self.max_entries_spin)
+        entries_layout.addStretch(1)
+        options_layout.addLayout(entries_layout)
+        
+        # Directory riassunte in un'unica riga con i totali: per nome o oltre una soglia
+        collapse_layout = QHBoxLayout()
+        self.collapse_label = QLabel(tr("Comprimi le directory:"))
+        collapse_layout.addWidget(self.collapse_label)
+        self.collapse_names = QLineEdit()
+        self.collapse_names.setPlaceholderText(tr("Nomi separati da virgola (es. node_modules)"))
+        collapse_layout.addWidget(self.collapse_names, 1)
+        self.collapse_entries_label = QLabel(tr("oltre elementi:"))
+        collapse_layout.addWidget(self.collapse_entries_label)
+        self.collapse_entries_spin = QSpinBox()
+        self.collapse_entries_spin.setMinimum(0)
+        self.collapse_entries_spin.setMaximum(100000000)
+        self.collapse_entries_spin.setSpecialValueText(tr("Illimitato"))
+        collapse_layout.addWidget(self.collapse_entries_spin)
+        self.collapse_mb_label = QLabel(tr("oltre MB:"))
+        collapse_layout.addWidget(self.collapse_mb_label)
+        self.collapse_mb_spin = QSpinBox()
+        self.collapse_mb_spin.setMinimum(0)
+        self.collapse_mb_spin.setMaximum(10000000)
+        self.collapse_mb_spin.setSpecialValueText(tr("Illimitato"))
+        collapse_layout.addWidget(self.collapse_mb_spin)
+        options_layout.addLayout(collapse_layout)
+        
+        self.show_totals_check = QCheckBox(tr("Mostra i totali delle directory (dimensione, file, sottodirectory)"))
+        options_layout.addWidget(self.show_totals_check)
+        
+        # Statistiche per estensione, livello e directory di primo livello (TXT, HTML, JSON, XML)
+        self.show_stats_check = QCheckBox(tr("Aggiungi le statistiche per estensione, livello e directory"))
+        options_layout.addWidget(self.show_stats_check)
+        
+        # JSON compatto: array posizionali senza spazi, con tabella opzionale dei nomi ripetuti
+        json_compact_layout = QHBoxLayout()
+        self.json_compact_check = QCheckBox(tr("JSON compatto"))
+        json_compact_layout.addWidget(self.json_compact_check)
+        self.json_string_table_check = QCheckBox(tr("Tabella dei nomi ripetuti"))
+        self.json_string_table_check.setEnabled(False)
+        self.json_compact_check.toggled.connect(self.json_string_table_check.setEnabled)
+        json_compact_layout.addWidget(self.json_string_table_check)
+        json_compact_layout.addStretch(1)
+        options_layout.addLayout(json_compact_layout)
+        
+        # Anteprima per livelli: i livelli superiori compaiono prima dei rami profondi
+        self.preview_breadth_first_check = QCheckBox(tr("Anteprima per livelli (prima i livelli superiori)"))
+        options_layout.addWidget(self.preview_breadth_first_check)
+        
+        self.duplicates_report_check = QCheckBox(tr("Genera anche il report dei file duplicati"))
+        options_layout.addWidget(self.duplicates_report_check)
+        
+        # Classifiche dei file più grandi e più recenti e delle directory più grandi (TXT, HTML, JSON, XML)
+        top_layout = QHBoxLayout()
+        self.top_report_label = QLabel(tr("Report dei più grandi e più recenti:"))
+        top_layout.addWidget(self.top_report_label)
+        self.top_report_spin = QSpinBox()
+        self.top_report_spin.setMinimum(0)
+        self.top_report_spin.setMaximum(1000)
+        self.top_report_spin.setSpecialValueText(tr("Nessuno"))
+        top_layout.addWidget(self.top_report_spin)
+        self.top_report_file_check = QCheckBox(tr("In un file separato"))
+        top_layout.addWidget(self.top_report_file_check)
+        top_layout.addStretch(1)
+        options_layout.addLayout(top_layout)
+        
+        # Hash di Merkle delle directory salvati negli snapshot
+        merkle_layout = QHBoxLayout()
+        self.merkle_label = QLabel(tr("Hash delle directory (snapshot):"))
+        merkle_layout.addWidget(self.merkle_label)
+        self.merkle_combo = QComboBox()
+        self.populate_merkle_modes()
+        merkle_layout.addWidget(self.merkle_combo)
+        merkle_layout.addStretch(1)
+        options_layout.addLayout(merkle_layout)
+        
+        # Struttura precedente con cui confrontare l'esportazione (TXT, HTML, JSON, XML)
+        compare_layout = QHBoxLayout()
+        self.compare_label = QLabel(tr("Confronta con:"))
+        compare_layout.addWidget(self.compare_label)
+        self.compare_path = QLineEdit()
+        self.compare_path.setPlaceholderText(tr("Directory o snapshot precedente (vuoto: nessun confronto)"))
+        compare_layout.addWidget(self.compare_path, 1)
+        self.browse_compare_btn = QPushButton(tr("Sfoglia..."))
+        self.browse_compare_btn.clicked.connect(self.browse_compare_directory)
+        compare_layout.addWidget(self.browse_compare_btn)
+        self.compare_snapshot_btn = QPushButton(tr("Apri snapshot..."))
+        self.compare_snapshot_btn.clicked.connect(self.browse_compare_snapshot)
+        compare_layout.addWidget(self.compare_snapshot_btn)
+        options_layout.addLayout(compare_layout)
+        
+        # Esportazione dei soli elementi creati o modificati
+        changes_layout = QHBoxLayout()
+        self.changes_label = QLabel(tr("Elementi:"))
+        changes_layout.addWidget(self.changes_label)
+        self.changes_combo = QComboBox()
+        self.populate_changes_modes()
+        self.changes_combo.currentIndexChanged.connect(self.update_changes_options)
+        changes_layout.addWidget(self.changes_combo)
+        self.changes_since_edit = QDateTimeEdit()
+        self.changes_since_edit.setCalendarPopup(True)
+        self.changes_since_edit.setDateTime(QDateTime.currentDateTime().addDays(-1))
+        changes_layout.addWidget(self.changes_since_edit)
+        changes_layout.addStretch(1)
+        options_layout.addLayout(changes_layout)
+        self.update_changes_options()
+        
         self.options_group.setLayout(options_layout)
         
         # Pulsanti di azione
@@ -111,8 +357,11 @@ class ExportTab(QWidget):
         self.export_btn.clicked.connect(self.export_structure)
         self.preview_btn = QPushButton(tr("Anteprima"))
         self.preview_btn.clicked.connect(self.show_preview)
+        self.verify_manifest_btn = QPushButton(tr("Verifica manifest..."))
+        self.verify_manifest_btn.clicked.connect(self.verify_manifest)
         action_layout.addWidget(self.export_btn)
         action_layout.addWidget(self.preview_btn)
+        action_layout.addWidget(self.verify_manifest_btn)
 
         # Area vista struttura
         self.tree_group = QGroupBox(tr("Struttura Directory"))
@@ -168,6 +417,89 @@ class ExportTab(QWidget):
         for key, name in styles.items():
             self.indent_style_combo.addItem(name, key)
     
+    def populate_source_modes(self):
+        """Popola il combo box con le sorgenti di scansione disponibili"""
+        self.source_combo.clear()
+        self.source_combo.addItem(tr("File system"), SOURCE_FILESYSTEM)
+        self.source_combo.addItem(tr("Indice git (file tracciati)"), SOURCE_GIT_INDEX)
+    
+    def populate_merkle_modes(self):
+        """Popola il combo box con le modalità di calcolo degli hash delle directory"""
+        self.merkle_combo.clear()
+        self.merkle_combo.addItem(tr("Nessuno"), "")
+        self.merkle_combo.addItem(tr("Metadati (dimensione e data)"), MERKLE_METADATA)
+        self.merkle_combo.addItem(tr("Contenuto (SHA-256)"), MERKLE_CONTENT)
+    
+    def populate_changes_modes(self):
+        """Popola il combo box con le modalità di selezione degli elementi modificati"""
+        self.changes_combo.clear()
+        self.changes_combo.addItem(tr("Tutti"), "")
+        self.changes_combo.addItem(tr("Modificati dall'ultima esportazione"), "last")
+        self.changes_combo.addItem(tr("Modificati dopo:"), "since")
+    
+    def update_changes_options(self):
+        """Abilita la data solo per la modalità che la richiede"""
+        self.changes_since_edit.setEnabled(self.changes_combo.currentData() == "since")
+    
+    def populate_symlink_policies(self):
+        """Popola il combo box con le politiche per i link simbolici"""
+        self.symlink_combo.clear()
+        self.symlink_combo.addItem(tr("Segui (ogni directory una sola volta)"), SYMLINKS_FOLLOW)
+        self.symlink_combo.addItem(tr("Elenca senza seguire"), SYMLINKS_LIST)
+        self.symlink_combo.addItem(tr("Ignora"), SYMLINKS_SKIP)
+    
+    def populate_sort_orders(self):
+        """Popola il combo box con gli ordinamenti degli elementi"""
+        self.sort_combo.clear()
+        self.sort_combo.addItem(tr("Nome"), SORT_NAME)
+        self.sort_combo.addItem(tr("Nome (senza maiuscole/minuscole)"), SORT_NAME_NOCASE)
+        self.sort_combo.addItem(tr("Nome (numeri per valore)"), SORT_NATURAL)
+        self.sort_combo.addItem(tr("Estensione"), SORT_EXTENSION)
+        self.sort_combo.addItem(tr("Dimensione (più grandi prima)"), SORT_SIZE)
+        self.sort_combo.addItem(tr("Data di modifica (più recenti prima)"), SORT_MTIME)
+        self.sort_combo.addItem(tr("Ordine del filesystem (più veloce)"), SORT_FILESYSTEM)
+    
+    def populate_compressions(self):
+        """Popola il combo box con i formati di compressione disponibili"""
+        self.compression_combo.clear()
+        self.compression_combo.addItem(tr("Nessuna"), "")
+        self.compression_combo.addItem("gzip (.gz)", COMPRESSION_GZIP)
+        self.compression_combo.addItem("xz (.xz)", COMPRESSION_XZ)
+        self.compression_combo.addItem("bzip2 (.bz2)", COMPRESSION_BZ2)
+        if zstd_available():
+            self.compression_combo.addItem("zstd (.zst)", COMPRESSION_ZSTD)
+    
+    def update_source_options(self):
+        """Abilita le opzioni specifiche della sorgente selezionata"""
+        self.include_untracked_check.setEnabled(self.source_combo.currentData() == SOURCE_GIT_INDEX)
+    
+    def apply_scan_options(self):
+        """Trasferisce all'exporter le opzioni di scansione selezionate"""
+        self.exporter.set_source_mode(self.source_combo.currentData(),
+                                      self.include_untracked_check.isChecked())
+        self.exporter.set_symlink_policy(self.symlink_combo.currentData())
+        self.exporter.set_sort_order(self.sort_combo.currentData())
+        self.exporter.set_compression(self.compression_combo.currentData())
+        self.exporter.set_one_filesystem(self.one_filesystem_check.isChecked())
+        self.exporter.set_listing_timeout(self.listing_timeout_spin.value() or None,
+                                          self.retry_timeouts_check.isChecked())
+        self.exporter.set_max_duration(self.max_duration_spin.value() or None)
+        self.exporter.set_max_entries_per_dir(self.max_entries_spin.value())
+        self.exporter.set_top_report(self.top_report_spin.value(), self.top_report_file_check.isChecked())
+        self.exporter.set_collapse_rules([name.strip() for name in self.collapse_names.text().split(',') if name.strip()],
+                                         self.collapse_entries_spin.value(),
+                                         self.collapse_mb_spin.value() * 1024 * 1024)
+        self.exporter.set_totals_mode(self.show_totals_check.isChecked())
+        self.exporter.set_stats_mode(self.show_stats_check.isChecked())
+        self.exporter.set_duplicates_report(self.duplicates_report_check.isChecked())
+        self.exporter.set_json_compact(self.json_compact_check.isChecked(), self.json_string_table_check.isChecked())
+        self.exporter.set_preview_order(self.preview_breadth_first_check.isChecked())
+        self.exporter.set_merkle_mode(self.merkle_combo.currentData())
+        self.exporter.set_compare_base(self.compare_path.text())
+        changes_mode = self.changes_combo.currentData()
+        since = self.changes_since_edit.dateTime().toSecsSinceEpoch() if changes_mode == "since" else None
+        self.exporter.set_changes_mode(bool(changes_mode), since)
+    
     def show_preview(self):
         """Mostra un'anteprima della struttura con lo stile selezionato"""
         directory = self.dir_path.text()
@@ -175,6 +507,8 @@ class ExportTab(QWidget):
             QMessageBox.warning(self, tr("Errore"), tr("Seleziona prima una directory."))
             return
         
+        self.apply_scan_options()
+        
         include_files = self.include_files_check.isChecked()
         max_depth = None if self.depth_spin.value() == 0 else self.depth_spin.value()
         indent_style = self.indent_style_combo.currentData()
@@ -221,29 +555,104 @@ class ExportTab(QWidget):
         self.dir_label.setText(tr("Directory:"))
         self.file_label.setText(tr("File:"))
         self.format_label.setText(tr("Formato:"))
+        self.compression_label.setText(tr("Compressione:"))
         self.indent_style_label.setText(tr("Stile indentazione:"))
         self.depth_label.setText(tr("Profondità massima:"))
+        self.source_label.setText(tr("Sorgente:"))
         self.search_label.setText(tr("Cerca:"))
         
         # Aggiorna i pulsanti
         self.browse_dir_btn.setText(tr("Sfoglia..."))
+        self.open_snapshot_btn.setText(tr("Apri snapshot..."))
         self.browse_output_btn.setText(tr("Sfoglia..."))
         self.export_btn.setText(tr("Esporta"))
         self.preview_btn.setText(tr("Anteprima"))
+        self.verify_manifest_btn.setText(tr("Verifica manifest..."))
         
         # Aggiorna i checkbox
         self.include_files_check.setText(tr("Includi file"))
         self.show_files_check.setText(tr("Mostra file"))
         self.apply_filters_check.setText(tr("Applica filtri"))
+        self.include_untracked_check.setText(tr("Includi file non tracciati"))
+        self.show_totals_check.setText(tr("Mostra i totali delle directory (dimensione, file, sottodirectory)"))
+        self.show_stats_check.setText(tr("Aggiungi le statistiche per estensione, livello e directory"))
+        self.json_compact_check.setText(tr("JSON compatto"))
+        self.json_string_table_check.setText(tr("Tabella dei nomi ripetuti"))
+        self.preview_breadth_first_check.setText(tr("Anteprima per livelli (prima i livelli superiori)"))
+        self.duplicates_report_check.setText(tr("Genera anche il report dei file duplicati"))
+        self.top_report_label.setText(tr("Report dei più grandi e più recenti:"))
+        self.top_report_spin.setSpecialValueText(tr("Nessuno"))
+        self.top_report_file_check.setText(tr("In un file separato"))
+        self.merkle_label.setText(tr("Hash delle directory (snapshot):"))
+        self.compare_label.setText(tr("Confronta con:"))
+        self.changes_label.setText(tr("Elementi:"))
+        self.symlink_label.setText(tr("Link simbolici:"))
+        self.sort_label.setText(tr("Ordinamento:"))
+        self.one_filesystem_check.setText(tr("Non attraversare altri filesystem"))
+        self.listing_timeout_label.setText(tr("Tempo massimo per directory (s):"))
+        self.listing_timeout_spin.setSpecialValueText(tr("Illimitato"))
+        self.retry_timeouts_check.setText(tr("Riprova alla fine le directory scadute"))
+        self.max_duration_label.setText(tr("Durata massima della scansione (s):"))
+        self.max_duration_spin.setSpecialValueText(tr("Illimitato"))
+        self.max_entries_label.setText(tr("Elementi massimi per directory:"))
+        self.max_entries_spin.setSpecialValueText(tr("Illimitato"))
+        self.collapse_label.setText(tr("Comprimi le directory:"))
+        self.collapse_names.setPlaceholderText(tr("Nomi separati da virgola (es. node_modules)"))
+        self.collapse_entries_label.setText(tr("oltre elementi:"))
+        self.collapse_entries_spin.setSpecialValueText(tr("Illimitato"))
+        self.collapse_mb_label.setText(tr("oltre MB:"))
+        self.collapse_mb_spin.setSpecialValueText(tr("Illimitato"))
+        self.browse_compare_btn.setText(tr("Sfoglia..."))
+        self.compare_snapshot_btn.setText(tr("Apri snapshot..."))
         
         # Aggiorna placeholder e altri testi
         self.drop_hint.setText(tr("Trascina qui una cartella"))
         self.search_input.setPlaceholderText(tr("Cerca file o cartelle..."))
+        self.compare_path.setPlaceholderText(tr("Directory o snapshot precedente (vuoto: nessun confronto)"))
         self.depth_spin.setSpecialValueText(tr("Illimitata"))
         
         # Aggiorna header dell'albero
         self.tree_widget.setHeaderLabels([tr("Nome"), tr("Tipo"), tr("Percorso")])
         
+        # Ricarica le sorgenti tradotte mantenendo la selezione
+        current_source = self.source_combo.currentData()
+        self.populate_source_modes()
+        index = self.source_combo.findData(current_source)
+        if index >= 0:
+            self.source_combo.setCurrentIndex(index)
+        
+        current_symlinks = self.symlink_combo.currentData()
+        self.symlink_combo.blockSignals(True)
+        self.populate_symlink_policies()
+        index = self.symlink_combo.findData(current_symlinks)
+        if index >= 0:
+            self.symlink_combo.setCurrentIndex(index)
+        self.symlink_combo.blockSignals(False)
+        
+        current_sort = self.sort_combo.currentData()
+        self.populate_sort_orders()
+        index = self.sort_combo.findData(current_sort)
+        if index >= 0:
+            self.sort_combo.setCurrentIndex(index)
+        
+        current_changes = self.changes_combo.currentData()
+        self.populate_changes_modes()
+        index = self.changes_combo.findData(current_changes)
+        if index >= 0:
+            self.changes_combo.setCurrentIndex(index)
+        
+        current_compression = self.compression_combo.currentData()
+        self.populate_compressions()
+        index = self.compression_combo.findData(current_compression)
+        if index >= 0:
+            self.compression_combo.setCurrentIndex(index)
+        
+        current_merkle = self.merkle_combo.currentData()
+        self.populate_merkle_modes()
+        index = self.merkle_combo.findData(current_merkle)
+        if index >= 0:
+            self.merkle_combo.setCurrentIndex(index)
+        
         # Ricarica gli stili di indentazione tradotti
         current_style = self.indent_style_combo.currentData()
         self.populate_indent_styles()
@@ -306,16 +715,32 @@ class ExportTab(QWidget):
             self.dir_path.setText(directory)
             self.load_tree_structure()
     
+    def browse_snapshot(self):
+        """Seleziona uno snapshot salvato da visualizzare ed esportare"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, tr("Apri snapshot"), "", f"Snapshot (*{SNAPSHOT_SUFFIX})"
+        )
+        if file_path:
+            self.dir_path.setText(file_path)
+            self.load_tree_structure()
+    
+    def browse_compare_directory(self):
+        """Seleziona la directory con cui confrontare l'esportazione"""
+        directory = QFileDialog.getExistingDirectory(self, tr("Seleziona Directory"))
+        if directory:
+            self.compare_path.setText(directory)
+    
+    def browse_compare_snapshot(self):
+        """Seleziona lo snapshot con cui confrontare l'esportazione"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, tr("Apri snapshot"), "", f"Snapshot (*{SNAPSHOT_SUFFIX})"
+        )
+        if file_path:
+            self.compare_path.setText(file_path)
+    
     def browse_output(self):
         selected_format = self.format_combo.currentText()
-        extension = ".txt"
-        
-        if selected_format == "HTML":
-            extension = ".html"
-        elif selected_format == "JSON":
-            extension = ".json"
-        elif selected_format == "XML":
-            extension = ".xml"
+        extension = FORMAT_EXTENSIONS.get(selected_format, ".txt")
             
         file_path, _ = QFileDialog.getSaveFileName(
             self, tr("Salva File"), "", f"File {selected_format} (*{extension})"
@@ -337,18 +762,21 @@ class ExportTab(QWidget):
         include_files = self.include_files_check.isChecked()
         max_depth = None if self.depth_spin.value() == 0 else self.depth_spin.value()
         indent_style = self.indent_style_combo.currentData()
+        self.apply_scan_options()
         
         selected_format = self.format_combo.currentText()
         output_path = Path(output_file)
         
-        if selected_format == "TXT" and output_path.suffix.lower() != ".txt":
-            output_file = str(output_path.with_suffix(".txt"))
-        elif selected_format == "HTML" and output_path.suffix.lower() != ".html":
-            output_file = str(output_path.with_suffix(".html"))
-        elif selected_format == "JSON" and output_path.suffix.lower() != ".json":
-            output_file = str(output_path.with_suffix(".json"))
-        elif selected_format == "XML" and output_path.suffix.lower() != ".xml":
-            output_file = str(output_path.with_suffix(".xml"))
+        extension = FORMAT_EXTENSIONS.get(selected_format, ".txt")
+        # Un suffisso di compressione (.json.gz) viene mantenuto dopo l'estensione del formato
+        compression = detect_compression(output_file)
+        if compression is not None:
+            output_path = output_path.with_suffix('')
+        if output_path.suffix.lower() != extension:
+            output_path = output_path.with_suffix(extension)
+        output_file = str(output_path)
+        if compression is not None and selected_format in ("TXT", "HTML", "JSON", "XML", "CSV"):
+            output_file += COMPRESSION_SUFFIXES[compression]
         
         try:
             if selected_format == "TXT":
@@ -367,9 +795,30 @@ class ExportTab(QWidget):
                 success, message = self.exporter.export_structure_xml(
                     directory, output_file, include_files, max_depth
                 )
+            elif selected_format == "SNAPSHOT":
+                success, message = self.exporter.export_structure_snapshot(
+                    directory, output_file, include_files, max_depth
+                )
+            elif selected_format == "MANIFEST":
+                success, message = self.exporter.export_structure_manifest(
+                    directory, output_file, max_depth
+                )
+            elif selected_format == "SQLITE":
+                success, message = self.exporter.export_structure_database(
+                    directory, output_file, include_files, max_depth
+                )
+            elif selected_format in ("PARQUET", "CSV"):
+                success, message = self.exporter.export_structure_columnar(
+                    directory, output_file, include_files, max_depth
+                )
             
             self.output_path.setText(output_file)
             
+            # Riepilogo della scansione (ad es. filesystem non attraversati)
+            scan_report = self.exporter.get_scan_report()
+            if success and scan_report:
+                message = "\n".join([message] + scan_report)
+            
             if success:
                 QMessageBox.information(self, tr("Esportazione completata"), message)
                 self.window().statusBar.showMessage(message, 5000)
@@ -380,6 +829,33 @@ class ExportTab(QWidget):
             error_message = tr("Errore durante l'esportazione:") + f" {e}"
             QMessageBox.critical(self, tr("Errore"), error_message)
     
+    def verify_manifest(self):
+        """Verifica la directory selezionata rispetto a un manifest esportato in precedenza"""
+        directory = self.dir_path.text()
+        if not directory:
+            QMessageBox.warning(self, tr("Errore"), tr("Seleziona prima una directory."))
+            return
+        
+        manifest_file, _ = QFileDialog.getOpenFileName(
+            self, tr("Verifica manifest"), "", f"{tr('Manifest')} (*{MANIFEST_SUFFIX})"
+        )
+        if not manifest_file:
+            return
+        
+        self.apply_scan_options()
+        max_depth = None if self.depth_spin.value() == 0 else self.depth_spin.value()
+        
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            success, message = self.exporter.verify_manifest(directory, manifest_file, max_depth)
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        if success:
+            QMessageBox.information(self, tr("Verifica manifest"), tr("Nessuna differenza rispetto al manifest.") + "\n" + message)
+        else:
+            QMessageBox.warning(self, tr("Verifica manifest"), message)
+    
     def load_tree_structure(self):
         """Carica la struttura delle directory nell'albero usando lazy loading"""
         directory = self.dir_path.text()
@@ -388,6 +864,12 @@ class ExportTab(QWidget):
             return
 
         self.tree_widget.clear()
+        self.close_snapshot()
+        self.ignore_matchers = {}
+        
+        if is_snapshot_file(directory):
+            self.load_snapshot_tree(directory)
+            return
         
         root_path = Path(directory)
         self.root_item = QTreeWidgetItem(self.tree_widget)
@@ -422,9 +904,20 @@ class ExportTab(QWidget):
         try:
             entries = sorted(path.iterdir(), key=lambda e: (not e.is_dir(), e.name.lower()))
             
+            root_dir = self.dir_path.text()
+            symlink_policy = self.symlink_combo.currentData()
+            root_dev = Path(root_dir).stat().st_dev if self.one_filesystem_check.isChecked() else None
+            ignore, relative_dir = self.ignore_matcher(path) if apply_filters else (None, '')
             for entry in entries:
+                if symlink_policy == SYMLINKS_SKIP and entry.is_symlink():
+                    continue
                 if apply_filters and entry.is_dir() and self.filter_manager.is_excluded_dir(entry.name):
                     continue
+                if apply_filters and self.filter_manager.is_excluded_path(entry, root_dir):
+                    continue
+                if ignore is not None and ignore.is_ignored(self.relative_path(relative_dir, entry.name),
+                                                            entry.is_dir()):
+                    continue
                     
                 if entry.is_file():
                     if not self.show_files_check.isChecked():
@@ -440,7 +933,12 @@ class ExportTab(QWidget):
                     item.setText(1, tr("Directory"))
                     item.setIcon(0, self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon))
                     
-                    if self.directory_has_content(entry, apply_filters):
+                    # I link non seguiti restano foglie
+                    expandable = symlink_policy == SYMLINKS_FOLLOW or not entry.is_symlink()
+                    # Con un solo filesystem i punti di montaggio restano foglie
+                    if expandable and root_dev is not None:
+                        expandable = entry.stat().st_dev == root_dev
+                    if expandable and self.directory_has_content(entry, apply_filters):
                         temp_item = QTreeWidgetItem(item)
                         temp_item.setText(0, "...")
                         temp_item.setText(1, tr("Caricamento"))
@@ -455,10 +953,115 @@ class ExportTab(QWidget):
             error_item.setText(1, tr("Errore"))
             error_item.setForeground(0, QColor(255, 0, 0))
     
+    def load_snapshot_tree(self, snapshot_path):
+        """Carica nell'albero uno snapshot salvato, leggendo solo i nodi espansi"""
+        try:
+            self.snapshot = Snapshot(snapshot_path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, tr("Errore"), str(e))
+            return
+        
+        root_node = self.snapshot.root
+        self.root_item = QTreeWidgetItem(self.tree_widget)
+        self.root_item.setText(0, root_node.name)
+        self.root_item.setText(1, tr("Directory"))
+        self.root_item.setText(2, root_node.path)
+        self.root_item.setData(0, Qt.ItemDataRole.UserRole, root_node.index)
+        self.root_item.setIcon(0, self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon))
+        
+        font = self.root_item.font(0)
+        font.setBold(True)
+        self.root_item.setFont(0, font)
+        
+        self.populate_snapshot_item(self.root_item, root_node, 0)
+        self.root_item.setExpanded(True)
+        
+        main_window = self.window()
+        if main_window and hasattr(main_window, 'statusBar'):
+            main_window.statusBar.showMessage(tr("Snapshot caricato:") + f" {snapshot_path} ({len(self.snapshot)})")
+    
+    def populate_snapshot_item(self, parent_item, node, current_depth=0):
+        """Popola un elemento dell'albero con i figli diretti di un nodo dello snapshot"""
+        while parent_item.childCount() > 0:
+            parent_item.removeChild(parent_item.child(0))
+        
+        max_depth = None if self.depth_spin.value() == 0 else self.depth_spin.value()
+        if max_depth is not None and current_depth >= max_depth:
+            return
+        
+        show_files = self.show_files_check.isChecked()
+        
+        for child in node.children:
+            if not child.is_dir and not show_files:
+                continue
+            
+            item = QTreeWidgetItem(parent_item)
+            item.setText(0, child.name)
+            item.setText(2, child.path)
+            item.setData(0, Qt.ItemDataRole.UserRole, child.index)
+            
+            if child.is_dir:
+                item.setText(1, tr("Directory"))
+                item.setIcon(0, self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon))
+                
+                # Basta il numero di figli (o il primo record) senza leggere tutti i nipoti
+                if child.child_count > 0 if show_files else child.has_subdirectories:
+                    temp_item = QTreeWidgetItem(item)
+                    temp_item.setText(0, "...")
+                    temp_item.setText(1, tr("Caricamento"))
+                    temp_item.setForeground(0, QColor(128, 128, 128))
+            else:
+                item.setText(1, tr("File"))
+                item.setIcon(0, self.style().standardIcon(QStyle.StandardPixmap.SP_FileIcon))
+    
+    def close_snapshot(self):
+        """Chiude lo snapshot attualmente visualizzato"""
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+    
+    def ignore_matcher(self, directory_path):
+        """Restituisce il matcher gitignore per i figli di una directory dell'albero e il suo percorso relativo.
+
+        Il matcher (None se i file di ignore non sono usati) ha gli stessi
+        livelli di quello della scansione: la radice con le regole del
+        repository, poi i file di ignore di ogni directory attraversata.
+        """
+        root_path = Path(self.dir_path.text())
+        relative_dir = os.path.relpath(directory_path, root_path).replace(os.sep, '/')
+        relative_dir = '' if relative_dir == '.' else relative_dir
+        if not self.filter_manager.use_gitignore or relative_dir == '..' or relative_dir.startswith('../'):
+            return None, relative_dir
+        
+        key = str(directory_path)
+        matcher = self.ignore_matchers.get(key)
+        if matcher is None:
+            if relative_dir:
+                parent, _ = self.ignore_matcher(directory_path.parent)
+            else:
+                parent = IgnoreMatcher.for_root(root_path)
+            names = {name for name in IGNORE_FILE_NAMES if (directory_path / name).is_file()}
+            matcher = parent.enter_directory(str(directory_path), relative_dir, names)
+            self.ignore_matchers[key] = matcher
+        return matcher, relative_dir
+    
+    @staticmethod
+    def relative_path(relative_dir, name):
+        """Percorso relativo alla radice (con '/') di un elemento della directory relative_dir"""
+        return f"{relative_dir}/{name}" if relative_dir else name
+    
     def directory_has_content(self, directory_path, apply_filters):
         """Verifica se una directory ha contenuti visibili"""
         try:
+            ignore, relative_dir = self.ignore_matcher(directory_path) if apply_filters else (None, '')
             for entry in directory_path.iterdir():
+                if self.symlink_combo.currentData() == SYMLINKS_SKIP and entry.is_symlink():
+                    continue
+                if apply_filters and self.filter_manager.is_excluded_path(entry, self.dir_path.text()):
+                    continue
+                if ignore is not None and ignore.is_ignored(self.relative_path(relative_dir, entry.name),
+                                                            entry.is_dir()):
+                    continue
                 if entry.is_dir():
                     if not (apply_filters and self.filter_manager.is_excluded_dir(entry.name)):
                         return True
@@ -483,7 +1086,11 @@ class ExportTab(QWidget):
                 current_depth += 1
                 parent = parent.parent()
             
-            self.populate_tree_item(item, path, current_depth)
+            if self.snapshot is not None:
+                node = self.snapshot.node(item.data(0, Qt.ItemDataRole.UserRole))
+                self.populate_snapshot_item(item, node, current_depth)
+            else:
+                self.populate_tree_item(item, path, current_depth)
     
     def reload_tree_structure(self):
         """Ricarica la struttura dell'albero applicando i filtri correnti"""
@@ -528,12 +1135,18 @@ class ExportTab(QWidget):
             search_in_item(self.tree_widget.topLevelItem(i))
     
     def expand_all_children(self, item):
-        """Espande ricorsivamente tutti i figli di un elemento"""
-        for i in range(item.childCount()):
-            child = item.child(i)
-            if child.childCount() > 0:
-                child.setExpanded(True)
-                self.expand_all_children(child)
+        """Espande tutti i discendenti di un elemento livello per livello, aggiornando la vista a ogni livello"""
+        level = [item]
+        while level:
+            next_level = []
+            for parent in level:
+                for i in range(parent.childCount()):
+                    child = parent.child(i)
+                    if child.childCount() > 0:
+                        child.setExpanded(True)
+                        next_level.append(child)
+            QApplication.processEvents()
+            level = next_level
     
     def collapse_all_children(self, item):
         """Comprime ricorsivamente tutti i figli di un elemento"""
@@ -557,9 +1170,44 @@ class ExportTab(QWidget):
         self.settings.setValue("include_files", self.include_files_check.isChecked())
         self.settings.setValue("max_depth", self.depth_spin.value())
         self.settings.setValue("indent_style", self.indent_style_combo.currentData())
+        self.settings.setValue("source_mode", self.source_combo.currentData())
+        self.settings.setValue("include_untracked", self.include_untracked_check.isChecked())
+        self.settings.setValue("symlink_policy", self.symlink_combo.currentData())
+        self.settings.setValue("sort_order", self.sort_combo.currentData())
+        self.settings.setValue("compression", self.compression_combo.currentData())
+        self.settings.setValue("one_filesystem", self.one_filesystem_check.isChecked())
+        self.settings.setValue("listing_timeout", self.listing_timeout_spin.value())
+        self.settings.setValue("retry_timeouts", self.retry_timeouts_check.isChecked())
+        self.settings.setValue("max_duration", self.max_duration_spin.value())
+        self.settings.setValue("max_entries_per_dir", self.max_entries_spin.value())
+        self.settings.setValue("collapse_names", self.collapse_names.text())
+        self.settings.setValue("collapse_entries", self.collapse_entries_spin.value())
+        self.settings.setValue("collapse_mb", self.collapse_mb_spin.value())
+        self.settings.setValue("show_directory_totals", self.show_totals_check.isChecked())
+        self.settings.setValue("show_stats", self.show_stats_check.isChecked())
+        self.settings.setValue("json_compact", self.json_compact_check.isChecked())
+        self.settings.setValue("json_string_table", self.json_string_table_check.isChecked())
+        self.settings.setValue("preview_breadth_first", self.preview_breadth_first_check.isChecked())
+        self.settings.setValue("duplicates_report", self.duplicates_report_check.isChecked())
+        self.settings.setValue("top_report", self.top_report_spin.value())
+        self.settings.setValue("top_report_file", self.top_report_file_check.isChecked())
+        self.settings.setValue("hash_cache_path", self.exporter.hash_cache_path or "")
+        self.settings.setValue("merkle_mode", self.merkle_combo.currentData())
+        self.settings.setValue("compare_path", self.compare_path.text())
+        self.settings.setValue("changes_mode", self.changes_combo.currentData())
+        self.settings.setValue("changes_since", self.changes_since_edit.dateTime().toSecsSinceEpoch())
+        self.settings.setValue("change_index_path", self.exporter.change_index_path or "")
     
     def load_settings(self):
         """Carica le impostazioni della scheda"""
+        # Cache persistente dei digest (manifest e duplicati) e indice delle directory per
+        # l'esportazione dei soli elementi modificati, nella cartella dei dati dell'applicazione;
+        # i percorsi relativi delle versioni precedenti dipendevano dalla directory di avvio
+        self.exporter.set_hash_cache_path(
+            app_data_setting(self.settings.value("hash_cache_path", "", type=str), "hash_cache.json"))
+        self.exporter.set_change_index_path(
+            app_data_setting(self.settings.value("change_index_path", "", type=str), "change_index.json"))
+        
         self.dir_path.setText(self.settings.value("dir_path", ""))
         self.output_path.setText(self.settings.value("output_path", ""))
         
@@ -578,6 +1226,47 @@ class ExportTab(QWidget):
                 self.indent_style_combo.setCurrentIndex(i)
                 break
         
+        # Carica la sorgente di scansione
+        index = self.source_combo.findData(self.settings.value("source_mode", SOURCE_FILESYSTEM))
+        if index >= 0:
+            self.source_combo.setCurrentIndex(index)
+        self.include_untracked_check.setChecked(self.settings.value("include_untracked", False, type=bool))
+        index = self.symlink_combo.findData(self.settings.value("symlink_policy", SYMLINKS_FOLLOW))
+        if index >= 0:
+            self.symlink_combo.setCurrentIndex(index)
+        index = self.sort_combo.findData(self.settings.value("sort_order", SORT_NAME))
+        if index >= 0:
+            self.sort_combo.setCurrentIndex(index)
+        index = self.compression_combo.findData(self.settings.value("compression", ""))
+        if index >= 0:
+            self.compression_combo.setCurrentIndex(index)
+        self.one_filesystem_check.setChecked(self.settings.value("one_filesystem", False, type=bool))
+        self.listing_timeout_spin.setValue(self.settings.value("listing_timeout", 0, type=int))
+        self.retry_timeouts_check.setChecked(self.settings.value("retry_timeouts", False, type=bool))
+        self.max_duration_spin.setValue(self.settings.value("max_duration", 0, type=int))
+        self.max_entries_spin.setValue(self.settings.value("max_entries_per_dir", 0, type=int))
+        self.collapse_names.setText(self.settings.value("collapse_names", "", type=str))
+        self.collapse_entries_spin.setValue(self.settings.value("collapse_entries", 0, type=int))
+        self.collapse_mb_spin.setValue(self.settings.value("collapse_mb", 0, type=int))
+        self.show_totals_check.setChecked(self.settings.value("show_directory_totals", False, type=bool))
+        self.show_stats_check.setChecked(self.settings.value("show_stats", False, type=bool))
+        self.json_compact_check.setChecked(self.settings.value("json_compact", False, type=bool))
+        self.json_string_table_check.setChecked(self.settings.value("json_string_table", False, type=bool))
+        self.preview_breadth_first_check.setChecked(self.settings.value("preview_breadth_first", False, type=bool))
+        self.duplicates_report_check.setChecked(self.settings.value("duplicates_report", False, type=bool))
+        self.top_report_spin.setValue(self.settings.value("top_report", 0, type=int))
+        self.top_report_file_check.setChecked(self.settings.value("top_report_file", False, type=bool))
+        index = self.merkle_combo.findData(self.settings.value("merkle_mode", ""))
+        if index >= 0:
+            self.merkle_combo.setCurrentIndex(index)
+        self.compare_path.setText(self.settings.value("compare_path", ""))
+        index = self.changes_combo.findData(self.settings.value("changes_mode", ""))
+        if index >= 0:
+            self.changes_combo.setCurrentIndex(index)
+        changes_since = self.settings.value("changes_since", 0, type=int)
+        if changes_since:
+            self.changes_since_edit.setDateTime(QDateTime.fromSecsSinceEpoch(changes_since))
+        
         directory_path = self.dir_path.text()
         if directory_path:
             self.load_tree_structure()
@@ -587,7 +1276,7 @@ class ExportTab(QWidget):
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
                 path = url.toLocalFile()
-                if Path(path).is_dir():
+                if Path(path).is_dir() or is_snapshot_file(path):
                     self.setStyleSheet("QGroupBox[title=\"" + tr("Selezione Directory") + "\"] { border: 2px dashed #0066cc; background-color: #e6f0ff; }")
                     event.acceptProposedAction()
                     return
@@ -611,7 +1300,7 @@ class ExportTab(QWidget):
         if event.mimeData().hasUrls():
             for url in event.mimeData().urls():
                 path = url.toLocalFile()
-                if Path(path).is_dir():
+                if Path(path).is_dir() or is_snapshot_file(path):
                     self.dir_path.setText(path)
                     self.load_tree_structure()
                     self.tree_widget.setFocus()
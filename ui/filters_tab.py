@@ -96,6 +96,14 @@ class FiltersTab(QWidget):
         modification_layout.addLayout(modification_max_layout)
         self.modification_group.setLayout(modification_layout)
         
+        # Gruppo file di ignore
+        self.ignore_group = QGroupBox(tr("File di ignore"))
+        ignore_layout = QVBoxLayout()
+        
+        self.use_gitignore_check = QCheckBox(tr("Rispetta i file .gitignore e .ignore"))
+        ignore_layout.addWidget(self.use_gitignore_check)
+        self.ignore_group.setLayout(ignore_layout)
+        
         # Pulsanti di azione
         action_layout = QHBoxLayout()
         self.apply_btn = QPushButton(tr("Applica filtri"))
@@ -111,6 +119,7 @@ class FiltersTab(QWidget):
         layout.addWidget(self.size_group)
         layout.addWidget(self.creation_group)
         layout.addWidget(self.modification_group)
+        layout.addWidget(self.ignore_group)
         layout.addLayout(action_layout)
         layout.addStretch(1)  # Spazio flessibile in fondo
 
@@ -120,6 +129,7 @@ class FiltersTab(QWidget):
         self.size_group.setTitle(tr("Filtri dimensione file"))
         self.creation_group.setTitle(tr("Filtri data creazione"))
         self.modification_group.setTitle(tr("Filtri data modifica"))
+        self.ignore_group.setTitle(tr("File di ignore"))
         
         # Aggiorna le etichette
         self.min_size_label.setText(tr("Dimensione minima (bytes):"))
@@ -136,6 +146,7 @@ class FiltersTab(QWidget):
         # Aggiorna i checkbox
         self.use_creation_date.setText(tr("Attiva filtro per data di creazione"))
         self.use_modification_date.setText(tr("Attiva filtro per data di modifica"))
+        self.use_gitignore_check.setText(tr("Rispetta i file .gitignore e .ignore"))
         
         # Aggiorna lo special value text dello spinbox
         self.max_size_spin.setSpecialValueText(tr("Illimitato"))
@@ -172,6 +183,9 @@ class FiltersTab(QWidget):
         if self.filter_manager.max_modification_date is not None:
             date_time = QDateTime.fromSecsSinceEpoch(self.filter_manager.max_modification_date)
             self.max_modification_date.setDateTime(date_time)
+        
+        # Aggiorna l'opzione dei file di ignore
+        self.use_gitignore_check.setChecked(self.filter_manager.use_gitignore)
     
     def apply_filters(self):
         """Applica i filtri impostati"""
@@ -196,6 +210,9 @@ class FiltersTab(QWidget):
         else:
             self.filter_manager.set_modification_date_filters(None, None)
         
+        # Imposta l'uso dei file di ignore
+        self.filter_manager.set_gitignore_mode(self.use_gitignore_check.isChecked())
+        
         # Aggiorna la vista principale se necessario
         if hasattr(self.window(), 'export_tab') and self.window().export_tab:
             self.window().export_tab.reload_tree_structure()
@@ -215,6 +232,7 @@ class FiltersTab(QWidget):
         self.max_size_spin.setValue(0)
         self.use_creation_date.setChecked(False)
         self.use_modification_date.setChecked(False)
+        self.use_gitignore_check.setChecked(False)
         
         # Aggiorna la vista principale se necessario
         if hasattr(self.window(), 'export_tab') and self.window().export_tab:
@@ -239,6 +257,9 @@ class FiltersTab(QWidget):
         self.settings.setValue("filters_use_modification_date", self.use_modification_date.isChecked())
         self.settings.setValue("filters_min_modification_date", self.min_modification_date.dateTime())
         self.settings.setValue("filters_max_modification_date", self.max_modification_date.dateTime())
+        
+        # Salva l'opzione dei file di ignore
+        self.settings.setValue("filters_use_gitignore", self.use_gitignore_check.isChecked())
     
     def load_settings(self):
         """Carica le impostazioni dei filtri"""
@@ -269,4 +290,8 @@ class FiltersTab(QWidget):
         
         max_modification_date = self.settings.value("filters_max_modification_date")
         if max_modification_date:
-            self.max_modification_date.setDateTime(max_modification_date)
\ No newline at end of file
+            self.max_modification_date.setDateTime(max_modification_date)
+        
+        # Carica l'opzione dei file di ignore
+        use_gitignore = self.settings.value("filters_use_gitignore", False, type=bool)
+        self.use_gitignore_check.setChecked(use_gitignore)
\ No newline at end of file
@@ -165,7 +165,62 @@ class TranslationManager(QObject):
                 "Corrisponde a nomi come": "Matches names like",
                 "ecc.": "etc.",
                 "Corrisponde a qualsiasi nome che contiene": "Matches any name containing",
-                "Corrisponde a file che finiscono con": "Matches files ending with"
+                "Corrisponde a file che finiscono con": "Matches files ending with",
+                "Apri snapshot...": "Open snapshot...",
+                "Apri snapshot": "Open snapshot",
+                "Snapshot caricato:": "Snapshot loaded:",
+                "Sorgente:": "Source:",
+                "File system": "File system",
+                "Indice git (file tracciati)": "Git index (tracked files)",
+                "Includi file non tracciati": "Include untracked files",
+                "File di ignore": "Ignore Files",
+                "Rispetta i file .gitignore e .ignore": "Honour .gitignore and .ignore files",
+                "Aggiungi percorso": "Add path",
+                "Percorso relativo alla radice (es. services/legacy/build) o assoluto; * corrisponde a un nome qualsiasi:": "Path relative to the root (e.g. services/legacy/build) or absolute; * matches any name:",
+                "Mostra i totali delle directory (dimensione, file, sottodirectory)": "Show directory totals (size, files, subdirectories)",
+                "Genera anche il report dei file duplicati": "Also generate the duplicate files report",
+                "Verifica manifest...": "Verify manifest...",
+                "Verifica manifest": "Verify manifest",
+                "Manifest": "Manifest",
+                "Nessuna differenza rispetto al manifest.": "No differences from the manifest.",
+                "Hash delle directory (snapshot):": "Directory hashes (snapshot):",
+                "Nessuno": "None",
+                "Metadati (dimensione e data)": "Metadata (size and date)",
+                "Contenuto (SHA-256)": "Content (SHA-256)",
+                "Confronta con:": "Compare with:",
+                "Directory o snapshot precedente (vuoto: nessun confronto)": "Previous directory or snapshot (empty: no comparison)",
+                "Elementi:": "Entries:",
+                "Tutti": "All",
+                "Modificati dall'ultima esportazione": "Changed since the last export",
+                "Modificati dopo:": "Changed after:",
+                "Link simbolici:": "Symbolic links:",
+                "Segui (ogni directory una sola volta)": "Follow (each directory once)",
+                "Elenca senza seguire": "List without following",
+                "Ignora": "Skip",
+                "Non attraversare altri filesystem": "Stay on one filesystem",
+                "Tempo massimo per directory (s):": "Time limit per directory (s):",
+                "Riprova alla fine le directory scadute": "Retry timed-out directories at the end",
+                "Durata massima della scansione (s):": "Maximum scan duration (s):",
+                "Anteprima per livelli (prima i livelli superiori)": "Level-order preview (top levels first)",
+                "Elementi massimi per directory:": "Maximum entries per directory:",
+                "Comprimi le directory:": "Collapse directories:",
+                "Nomi separati da virgola (es. node_modules)": "Comma-separated names (e.g. node_modules)",
+                "oltre elementi:": "over entries:",
+                "oltre MB:": "over MB:",
+                "Ordinamento:": "Sort order:",
+                "Nome (senza maiuscole/minuscole)": "Name (case-insensitive)",
+                "Nome (numeri per valore)": "Name (natural, numbers by value)",
+                "Estensione": "Extension",
+                "Dimensione (più grandi prima)": "Size (largest first)",
+                "Data di modifica (più recenti prima)": "Modification date (newest first)",
+                "Ordine del filesystem (più veloce)": "Filesystem order (fastest)",
+                "Report dei più grandi e più recenti:": "Largest and newest report:",
+                "In un file separato": "In a separate file",
+                "Aggiungi le statistiche per estensione, livello e directory": "Add statistics by extension, depth and directory",
+                "Compressione:": "Compression:",
+                "Nessuna": "None",
+                "JSON compatto": "Compact JSON",
+                "Tabella dei nomi ripetuti": "Repeated names table"
             },
             'de': {
                 "Directory Structure Exporter": "Verzeichnisstruktur-Exporteur",
@@ -254,7 +309,62 @@ class TranslationManager(QObject):
                 "I filtri sono stati reimpostati ai valori predefiniti.": "Die Filter wurden auf Standardwerte zurückgesetzt.",
                 "Directory escluse": "Ausgeschlossene Verzeichnisse",
                 "File esclusi": "Ausgeschlossene Dateien",
-                "Estensioni incluse": "Eingeschlossene Erweiterungen"
+                "Estensioni incluse": "Eingeschlossene Erweiterungen",
+                "Apri snapshot...": "Snapshot öffnen...",
+                "Apri snapshot": "Snapshot öffnen",
+                "Snapshot caricato:": "Snapshot geladen:",
+                "Sorgente:": "Quelle:",
+                "File system": "Dateisystem",
+                "Indice git (file tracciati)": "Git-Index (verfolgte Dateien)",
+                "Includi file non tracciati": "Nicht verfolgte Dateien einschließen",
+                "File di ignore": "Ignore-Dateien",
+                "Rispetta i file .gitignore e .ignore": ".gitignore- und .ignore-Dateien berücksichtigen",
+                "Aggiungi percorso": "Pfad hinzufügen",
+                "Percorso relativo alla radice (es. services/legacy/build) o assoluto; * corrisponde a un nome qualsiasi:": "Pfad relativ zum Stammverzeichnis (z. B. services/legacy/build) oder absolut; * entspricht einem beliebigen Namen:",
+                "Mostra i totali delle directory (dimensione, file, sottodirectory)": "Verzeichnissummen anzeigen (Größe, Dateien, Unterverzeichnisse)",
+                "Genera anche il report dei file duplicati": "Auch den Bericht über doppelte Dateien erstellen",
+                "Verifica manifest...": "Manifest prüfen...",
+                "Verifica manifest": "Manifest prüfen",
+                "Manifest": "Manifest",
+                "Nessuna differenza rispetto al manifest.": "Keine Abweichungen vom Manifest.",
+                "Hash delle directory (snapshot):": "Verzeichnis-Hashes (Snapshot):",
+                "Nessuno": "Keine",
+                "Metadati (dimensione e data)": "Metadaten (Größe und Datum)",
+                "Contenuto (SHA-256)": "Inhalt (SHA-256)",
+                "Confronta con:": "Vergleichen mit:",
+                "Directory o snapshot precedente (vuoto: nessun confronto)": "Vorheriges Verzeichnis oder Snapshot (leer: kein Vergleich)",
+                "Elementi:": "Einträge:",
+                "Tutti": "Alle",
+                "Modificati dall'ultima esportazione": "Seit dem letzten Export geändert",
+                "Modificati dopo:": "Geändert nach:",
+                "Link simbolici:": "Symbolische Links:",
+                "Segui (ogni directory una sola volta)": "Folgen (jedes Verzeichnis nur einmal)",
+                "Elenca senza seguire": "Auflisten ohne zu folgen",
+                "Ignora": "Überspringen",
+                "Non attraversare altri filesystem": "Nur ein Dateisystem durchsuchen",
+                "Tempo massimo per directory (s):": "Zeitlimit pro Verzeichnis (s):",
+                "Riprova alla fine le directory scadute": "Zeitüberschreitungen am Ende erneut versuchen",
+                "Durata massima della scansione (s):": "Maximale Scandauer (s):",
+                "Anteprima per livelli (prima i livelli superiori)": "Vorschau nach Ebenen (obere Ebenen zuerst)",
+                "Elementi massimi per directory:": "Maximale Einträge pro Verzeichnis:",
+                "Comprimi le directory:": "Verzeichnisse zusammenfassen:",
+                "Nomi separati da virgola (es. node_modules)": "Kommagetrennte Namen (z. B. node_modules)",
+                "oltre elementi:": "Schwelle Einträge:",
+                "oltre MB:": "Schwelle MB:",
+                "Ordinamento:": "Sortierung:",
+                "Nome (senza maiuscole/minuscole)": "Name (ohne Groß-/Kleinschreibung)",
+                "Nome (numeri per valore)": "Name (Zahlen nach Wert)",
+                "Estensione": "Erweiterung",
+                "Dimensione (più grandi prima)": "Größe (größte zuerst)",
+                "Data di modifica (più recenti prima)": "Änderungsdatum (neueste zuerst)",
+                "Ordine del filesystem (più veloce)": "Dateisystem-Reihenfolge (am schnellsten)",
+                "Report dei più grandi e più recenti:": "Bericht der größten und neuesten:",
+                "In un file separato": "In einer separaten Datei",
+                "Aggiungi le statistiche per estensione, livello e directory": "Statistiken nach Erweiterung, Ebene und Verzeichnis hinzufügen",
+                "Compressione:": "Komprimierung:",
+                "Nessuna": "Keine",
+                "JSON compatto": "Kompaktes JSON",
+                "Tabella dei nomi ripetuti": "Tabelle wiederholter Namen"
             },
             'fr': {
                 "Directory Structure Exporter": "Exportateur de Structure de Répertoires",
@@ -343,7 +453,62 @@ class TranslationManager(QObject):
                 "I filtri sono stati reimpostati ai valori predefiniti.": "Les filtres ont été réinitialisés aux valeurs par défaut.",
                 "Directory escluse": "Répertoires Exclus",
                 "File esclusi": "Fichiers Exclus",
-                "Estensioni incluse": "Extensions Incluses"
+                "Estensioni incluse": "Extensions Incluses",
+                "Apri snapshot...": "Ouvrir un instantané...",
+                "Apri snapshot": "Ouvrir un instantané",
+                "Snapshot caricato:": "Instantané chargé:",
+                "Sorgente:": "Source:",
+                "File system": "Système de fichiers",
+                "Indice git (file tracciati)": "Index git (fichiers suivis)",
+                "Includi file non tracciati": "Inclure les fichiers non suivis",
+                "File di ignore": "Fichiers d'exclusion",
+                "Rispetta i file .gitignore e .ignore": "Respecter les fichiers .gitignore et .ignore",
+                "Aggiungi percorso": "Ajouter un chemin",
+                "Percorso relativo alla radice (es. services/legacy/build) o assoluto; * corrisponde a un nome qualsiasi:": "Chemin relatif à la racine (ex. services/legacy/build) ou absolu; * correspond à n'importe quel nom:",
+                "Mostra i totali delle directory (dimensione, file, sottodirectory)": "Afficher les totaux des répertoires (taille, fichiers, sous-répertoires)",
+                "Genera anche il report dei file duplicati": "Générer aussi le rapport des fichiers en double",
+                "Verifica manifest...": "Vérifier le manifeste...",
+                "Verifica manifest": "Vérifier le manifeste",
+                "Manifest": "Manifeste",
+                "Nessuna differenza rispetto al manifest.": "Aucune différence par rapport au manifeste.",
+                "Hash delle directory (snapshot):": "Hachages des répertoires (snapshot):",
+                "Nessuno": "Aucun",
+                "Metadati (dimensione e data)": "Métadonnées (taille et date)",
+                "Contenuto (SHA-256)": "Contenu (SHA-256)",
+                "Confronta con:": "Comparer avec:",
+                "Directory o snapshot precedente (vuoto: nessun confronto)": "Répertoire ou snapshot précédent (vide: aucune comparaison)",
+                "Elementi:": "Éléments:",
+                "Tutti": "Tous",
+                "Modificati dall'ultima esportazione": "Modifiés depuis le dernier export",
+                "Modificati dopo:": "Modifiés après:",
+                "Link simbolici:": "Liens symboliques:",
+                "Segui (ogni directory una sola volta)": "Suivre (chaque répertoire une seule fois)",
+                "Elenca senza seguire": "Lister sans suivre",
+                "Ignora": "Ignorer",
+                "Non attraversare altri filesystem": "Rester sur un seul système de fichiers",
+                "Tempo massimo per directory (s):": "Délai maximal par répertoire (s):",
+                "Riprova alla fine le directory scadute": "Réessayer à la fin les répertoires expirés",
+                "Durata massima della scansione (s):": "Durée maximale de l'analyse (s):",
+                "Anteprima per livelli (prima i livelli superiori)": "Aperçu par niveaux (niveaux supérieurs d'abord)",
+                "Elementi massimi per directory:": "Éléments maximum par répertoire:",
+                "Comprimi le directory:": "Réduire les répertoires:",
+                "Nomi separati da virgola (es. node_modules)": "Noms séparés par des virgules (ex. node_modules)",
+                "oltre elementi:": "seuil d'éléments:",
+                "oltre MB:": "seuil en Mo:",
+                "Ordinamento:": "Tri:",
+                "Nome (senza maiuscole/minuscole)": "Nom (sans distinction de casse)",
+                "Nome (numeri per valore)": "Nom (nombres par valeur)",
+                "Estensione": "Extension",
+                "Dimensione (più grandi prima)": "Taille (plus grands d'abord)",
+                "Data di modifica (più recenti prima)": "Date de modification (plus récents d'abord)",
+                "Ordine del filesystem (più veloce)": "Ordre du système de fichiers (plus rapide)",
+                "Report dei più grandi e più recenti:": "Rapport des plus grands et plus récents:",
+                "In un file separato": "Dans un fichier séparé",
+                "Aggiungi le statistiche per estensione, livello e directory": "Ajouter les statistiques par extension, niveau et répertoire",
+                "Compressione:": "Compression:",
+                "Nessuna": "Aucune",
+                "JSON compatto": "JSON compact",
+                "Tabella dei nomi ripetuti": "Table des noms répétés"
             },
             'es': {
                 "Directory Structure Exporter": "Exportador de Estructura de Directorios",
@@ -432,7 +597,62 @@ class TranslationManager(QObject):
                 "I filtri sono stati reimpostati ai valori predefiniti.": "Los filtros se han restablecido a los valores predeterminados.",
                 "Directory escluse": "Directorios Excluidos",
                 "File esclusi": "Archivos Excluidos",
-                "Estensioni incluse": "Extensiones Incluidas"
+                "Estensioni incluse": "Extensiones Incluidas",
+                "Apri snapshot...": "Abrir instantánea...",
+                "Apri snapshot": "Abrir instantánea",
+                "Snapshot caricato:": "Instantánea cargada:",
+                "Sorgente:": "Origen:",
+                "File system": "Sistema de archivos",
+                "Indice git (file tracciati)": "Índice git (archivos rastreados)",
+                "Includi file non tracciati": "Incluir archivos no rastreados",
+                "File di ignore": "Archivos de exclusión",
+                "Rispetta i file .gitignore e .ignore": "Respetar los archivos .gitignore e .ignore",
+                "Aggiungi percorso": "Añadir ruta",
+                "Percorso relativo alla radice (es. services/legacy/build) o assoluto; * corrisponde a un nome qualsiasi:": "Ruta relativa a la raíz (ej. services/legacy/build) o absoluta; * coincide con cualquier nombre:",
+                "Mostra i totali delle directory (dimensione, file, sottodirectory)": "Mostrar totales de directorios (tamaño, archivos, subdirectorios)",
+                "Genera anche il report dei file duplicati": "Generar también el informe de archivos duplicados",
+                "Verifica manifest...": "Verificar manifiesto...",
+                "Verifica manifest": "Verificar manifiesto",
+                "Manifest": "Manifiesto",
+                "Nessuna differenza rispetto al manifest.": "No hay diferencias con el manifiesto.",
+                "Hash delle directory (snapshot):": "Hashes de directorios (snapshot):",
+                "Nessuno": "Ninguno",
+                "Metadati (dimensione e data)": "Metadatos (tamaño y fecha)",
+                "Contenuto (SHA-256)": "Contenido (SHA-256)",
+                "Confronta con:": "Comparar con:",
+                "Directory o snapshot precedente (vuoto: nessun confronto)": "Directorio o snapshot anterior (vacío: sin comparación)",
+                "Elementi:": "Elementos:",
+                "Tutti": "Todos",
+                "Modificati dall'ultima esportazione": "Modificados desde la última exportación",
+                "Modificati dopo:": "Modificados después de:",
+                "Link simbolici:": "Enlaces simbólicos:",
+                "Segui (ogni directory una sola volta)": "Seguir (cada directorio una sola vez)",
+                "Elenca senza seguire": "Listar sin seguir",
+                "Ignora": "Omitir",
+                "Non attraversare altri filesystem": "No cruzar a otros sistemas de archivos",
+                "Tempo massimo per directory (s):": "Tiempo máximo por directorio (s):",
+                "Riprova alla fine le directory scadute": "Reintentar al final los directorios agotados",
+                "Durata massima della scansione (s):": "Duración máxima del escaneo (s):",
+                "Anteprima per livelli (prima i livelli superiori)": "Vista previa por niveles (primero los niveles superiores)",
+                "Elementi massimi per directory:": "Elementos máximos por directorio:",
+                "Comprimi le directory:": "Contraer directorios:",
+                "Nomi separati da virgola (es. node_modules)": "Nombres separados por comas (p. ej. node_modules)",
+                "oltre elementi:": "umbral de elementos:",
+                "oltre MB:": "umbral en MB:",
+                "Ordinamento:": "Orden:",
+                "Nome (senza maiuscole/minuscole)": "Nombre (sin distinguir mayúsculas)",
+                "Nome (numeri per valore)": "Nombre (números por valor)",
+                "Estensione": "Extensión",
+                "Dimensione (più grandi prima)": "Tamaño (más grandes primero)",
+                "Data di modifica (più recenti prima)": "Fecha de modificación (más recientes primero)",
+                "Ordine del filesystem (più veloce)": "Orden del sistema de archivos (más rápido)",
+                "Report dei più grandi e più recenti:": "Informe de los más grandes y recientes:",
+                "In un file separato": "En un archivo separado",
+                "Aggiungi le statistiche per estensione, livello e directory": "Añadir estadísticas por extensión, nivel y directorio",
+                "Compressione:": "Compresión:",
+                "Nessuna": "Ninguna",
+                "JSON compatto": "JSON compacto",
+                "Tabella dei nomi ripetuti": "Tabla de nombres repetidos"
             }
         }
 